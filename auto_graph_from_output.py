@@ -1,10 +1,14 @@
 """
 Script para extrair dados da saída do servidor e gerar gráficos automaticamente
 Cole a saída completa do servidor quando solicitado
+
+Para varreduras longas, prefira rodar o servidor com --job-log jobs.jsonl e
+gerar os gráficos com generate_from_file.py, sem copiar a saída.
 """
 
 import re
 from generate_graphs import PerformanceData, create_comparison_graphs, create_detailed_breakdown_chart
+from save_test_data import CLIENTS_PATTERN, SIZE_PATTERN
 
 
 def parse_server_output(output: str) -> PerformanceData:
@@ -12,14 +16,14 @@ def parse_server_output(output: str) -> PerformanceData:
     Extrai dados da saída do servidor
     """
     # Extrair dimensões da matriz
-    size_match = re.search(r'Número de linhas da matriz A: (\d+)', output)
+    size_match = SIZE_PATTERN.search(output)
     if not size_match:
         raise ValueError("Não foi possível encontrar o tamanho da matriz")
     
-    size = int(size_match.group(1))
+    size = int(size_match.group(1) or size_match.group(2))
     
     # Extrair número de clientes
-    clients_match = re.search(r'Esperando (\d+) clientes', output)
+    clients_match = CLIENTS_PATTERN.search(output)
     num_clients = int(clients_match.group(1)) if clients_match else 2
     
     test = PerformanceData(size, num_clients)
@@ -74,7 +78,7 @@ def main():
         print("="*70)
         print()
         print("Cole TODA a saída do servidor abaixo (desde 'Iniciando servidor'")
-        print("até 'Os resultados são iguais? True')")
+        print("até a linha de 'Validação')")
         print()
         print("Quando terminar de colar, pressione ENTER duas vezes:")
         print()
@@ -105,7 +109,7 @@ def main():
             tests.append(test)
             
             print("\n✅ Dados extraídos com sucesso!")
-            print(f"   Matriz: {test.size}×{test.size}")
+            print(f"   Matriz: {test.label}")
             print(f"   Clientes: {test.num_clients}")
             print(f"   Speedup: {test.speedup:.2f}x")
             print(f"   Eficiência: {test.efficiency:.1f}%")
@@ -77,8 +77,9 @@ def main():
     print("• Matrizes grandes: Paralelismo domina → Distribuído MAIS RÁPIDO")
     print("• Break-even: Quando Speedup ≈ 1.0")
     print()
-    print("💡 DICA: Para sua apresentação, use matrizes ≥ 200×200")
-    print("   para garantir que a versão distribuída seja mais rápida!")
+    print("💡 DICA: o ponto de break-even depende da máquina, dos clientes e da rede.")
+    print("   Meça o perfil com `python -m matmul.server.tuner` e rode o servidor com")
+    print("   --profile: cada job roda local ou distribuído conforme o modelo de custo.")
     print()
 
 if __name__ == "__main__":
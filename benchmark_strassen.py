@@ -0,0 +1,99 @@
+"""
+Script para comparar Strassen-Winograd com o kernel base
+e encontrar o ponto de crossover nesta máquina
+"""
+
+import sys
+import time
+
+from matmul.utils.matrix_utils import generate_matrix, multiply_strassen, multiply_transposed
+
+try:
+    import numpy as np
+except ImportError:  # sem numpy, só a comparação em Python puro
+    np = None
+
+REPEATS = 2
+
+PURE_SIZES = [64, 128, 256, 384]
+PURE_LEAVES = [32, 64, 128]
+
+NUMPY_SIZES = [512, 1024, 2048, 3072]
+NUMPY_LEAVES = [256, 512, 1024]
+
+
+def best_time(fn, *args):
+    """Melhor tempo de REPEATS execuções"""
+    best = float("inf")
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(label, make, base, sizes, leaves):
+    """Tabela base x Strassen por folha; devolve o menor tamanho em que Strassen vence"""
+    print(f"\n{label}")
+    header = f"{'Tamanho':<10} {'base (s)':<12}" + "".join(f"{'folha ' + str(leaf) + ' (s)':<16}" for leaf in leaves)
+    print(header + f"{'Ganho':<10}")
+    print("-" * (len(header) + 10))
+
+    crossover = None
+    for size in sizes:
+        A = make(size)
+        B = make(size)
+        t_base = best_time(base, A, B)
+        # Folha >= tamanho não recursiona: seria o próprio kernel base
+        times = [best_time(multiply_strassen, A, B, leaf, base) if leaf < size else None for leaf in leaves]
+        measured = [t for t in times if t is not None]
+
+        gain = t_base / min(measured) if measured else 0
+        line = f"{size:<10} {t_base:<12.4f}" + "".join(f"{t:<16.4f}" if t is not None else f"{'-':<16}" for t in times)
+        print(line + (f"{gain:<10.2f}" if measured else "-"))
+
+        # Crossover: a partir daqui Strassen vence em todos os tamanhos medidos
+        if gain > 1.0:
+            if crossover is None:
+                crossover = (size, leaves[times.index(min(measured))])
+        else:
+            crossover = None
+
+    if crossover is None:
+        print(f"• Sem crossover até {sizes[-1]}: Strassen não vence o kernel base de forma sustentada")
+    else:
+        print(f"• Crossover: Strassen vence a partir de {crossover[0]} (folha {crossover[1]})")
+    return crossover
+
+
+def pure_matrix(size):
+    """Matriz de inteiros em listas, mesmo com numpy instalado"""
+    M = generate_matrix(size, size)
+    return M.tolist() if hasattr(M, "tolist") else M
+
+
+def numpy_matrix(size):
+    return np.random.default_rng(size).random((size, size))
+
+
+def main():
+    # Tamanhos opcionais na linha de comando valem para o Python puro
+    pure_sizes = [int(arg) for arg in sys.argv[1:]] or PURE_SIZES
+
+    print("=" * 60)
+    print("STRASSEN-WINOGRAD x KERNEL BASE - PONTO DE CROSSOVER")
+    print("=" * 60)
+    print(f"Python {sys.version.split()[0]}, melhor de {REPEATS} execuções")
+
+    run("Python puro (base: transposed, inteiros)", pure_matrix, multiply_transposed, pure_sizes, PURE_LEAVES)
+    if np is not None:
+        run("numpy (base: np.matmul, float64)", numpy_matrix, np.matmul, NUMPY_SIZES, NUMPY_LEAVES)
+
+    print()
+    print("• Ganho = tempo base / melhor tempo de Strassen")
+    print("• Use a folha do crossover em --strassen-leaf (servidor e clientes)")
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,29 +1,24 @@
 """
-Gera gráficos a partir do arquivo test_results.json
+Gera gráficos a partir dos jobs registrados pelo servidor com --job-log
+(jobs.jsonl, ou o arquivo passado na linha de comando) ou, na falta dele,
+do arquivo test_results.json montado com save_test_data.py
 """
 
 import json
-from generate_graphs import PerformanceData, create_comparison_graphs, create_detailed_breakdown_chart
+import os
+import sys
+from generate_graphs import PerformanceData, create_comparison_graphs, create_detailed_breakdown_chart, load_records
 
+JOB_LOG_DEFAULT = "jobs.jsonl"
 
-def main():
-    print("="*70)
-    print("GERAR GRÁFICOS A PARTIR DOS DADOS SALVOS")
-    print("="*70)
-    print()
-    
+
+def load_saved_tests():
+    """Testes do test_results.json (formato de save_test_data.py), ou None sem o arquivo"""
     try:
         with open('test_results.json', 'r') as f:
             all_tests = json.load(f)
     except FileNotFoundError:
-        print("❌ Arquivo test_results.json não encontrado!")
-        print()
-        print("Execute primeiro: python save_test_data.py")
-        return
-    
-    if not all_tests:
-        print("⚠️  Nenhum teste encontrado no arquivo.")
-        return
+        return None
     
     # Converter para objetos PerformanceData
     tests = []
@@ -36,10 +31,35 @@ def main():
         test.time_compute = data['time_compute']
         test.overhead_reconstruct = data['overhead_reconstruct']
         tests.append(test)
+    return tests
+
+
+def main():
+    print("="*70)
+    print("GERAR GRÁFICOS A PARTIR DOS DADOS SALVOS")
+    print("="*70)
+    print()
+    
+    job_log = sys.argv[1] if len(sys.argv) > 1 else JOB_LOG_DEFAULT
+    if os.path.exists(job_log):
+        tests = load_records(job_log)
+        print(f"📂 Jobs lidos de {job_log}")
+    else:
+        tests = load_saved_tests()
+        if tests is None:
+            print(f"❌ Nem {job_log} nem test_results.json encontrados!")
+            print()
+            print("Rode o servidor com --job-log jobs.jsonl (ou use python save_test_data.py)")
+            return
     
+    if not tests:
+        print("⚠️  Nenhum teste encontrado no arquivo.")
+        return
+
     print(f"📊 Testes encontrados: {len(tests)}")
     for i, test in enumerate(tests, 1):
-        print(f"  {i}. Matriz {test.size}×{test.size} - Speedup: {test.speedup:.2f}x")
+        speedup = f"{test.speedup:.2f}x" if test.speedup is not None else "- (sem tempo sequencial)"
+        print(f"  {i}. Matriz {test.label} - Speedup: {speedup}")
     
     print("\n" + "="*70)
     print("Gerando gráficos...")
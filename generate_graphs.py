@@ -3,9 +3,12 @@ Script para gerar gráficos de análise de performance
 Mostra comparação de tempos e decomposição de overhead
 """
 
+import json
+import sys
+
 import matplotlib.pyplot as plt
 import numpy as np
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
 
 # Configuração de estilo
 plt.style.use('seaborn-v0_8-darkgrid')
@@ -15,29 +18,86 @@ plt.rcParams['font.size'] = 10
 
 class PerformanceData:
     """Armazena dados de um teste de performance"""
-    def __init__(self, size: int, num_clients: int):
+    def __init__(self, size: int, num_clients: int, shape: Optional[Tuple[int, int, int]] = None):
         self.size = size
         self.num_clients = num_clients
-        self.t_sequential = 0.0
+        # (linhas A, colunas A, colunas B); quadrada size×size se não informada
+        self.shape = shape or (size, size, size)
+        # None: job registrado sem tempo sequencial (sem --verify full nem calibração)
+        self.t_sequential: Optional[float] = 0.0
         self.t_distributed = 0.0
         self.overhead_split = 0.0
         self.overhead_comm = 0.0
         self.time_compute = 0.0
         self.overhead_reconstruct = 0.0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+
+    @classmethod
+    def from_record(cls, record: Dict) -> "PerformanceData":
+        """Cria a partir de um registro do --job-log do servidor (uma linha JSON)"""
+        rows, inner, cols = record["shape"]
+        test = cls(rows, record["num_clients"], (rows, inner, cols))
+        phases = record["phases"]
+        test.t_sequential = record["t_sequential"]
+        test.t_distributed = record["t_distributed"]
+        test.overhead_split = phases["overhead_split"]
+        test.overhead_comm = phases["overhead_send"]
+        # Como na análise do servidor: computação média por cliente
+        test.time_compute = phases["time_compute"] / max(1, test.num_clients)
+        test.overhead_reconstruct = phases["overhead_reconstruct"]
+        test.bytes_sent = record.get("bytes_sent", 0)
+        test.bytes_received = record.get("bytes_received", 0)
+        return test
+
+    @property
+    def label(self) -> str:
+        rows, inner, cols = self.shape
+        if rows == inner == cols:
+            return f"{rows}×{rows}"
+        return f"{rows}×{inner}×{cols}"
     
     @property
     def total_overhead(self) -> float:
         return self.overhead_split + self.overhead_comm + self.overhead_reconstruct
     
     @property
-    def speedup(self) -> float:
+    def speedup(self) -> Optional[float]:
+        if self.t_sequential is None:
+            return None
         return self.t_sequential / self.t_distributed if self.t_distributed > 0 else 0
     
     @property
-    def efficiency(self) -> float:
+    def efficiency(self) -> Optional[float]:
+        if self.speedup is None:
+            return None
         return (self.speedup / self.num_clients) * 100 if self.num_clients > 0 else 0
 
 
+def load_records(path: str) -> List[PerformanceData]:
+    """
+    Lê o arquivo JSON lines gravado pelo servidor com --job-log (um job por
+    linha, na ordem em que terminaram). Uma última linha incompleta, de um
+    servidor interrompido no meio da gravação, é ignorada com aviso.
+    """
+    tests = []
+    with open(path, encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                print(f"⚠️  {path}:{number}: linha inválida ignorada")
+                continue
+            tests.append(PerformanceData.from_record(record))
+    missing = sum(test.t_sequential is None for test in tests)
+    if missing:
+        print(f"⚠️  {missing} job(s) sem tempo sequencial (rode com --verify full ou --calibration): "
+              "ficam fora do speedup e da eficiência")
+    return tests
+
+
 def create_comparison_graphs(tests: List[PerformanceData], output_file: str = "performance_analysis.png"):
     """
     Cria um conjunto de gráficos comparativos
@@ -45,11 +105,13 @@ def create_comparison_graphs(tests: List[PerformanceData], output_file: str = "p
     fig = plt.figure(figsize=(16, 12))
     
     # Preparar dados
-    sizes = [f"{t.size}×{t.size}" for t in tests]
-    t_seq = [t.t_sequential for t in tests]
+    sizes = [t.label for t in tests]
+    # Jobs sem tempo sequencial: sem barra sequencial, fora do speedup e da eficiência
+    t_seq = [t.t_sequential if t.t_sequential is not None else np.nan for t in tests]
     t_dist = [t.t_distributed for t in tests]
-    speedups = [t.speedup for t in tests]
-    efficiencies = [t.efficiency for t in tests]
+    measured = [i for i, t in enumerate(tests) if t.speedup is not None]
+    speedups = [tests[i].speedup for i in measured]
+    efficiencies = [tests[i].efficiency for i in measured]
     
     # ============================================================
     # GRÁFICO 1: Comparação de Tempos (Barras)
@@ -73,6 +135,8 @@ def create_comparison_graphs(tests: List[PerformanceData], output_file: str = "p
     for bars in [bars1, bars2]:
         for bar in bars:
             height = bar.get_height()
+            if np.isnan(height):
+                continue
             ax1.text(bar.get_x() + bar.get_width()/2., height,
                     f'{height:.2f}s',
                     ha='center', va='bottom', fontsize=8)
@@ -81,15 +145,16 @@ def create_comparison_graphs(tests: List[PerformanceData], output_file: str = "p
     # GRÁFICO 2: Speedup
     # ============================================================
     ax2 = plt.subplot(2, 3, 2)
+    x_measured = np.arange(len(measured))
     colors = ['#27ae60' if s > 1.0 else '#e74c3c' for s in speedups]
-    bars = ax2.bar(x, speedups, color=colors, alpha=0.8)
+    bars = ax2.bar(x_measured, speedups, color=colors, alpha=0.8)
     ax2.axhline(y=1.0, color='black', linestyle='--', linewidth=2, label='Break-even (1.0x)')
     
     ax2.set_xlabel('Tamanho da Matriz', fontweight='bold')
     ax2.set_ylabel('Speedup (x)', fontweight='bold')
     ax2.set_title('🚀 Speedup (T_seq / T_dist)', fontsize=12, fontweight='bold')
-    ax2.set_xticks(x)
-    ax2.set_xticklabels(sizes, rotation=45, ha='right')
+    ax2.set_xticks(x_measured)
+    ax2.set_xticklabels([sizes[i] for i in measured], rotation=45, ha='right')
     ax2.legend()
     ax2.grid(axis='y', alpha=0.3)
     
@@ -107,14 +172,14 @@ def create_comparison_graphs(tests: List[PerformanceData], output_file: str = "p
     # ============================================================
     ax3 = plt.subplot(2, 3, 3)
     colors_eff = ['#27ae60' if e >= 70 else '#f39c12' if e >= 50 else '#e74c3c' for e in efficiencies]
-    bars = ax3.bar(x, efficiencies, color=colors_eff, alpha=0.8)
+    bars = ax3.bar(x_measured, efficiencies, color=colors_eff, alpha=0.8)
     ax3.axhline(y=100, color='black', linestyle='--', linewidth=1, alpha=0.5, label='Ideal (100%)')
     
     ax3.set_xlabel('Tamanho da Matriz', fontweight='bold')
     ax3.set_ylabel('Eficiência (%)', fontweight='bold')
     ax3.set_title('📈 Eficiência do Paralelismo', fontsize=12, fontweight='bold')
-    ax3.set_xticks(x)
-    ax3.set_xticklabels(sizes, rotation=45, ha='right')
+    ax3.set_xticks(x_measured)
+    ax3.set_xticklabels([sizes[i] for i in measured], rotation=45, ha='right')
     ax3.set_ylim(0, 110)
     ax3.legend()
     ax3.grid(axis='y', alpha=0.3)
@@ -244,7 +309,7 @@ def create_detailed_breakdown_chart(test: PerformanceData, output_file: str = "b
         autotext.set_fontweight('bold')
         autotext.set_fontsize(10)
     
-    ax1.set_title(f'📊 Decomposição Detalhada\nMatriz {test.size}×{test.size}', 
+    ax1.set_title(f'📊 Decomposição Detalhada\nMatriz {test.label}', 
                   fontsize=12, fontweight='bold')
     
     # ============================================================
@@ -267,7 +332,7 @@ def create_detailed_breakdown_chart(test: PerformanceData, output_file: str = "b
         autotext.set_fontweight('bold')
         autotext.set_fontsize(12)
     
-    ax2.set_title(f'🥧 Overhead vs Computação\nMatriz {test.size}×{test.size}', 
+    ax2.set_title(f'🥧 Overhead vs Computação\nMatriz {test.label}', 
                   fontsize=12, fontweight='bold')
     
     plt.tight_layout()
@@ -285,48 +350,55 @@ if __name__ == "__main__":
     print("=" * 70)
     print()
     
-    # Exemplo com dados simulados (substitua pelos seus dados reais)
-    tests = []
-    
-    # Teste 1: Matriz pequena (50×50) - Overhead domina
-    test1 = PerformanceData(50, 2)
-    test1.t_sequential = 0.000234
-    test1.t_distributed = 0.003456
-    test1.overhead_split = 0.000012
-    test1.overhead_comm = 0.002890
-    test1.time_compute = 0.000120
-    test1.overhead_reconstruct = 0.000008
-    tests.append(test1)
-    
-    # Teste 2: Matriz média (200×200) - Break-even
-    test2 = PerformanceData(200, 2)
-    test2.t_sequential = 0.015234
-    test2.t_distributed = 0.014567
-    test2.overhead_split = 0.000045
-    test2.overhead_comm = 0.006234
-    test2.time_compute = 0.007890
-    test2.overhead_reconstruct = 0.000023
-    tests.append(test2)
-    
-    # Teste 3: Matriz grande (500×500) - Paralelismo compensa
-    test3 = PerformanceData(500, 2)
-    test3.t_sequential = 0.234567
-    test3.t_distributed = 0.134890
-    test3.overhead_split = 0.000123
-    test3.overhead_comm = 0.015234
-    test3.time_compute = 0.118567
-    test3.overhead_reconstruct = 0.000067
-    tests.append(test3)
-    
-    # Teste 4: Matriz muito grande (1000×1000) - Paralelismo domina
-    test4 = PerformanceData(1000, 2)
-    test4.t_sequential = 1.856789
-    test4.t_distributed = 1.023456
-    test4.overhead_split = 0.000234
-    test4.overhead_comm = 0.045678
-    test4.time_compute = 0.976543
-    test4.overhead_reconstruct = 0.000123
-    tests.append(test4)
+    # Com um arquivo do --job-log do servidor, usa os jobs registrados;
+    # sem argumentos, gera o exemplo com dados simulados
+    if len(sys.argv) > 1:
+        tests = load_records(sys.argv[1])
+        print(f"📂 {len(tests)} job(s) lidos de {sys.argv[1]}")
+        if not tests:
+            sys.exit(1)
+    else:
+        tests = []
+    
+        # Teste 1: Matriz pequena (50×50) - Overhead domina
+        test1 = PerformanceData(50, 2)
+        test1.t_sequential = 0.000234
+        test1.t_distributed = 0.003456
+        test1.overhead_split = 0.000012
+        test1.overhead_comm = 0.002890
+        test1.time_compute = 0.000120
+        test1.overhead_reconstruct = 0.000008
+        tests.append(test1)
+    
+        # Teste 2: Matriz média (200×200) - Break-even
+        test2 = PerformanceData(200, 2)
+        test2.t_sequential = 0.015234
+        test2.t_distributed = 0.014567
+        test2.overhead_split = 0.000045
+        test2.overhead_comm = 0.006234
+        test2.time_compute = 0.007890
+        test2.overhead_reconstruct = 0.000023
+        tests.append(test2)
+    
+        # Teste 3: Matriz grande (500×500) - Paralelismo compensa
+        test3 = PerformanceData(500, 2)
+        test3.t_sequential = 0.234567
+        test3.t_distributed = 0.134890
+        test3.overhead_split = 0.000123
+        test3.overhead_comm = 0.015234
+        test3.time_compute = 0.118567
+        test3.overhead_reconstruct = 0.000067
+        tests.append(test3)
+    
+        # Teste 4: Matriz muito grande (1000×1000) - Paralelismo domina
+        test4 = PerformanceData(1000, 2)
+        test4.t_sequential = 1.856789
+        test4.t_distributed = 1.023456
+        test4.overhead_split = 0.000234
+        test4.overhead_comm = 0.045678
+        test4.time_compute = 0.976543
+        test4.overhead_reconstruct = 0.000123
+        tests.append(test4)
     
     print("📊 Gerando gráficos comparativos...")
     create_comparison_graphs(tests, "performance_analysis.png")
@@ -341,5 +413,7 @@ if __name__ == "__main__":
     print("  • performance_analysis.png - Comparação completa de todos os testes")
     print("  • breakdown_chart.png - Decomposição detalhada do último teste")
     print()
-    print("💡 DICA: Substitua os dados simulados pelos seus dados reais!")
+    if len(sys.argv) == 1:
+        print("💡 DICA: rode o servidor com --job-log jobs.jsonl e depois")
+        print("   python generate_graphs.py jobs.jsonl para usar dados reais!")
     print()
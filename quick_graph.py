@@ -56,7 +56,7 @@ if __name__ == "__main__":
     
     print("📊 Testes incluídos:")
     for i, test in enumerate(tests, 1):
-        print(f"  {i}. Matriz {test.size}×{test.size} com {test.num_clients} clientes")
+        print(f"  {i}. Matriz {test.label} com {test.num_clients} clientes")
         print(f"     Speedup: {test.speedup:.2f}x | Eficiência: {test.efficiency:.1f}%")
     
     print("\n" + "="*70)
@@ -1,22 +1,30 @@
 """
 Script SIMPLES: Cole os dados do servidor e salva em arquivo
 Depois use generate_from_file.py para gerar os gráficos
+
+Para varreduras longas, prefira rodar o servidor com --job-log jobs.jsonl:
+cada job é gravado sozinho e generate_from_file.py lê o arquivo direto.
 """
 
 import json
 import re
 
+# Linhas impressas pelo servidor ("Gerando matrizes A (300x200)..." ou
+# "Matrizes em arquivo: A (300, 200) ...") e no início da espera pelos clientes
+SIZE_PATTERN = re.compile(r'Gerando matrizes A \((\d+)x\d+\)|Matrizes em arquivo: A \((\d+), \d+\)')
+CLIENTS_PATTERN = re.compile(r'Aguardando conexão de (\d+) clientes')
+
 
 def extract_data_from_output(output: str) -> dict:
     """Extrai dados da saída do servidor"""
     data = {}
     
-    # Tamanho da matriz
-    size_match = re.search(r'Número de linhas da matriz A: (\d+)', output)
-    data['size'] = int(size_match.group(1)) if size_match else 0
+    # Tamanho da matriz (linhas de A, geradas ou lidas de arquivo)
+    size_match = SIZE_PATTERN.search(output)
+    data['size'] = int(size_match.group(1) or size_match.group(2)) if size_match else 0
     
     # Número de clientes
-    clients_match = re.search(r'Esperando (\d+) clientes', output)
+    clients_match = CLIENTS_PATTERN.search(output)
     data['num_clients'] = int(clients_match.group(1)) if clients_match else 2
     
     # Tempo sequencial
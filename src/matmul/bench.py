@@ -0,0 +1,379 @@
+"""
+Bancada de desempenho ponta a ponta, sem interação nem `sleep`.
+
+Sobe o coordenador numa porta efêmera e N clientes locais (processos
+`matmul.client.main`), varre tamanhos, números de clientes, kernels,
+formatos de fio e blocos por cliente, e grava uma linha JSON por
+configuração (o mesmo formato do --job-log, mais o bloco "bench" com
+mediana, p95 e intervalos de confiança).
+
+    cd src
+    python -m matmul.bench --sizes 256 512 --workers 1 2 4 --output bench.jsonl
+    python -m matmul.bench ... --output novo.jsonl --compare bench.jsonl
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import matmul
+from matmul.utils.dtypes import DTYPES
+from matmul.utils.kernels import DEFAULT_KERNEL, available_kernels
+from matmul.utils.matrix_utils import generate_operands
+from matmul.utils.protocol import WIRE_BINARY, WIRE_JSON, np
+from matmul.server.analysis import VERIFY_DEFAULT, VERIFY_MODES, check_result, reference
+from matmul.server.calibration import Calibration
+from matmul.server.coordinator import Coordinator
+from matmul.server.job_log import JobLog, job_record
+from matmul.server.scheduler import CHUNKS_PER_CLIENT_DEFAULT
+
+# Valor de "mode" nos registros da bancada
+MODE_BENCH = "bench"
+
+SIZES_DEFAULT = (128, 256)
+WORKERS_DEFAULT = (1, 2)
+WARMUP_DEFAULT = 1
+REPEATS_DEFAULT = 5
+OUTPUT_DEFAULT = "bench.jsonl"
+
+# Intervalos de confiança por bootstrap (semente fixa: reprodutíveis)
+CONFIDENCE = 0.95
+RESAMPLES = 1000
+SEED = 0
+
+# Folga, sobre a mediana de referência, para acusar regressão
+TOLERANCE_DEFAULT = 0.05
+
+WORKER_TIMEOUT = 30.0
+JOB_TIMEOUT = 600.0
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """
+    Percentil `q` (0 a 100) com interpolação linear entre as amostras ordenadas.
+    """
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q / 100
+    low = int(position)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+
+def bootstrap_ci(values: Sequence[float], q: float, confidence: float = CONFIDENCE) -> Tuple[float, float]:
+    """
+    Intervalo de confiança do percentil `q` por bootstrap: reamostra os
+    tempos com reposição e pega os quantis da estatística reamostrada.
+    """
+    rng = random.Random(SEED)
+    estimates = [percentile(rng.choices(values, k=len(values)), q) for _ in range(RESAMPLES)]
+    tail = (1 - confidence) * 100 / 2
+    return percentile(estimates, tail), percentile(estimates, 100 - tail)
+
+
+def summarize(times: Sequence[float], flops: float) -> Dict[str, Any]:
+    """
+    Mediana, p95 e seus intervalos de confiança, mais a vazão em GFLOP/s.
+    """
+    median_ci = bootstrap_ci(times, 50)
+    return {
+        "times": list(times),
+        "median": statistics.median(times),
+        "median_ci": list(median_ci),
+        "p95": percentile(times, 95),
+        "p95_ci": list(bootstrap_ci(times, 95)),
+        "gflops": flops / statistics.median(times) / 1e9,
+        "gflops_ci": [flops / median_ci[1] / 1e9, flops / median_ci[0] / 1e9],
+    }
+
+
+def bench_key(record: Dict[str, Any]) -> Tuple[Any, ...]:
+    """
+    Identifica uma configuração da varredura (para comparar execuções).
+    """
+    bench = record["bench"]
+    return (
+        tuple(record["shape"]), record["dtype"]["C"], record["kernel"],
+        bench["wire"], record["num_clients"], bench["chunks_per_client"],
+    )
+
+
+def describe_key(key: Tuple[Any, ...]) -> str:
+    shape, dtype, kernel, wire, workers, chunks = key
+    return f"{'x'.join(map(str, shape))} {dtype} {kernel} {wire} {workers} cliente(s) {chunks} bloco(s)/cliente"
+
+
+class WorkerPool:
+    """
+    Coordenador numa porta efêmera com `count` clientes locais em processos
+    próprios. Ao fechar, o coordenador manda "exit" e os processos terminam.
+    """
+
+    def __init__(self, count: int, kernel: str, wire: str):
+        self.count = count
+        self.coordinator = Coordinator("127.0.0.1", 0).start()
+        # Os clientes importam matmul do mesmo lugar que este processo
+        src = os.path.dirname(os.path.dirname(os.path.abspath(matmul.__file__)))
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [src, os.environ.get("PYTHONPATH")])))
+        command = [
+            sys.executable, "-m", "matmul.client.main",
+            "--port", str(self.coordinator.port), "--kernel", kernel, "--wire", wire,
+        ]
+        self.processes = [
+            subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL, stdin=subprocess.DEVNULL)
+            for _ in range(count)
+        ]
+
+    def __enter__(self) -> "WorkerPool":
+        try:
+            self.coordinator.wait_for_workers(self.count, WORKER_TIMEOUT)
+        except BaseException:
+            self.close()
+            raise
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.coordinator.close()
+        for process in self.processes:
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+
+
+def run_config(
+    pool: WorkerPool,
+    A: Any,
+    B: Any,
+    kernel: str,
+    wire: str,
+    chunks_per_client: int,
+    warmup: int,
+    repeats: int,
+    verify: str,
+    baseline: Tuple[Any, Optional[float], bool],
+) -> Dict[str, Any]:
+    """
+    Roda uma configuração: `warmup` execuções descartadas e `repeats`
+    medidas. `baseline` é a referência dos operandos (C_seq, tempo
+    sequencial, estimado?) de analysis.reference. Devolve o registro do job
+    (métricas medianas das execuções) com o bloco "bench".
+    """
+    C_seq, seq_time, seq_estimated = baseline
+    pool.coordinator.chunks_per_client = chunks_per_client
+    for _ in range(warmup):
+        pool.coordinator.submit_job(A, B).result(JOB_TIMEOUT)
+
+    reports = []
+    valid: Optional[bool] = None
+    for _ in range(repeats):
+        C, report = pool.coordinator.submit_job(A, B).result(JOB_TIMEOUT)
+        reports.append(report)
+        ok = check_result(A, B, C, verify, C_seq=C_seq)
+        if ok is not None:
+            valid = ok if valid is None else valid and ok
+
+    times = [report["dist_time"] for report in reports]
+    metrics = {key: statistics.median(report["metrics"][key] for report in reports) for key in reports[0]["metrics"]}
+    # Os blocos por cliente vêm da execução mais próxima da mediana
+    typical = min(reports, key=lambda report: abs(report["dist_time"] - statistics.median(times)))
+
+    record = job_record(
+        A, B, MODE_BENCH, kernel, typical["num_clients"], typical["division"], statistics.median(times),
+        metrics, typical["chunks_done"], seq_time, seq_estimated, verify, valid, run=repeats,
+    )
+    record["bench"] = {
+        "wire": wire,
+        "chunks_per_client": chunks_per_client,
+        "warmup": warmup,
+        "repeats": repeats,
+        **summarize(times, 2 * len(A) * len(B) * len(B[0])),
+    }
+    record["name"] = describe_key(bench_key(record))
+    return record
+
+
+def print_summary(record: Dict[str, Any]) -> None:
+    bench = record["bench"]
+    print(
+        f"[BENCH] {record['name']}: mediana {bench['median']:.4f} s "
+        f"[{bench['median_ci'][0]:.4f}, {bench['median_ci'][1]:.4f}], "
+        f"p95 {bench['p95']:.4f} s, {bench['gflops']:.3f} GFLOP/s"
+        + ("" if record["valid"] in (None, True) else " ⚠️ resultado inválido")
+    )
+
+
+def load_baseline(path: str) -> Dict[Tuple[Any, ...], Dict[str, Any]]:
+    """
+    Registros de uma varredura anterior, por configuração (a última vence).
+    """
+    baseline = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if "bench" in record:
+                baseline[bench_key(record)] = record
+    return baseline
+
+
+def is_regression(record: Dict[str, Any], reference: Dict[str, Any], tolerance: float) -> bool:
+    """
+    Regressão: a mediana piorou mais que `tolerance` e os intervalos de
+    confiança das medianas não se sobrepõem (não é ruído da medição).
+    """
+    new, old = record["bench"], reference["bench"]
+    return new["median"] > old["median"] * (1 + tolerance) and new["median_ci"][0] > old["median_ci"][1]
+
+
+def compare(records: List[Dict[str, Any]], baseline: Dict[Tuple[Any, ...], Dict[str, Any]], tolerance: float) -> int:
+    """
+    Compara cada configuração com a referência e imprime a razão das
+    medianas. Devolve o número de regressões.
+    """
+    regressions = 0
+    print(f"\n[BENCH] Comparação com a referência (folga {tolerance:.0%})")
+    for record in records:
+        reference = baseline.get(bench_key(record))
+        if reference is None:
+            print(f"  {record['name']}: sem referência")
+            continue
+        ratio = record["bench"]["median"] / reference["bench"]["median"]
+        regressed = is_regression(record, reference, tolerance)
+        regressions += regressed
+        print(f"  {record['name']}: {ratio:.2f}x o tempo da referência" + (" ❌ REGRESSÃO" if regressed else ""))
+    return regressions
+
+
+def main(
+    sizes: Sequence[int],
+    workers: Sequence[int],
+    kernels: Sequence[str],
+    wires: Sequence[str],
+    chunks: Sequence[int],
+    dtype: Optional[str],
+    warmup: int,
+    repeats: int,
+    verify: str,
+    calibration_path: Optional[str],
+    output: str,
+    baseline_path: Optional[str],
+    tolerance: float,
+) -> int:
+    calibration = Calibration(calibration_path) if calibration_path else None
+    baseline = load_baseline(baseline_path) if baseline_path else None
+    log = JobLog(output)
+    print(f"[BENCH] Registros em {output} (JSON lines)")
+
+    # Operandos fixos por tamanho: as mesmas matrizes em todas as configurações
+    operands = {}
+    for n in sizes:
+        random.seed(n)
+        if np is not None:
+            np.random.seed(n)
+        operands[n] = generate_operands(n, n, n, dtype)
+    # Referência (C_seq no modo full, tempo sequencial) uma vez por operandos e kernel
+    references: Dict[Tuple[int, str], Tuple[Any, Optional[float], bool]] = {}
+
+    records = []
+    for count in workers:
+        for kernel in kernels:
+            for wire in wires:
+                print(f"[BENCH] {count} cliente(s), kernel {kernel}, fio {wire}")
+                with WorkerPool(count, kernel, wire) as pool:
+                    for n in sizes:
+                        A, B = operands[n]
+                        if (n, kernel) not in references:
+                            references[(n, kernel)] = reference(A, B, kernel, verify, calibration)
+                        for chunks_per_client in chunks:
+                            record = run_config(
+                                pool, A, B, kernel, wire, chunks_per_client, warmup, repeats, verify, references[(n, kernel)],
+                            )
+                            log.write(record)
+                            records.append(record)
+                            print_summary(record)
+
+    invalid = sum(record["valid"] is False for record in records)
+    regressions = compare(records, baseline, tolerance) if baseline is not None else 0
+    print(f"\n[BENCH] {len(records)} configuração(ões) gravadas em {output}")
+    if invalid or regressions:
+        print(f"[BENCH] {invalid} resultado(s) inválido(s), {regressions} regressão(ões)")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bancada de desempenho ponta a ponta com clientes locais")
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=list(SIZES_DEFAULT),
+        help=f"Tamanhos n das matrizes n x n (padrão: {' '.join(map(str, SIZES_DEFAULT))})",
+    )
+    parser.add_argument(
+        "--workers", type=int, nargs="+", default=list(WORKERS_DEFAULT),
+        help=f"Números de clientes locais (padrão: {' '.join(map(str, WORKERS_DEFAULT))})",
+    )
+    parser.add_argument(
+        "--kernels", choices=available_kernels(), nargs="+", default=[DEFAULT_KERNEL],
+        help=f"Kernels dos clientes (padrão: {DEFAULT_KERNEL})",
+    )
+    parser.add_argument(
+        "--wires", choices=[WIRE_BINARY, WIRE_JSON], nargs="+", default=[WIRE_BINARY],
+        help=f"Formatos de fio dos clientes (padrão: {WIRE_BINARY})",
+    )
+    parser.add_argument(
+        "--chunks", type=int, nargs="+", default=[CHUNKS_PER_CLIENT_DEFAULT],
+        help=f"Blocos por cliente (padrão: {CHUNKS_PER_CLIENT_DEFAULT})",
+    )
+    parser.add_argument(
+        "--dtype", choices=DTYPES, default=None,
+        help="dtype das matrizes (padrão: listas de inteiros do Python)",
+    )
+    parser.add_argument(
+        "--warmup", type=int, default=WARMUP_DEFAULT,
+        help=f"Execuções descartadas por configuração (padrão: {WARMUP_DEFAULT})",
+    )
+    parser.add_argument(
+        "--repeats", type=int, default=REPEATS_DEFAULT,
+        help=f"Execuções medidas por configuração (padrão: {REPEATS_DEFAULT})",
+    )
+    parser.add_argument(
+        "--verify", choices=VERIFY_MODES, default=VERIFY_DEFAULT,
+        help=f"Validação de cada execução medida (padrão: {VERIFY_DEFAULT})",
+    )
+    parser.add_argument(
+        "--calibration", default=None,
+        help="Arquivo de calibração para estimar o tempo sequencial e o speedup",
+    )
+    parser.add_argument(
+        "--output", default=OUTPUT_DEFAULT,
+        help=f"Arquivo JSON lines dos resultados (padrão: {OUTPUT_DEFAULT})",
+    )
+    parser.add_argument(
+        "--compare", default=None,
+        help="Resultados anteriores (JSON lines) para acusar regressões de vazão",
+    )
+    parser.add_argument(
+        "--tolerance", type=float, default=TOLERANCE_DEFAULT,
+        help=f"Piora relativa da mediana tolerada antes de acusar regressão (padrão: {TOLERANCE_DEFAULT})",
+    )
+    args = parser.parse_args()
+    if args.repeats < 1 or args.warmup < 0:
+        parser.error("--repeats deve ser >= 1 e --warmup >= 0")
+    if min(args.workers) < 1 or min(args.chunks) < 1:
+        parser.error("--workers e --chunks devem ser >= 1")
+    sys.exit(main(
+        args.sizes, args.workers, args.kernels, args.wires, args.chunks, args.dtype, args.warmup,
+        args.repeats, args.verify, args.calibration, args.output, args.compare, args.tolerance,
+    ))
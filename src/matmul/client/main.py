@@ -1,31 +1,123 @@
 import socket
 import argparse
+import queue
+import threading
 import time
 import struct
-from typing import Tuple
+from typing import Any, Dict, Optional
 
-from matmul.utils.matrix_utils import multiply, print_matrix, Matrix
-from matmul.utils.protocol import send_json, recv_json
+from matmul.utils.matrix_utils import print_matrix, Matrix
+from matmul.utils.kernels import (
+    DEFAULT_KERNEL,
+    NUMPY_KERNELS,
+    available_kernels,
+    get_kernel,
+    multiply_with,
+    set_strassen_leaf,
+)
+from matmul.utils.cache import LRUCache
+from matmul.utils.compression import COMPRESS_AUTO, COMPRESS_OFF, available_codecs, codecs_for_mode, make_compressor
+from matmul.client.pool import LocalProcessPool
+from matmul.utils.protocol import (
+    send_message,
+    recv_message,
+    client_handshake,
+    matrix_digest,
+    PHASES_KEY,
+    WIRE_BINARY,
+    WIRE_JSON,
+)
 
 
 HOST_DEFAULT = "127.0.0.1"
 PORT_DEFAULT = 5000
+B_CACHE_MB_DEFAULT = 256
+# Linhas por parte de resultado enviada (0 = bloco inteiro numa mensagem só)
+STREAM_ROWS_DEFAULT = 0
 
 
-def main(host: str, port: int, verbose: bool) -> None:
-    print(f"[CLIENTE] Iniciando cliente. Conectando a {host}:{port}...")
+def receive_loop(
+    sock: socket.socket,
+    inbox: "queue.Queue[Optional[Dict[str, Any]]]",
+    b_cache: LRUCache,
+    as_numpy: bool,
+) -> None:
+    """
+    Thread de recepção: lê mensagens do servidor enquanto a thread principal
+    calcula, para que a tarefa k+1 chegue durante a computação da tarefa k.
+
+    Matrizes B vão direto para o cache; tarefas e o comando de saída entram
+    na fila `inbox`, na ordem de chegada. None na fila indica conexão perdida.
+    Cada tarefa leva em PHASES_KEY os tempos de recepção e decodificação.
+    """
+    while True:
+        phases: Dict[str, float] = {}
+        try:
+            data = recv_message(sock, as_numpy, phases=phases)
+        except (ConnectionError, OSError, struct.error):
+            inbox.put(None)
+            return
+
+        if data.get("type") == "store_b":
+            b_cache.put(data["b_id"], data["B"])
+            print(f"[CLIENTE] Matriz B {data['b_id'][:8]} guardada em cache.")
+            continue
+
+        if data.get("type") == "task":
+            data[PHASES_KEY] = phases
+        inbox.put(data)
+        if data.get("type") == "exit":
+            return
+
+
+def main(
+    host: str,
+    port: int,
+    verbose: bool,
+    wire: str = WIRE_BINARY,
+    kernel: str = DEFAULT_KERNEL,
+    b_cache_mb: int = B_CACHE_MB_DEFAULT,
+    processes: int = 1,
+    stream_rows: int = STREAM_ROWS_DEFAULT,
+    compress: str = COMPRESS_AUTO,
+    link_mbps: float = 0.0,
+) -> None:
+    print(f"[CLIENTE] Iniciando cliente (kernel {kernel}, {processes} processo(s)). Conectando a {host}:{port}...")
+
+    kernel_fn = get_kernel(kernel)
+    # Kernels numpy recebem as matrizes direto como ndarray (sem passar por listas)
+    as_numpy = kernel in NUMPY_KERNELS
+    # Matrizes B recentes, indexadas pelo id de conteúdo enviado pelo servidor
+    b_cache = LRUCache(b_cache_mb * 1024 * 1024)
+    # Tarefas recebidas e ainda não calculadas
+    inbox: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue()
+    # Com --processes > 1 cada bloco é repartido entre processos locais
+    pool = LocalProcessPool(processes, kernel) if processes > 1 else None
 
     # 1- abre o socket e conecta no servidor
     with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
         try:
             sock.connect((host, port))
-            print("[CLIENTE] Conectado ao servidor. Aguardando tarefas...")
+            formats = (WIRE_BINARY, WIRE_JSON) if wire == WIRE_BINARY else (WIRE_JSON,)
+            wire_format, codecs = client_handshake(sock, formats, codecs_for_mode(compress), kernel)
+            # Compressão dos resultados enviados (o servidor comprime A e B do seu lado)
+            compressor = make_compressor(codecs, compress, link_mbps)
+            print(
+                f"[CLIENTE] Conectado ao servidor (formato {wire_format}, compressão: "
+                f"{', '.join(codecs) or 'nenhuma'}). Aguardando tarefas..."
+            )
+
+            receiver = threading.Thread(
+                target=receive_loop,
+                args=(sock, inbox, b_cache, as_numpy),
+                daemon=True,
+            )
+            receiver.start()
 
             while True:
-                # 2- recebe a tarefa do servidor
-                try:
-                    data = recv_json(sock)
-                except (ConnectionError, struct.error):
+                # 2- pega a próxima tarefa recebida
+                data = inbox.get()
+                if data is None:
                     print("[CLIENTE] Conexão com o servidor perdida.")
                     break
 
@@ -37,38 +129,77 @@ def main(host: str, port: int, verbose: bool) -> None:
                     print(f"[CLIENTE] Mensagem inesperada do servidor: {data}")
                     continue
 
+                request_id = data.get("request_id")
                 block_index = data["block_index"]
                 A_block: Matrix = data["A_block"]
-                B: Matrix = data["B"]
 
-                print(f"[CLIENTE] Tarefa recebida. Bloco de índice {block_index}.")
+                # B vem por referência (b_id); tarefas antigas ainda podem trazer B inline
+                if "B" in data:
+                    B: Matrix = data["B"]
+                    b_id = matrix_digest(B) if pool is not None else ""
+                else:
+                    b_id = data["b_id"]
+                    B = b_cache.get(data["b_id"])
+                    if B is None:
+                        print(f"[CLIENTE] B {data['b_id'][:8]} fora do cache. Pedindo reenvio...")
+                        send_message(
+                            sock,
+                            {"type": "need_b", "b_id": data["b_id"], "request_id": request_id},
+                            wire_format,
+                            compressor,
+                        )
+                        continue
+
+                print(f"[CLIENTE] Tarefa {request_id} recebida. Bloco de índice {block_index}.")
 
                 if verbose:
                     print_matrix(A_block, f"A_block (bloco {block_index}) recebido")
                     print_matrix(B, "Matriz B recebida")
 
-                # 3- calcula o bloco de C
+                # 3- calcula o bloco de C; com --stream-rows, em partes de linhas que
+                # são enviadas assim que ficam prontas (o servidor grava cada uma em C)
                 print(f"[CLIENTE] Iniciando computação do bloco {block_index}...")
-                start_compute = time.perf_counter()
-                C_block: Matrix = multiply(A_block, B)
-                end_compute = time.perf_counter()
-                compute_time = end_compute - start_compute
-                
-                print(f"[CLIENTE] Tempo de computação (bloco {block_index}): {compute_time:.6f} segundos")
+                step = stream_rows if stream_rows > 0 else max(1, len(A_block))
+                # Fases da tarefa; a recepção e a decodificação vão só na primeira parte
+                task_phases: Dict[str, float] = data.get(PHASES_KEY, {})
+                totals = {"recv": task_phases.get("recv", 0.0), "decode": task_phases.get("decode", 0.0)}
+                totals.update(compute=0.0, encode=0.0)
+                for row_offset in range(0, max(1, len(A_block)), step):
+                    A_part = A_block[row_offset:row_offset + step]
+                    phases = dict(task_phases) if row_offset == 0 else {}
+                    phases["compute_at"] = time.time()
+                    start_compute = time.perf_counter()
+                    if pool is not None:
+                        C_part: Matrix = pool.multiply(A_part, B, b_id)
+                    else:
+                        C_part = multiply_with(kernel_fn, A_part, B)
+                    phases["compute"] = time.perf_counter() - start_compute
 
-                if verbose:
-                    print_matrix(C_block, f"C_block calculado (bloco {block_index})")
+                    if verbose:
+                        print_matrix(C_part, f"C_block calculado (bloco {block_index}, linha {row_offset})")
 
-                # 4- envia o resultado de volta para o servidor
-                response = {
-                    "type": "result",
-                    "block_index": block_index,
-                    "C_block": C_block,
-                }
+                    # 4- envia a parte (ou o bloco inteiro) de volta assim que fica pronta
+                    response = {
+                        "type": "result",
+                        "request_id": request_id,
+                        "block_index": block_index,
+                        "row_offset": row_offset,
+                        "last": row_offset + step >= len(A_block),
+                        "C_block": C_part,
+                    }
+                    send_message(sock, response, wire_format, compressor, phases)
+                    totals["compute"] += phases["compute"]
+                    totals["encode"] += phases["encode"]
 
-                send_json(sock, response)
+                print(
+                    f"[CLIENTE] Fases do bloco {block_index}: recepção {totals['recv']:.6f} s, "
+                    f"decodificação {totals['decode']:.6f} s, computação {totals['compute']:.6f} s, "
+                    f"codificação {totals['encode']:.6f} s"
+                )
                 print(f"[CLIENTE] Resultado do bloco {block_index} enviado ao servidor.")
-                print("[CLIENTE] Aguardando próxima tarefa...\n")
+                if compressor is not None:
+                    print(f"[CLIENTE] Payloads enviados por codec: {compressor.summary()}")
+                print(f"[CLIENTE] Tarefas na fila: {inbox.qsize()}\n")
 
         except ConnectionRefusedError:
             print(f"[CLIENTE] Não foi possível conectar a {host}:{port}. O servidor está ligado?")
@@ -77,6 +208,8 @@ def main(host: str, port: int, verbose: bool) -> None:
         except Exception as e:
             print(f"[CLIENTE] Erro: {e}")
 
+    if pool is not None:
+        pool.close()
     print("[CLIENTE] Conexão encerrada.")
      
 
@@ -101,6 +234,75 @@ if __name__ == "__main__":
         action="store_true",
         help="Mostra as matrizes recebidas e o bloco calculado.",
     )
+    parser.add_argument(
+        "--wire",
+        choices=[WIRE_BINARY, WIRE_JSON],
+        default=WIRE_BINARY,
+        help=f"Formato de mensagem preferido (padrão: {WIRE_BINARY}; json força o formato antigo)",
+    )
+
+    parser.add_argument(
+        "--kernel",
+        choices=available_kernels(),
+        default=DEFAULT_KERNEL,
+        help=f"Kernel de multiplicação (padrão: {DEFAULT_KERNEL})",
+    )
+
+    parser.add_argument(
+        "--strassen-leaf",
+        type=int,
+        default=None,
+        help="Tamanho de folha dos kernels strassen: abaixo dele usa o kernel base (padrão: 64 / 1024 com numpy)",
+    )
+
+    parser.add_argument(
+        "--b-cache-mb",
+        type=int,
+        default=B_CACHE_MB_DEFAULT,
+        help=f"Orçamento de memória do cache de matrizes B em MB (padrão: {B_CACHE_MB_DEFAULT})",
+    )
+
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=1,
+        help="Processos locais para calcular cada bloco (padrão: 1; use o número de núcleos)",
+    )
+
+    parser.add_argument(
+        "--stream-rows",
+        type=int,
+        default=STREAM_ROWS_DEFAULT,
+        help="Envia o resultado em partes de N linhas conforme são calculadas (padrão: 0 = bloco inteiro)",
+    )
+
+    parser.add_argument(
+        "--compress",
+        choices=[COMPRESS_AUTO, COMPRESS_OFF, *available_codecs()],
+        default=COMPRESS_AUTO,
+        help="Compressão dos resultados: auto (pela vazão medida e pela razão de compressão), off ou um codec fixo",
+    )
+
+    parser.add_argument(
+        "--link-mbps",
+        type=float,
+        default=0.0,
+        help="Vazão do enlace em Mbit/s usada pela compressão auto (padrão: 0 = medida nos envios)",
+    )
 
     args = parser.parse_args()
-    main(args.host, args.port, args.verbose)
+    if args.strassen_leaf is not None and args.strassen_leaf < 1:
+        parser.error("--strassen-leaf deve ser >= 1")
+    set_strassen_leaf(args.strassen_leaf)
+    main(
+        args.host,
+        args.port,
+        args.verbose,
+        args.wire,
+        args.kernel,
+        args.b_cache_mb,
+        args.processes,
+        args.stream_rows,
+        args.compress,
+        args.link_mbps,
+    )
@@ -0,0 +1,148 @@
+import atexit
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Tuple
+
+from matmul.utils.matrix_utils import Matrix, split_matrix_by_rows
+from matmul.utils.kernels import NUMPY_KERNELS, STRASSEN_LEAF, get_kernel, multiply_with, restore_strassen_leaf
+from matmul.utils.sparse import is_sparse, vstack_csr
+from matmul.utils.protocol import decode_matrix, encode_matrix, np, payload_size
+
+# Quantas matrizes B ficam publicadas em memória compartilhada ao mesmo tempo
+SHARED_B_MAX = 4
+
+# Cache de cada processo filho: b_id -> (segmento, B já decodificada)
+_child_b: "OrderedDict[str, Tuple[shared_memory.SharedMemory, Any]]" = OrderedDict()
+
+
+def _child_get_b(b_id: str, shm_name: str, desc: Dict[str, Any], as_numpy: bool) -> Any:
+    if b_id in _child_b:
+        _child_b.move_to_end(b_id)
+        return _child_b[b_id][1]
+
+    # O filho compartilha o resource tracker do pai; quem apaga o segmento é sempre o pai
+    shm = shared_memory.SharedMemory(name=shm_name)
+    view = shm.buf[:payload_size(desc)]
+    # Com numpy, B é uma visão direta do segmento (sem cópia); sem numpy, vira lista uma vez por filho
+    B = decode_matrix(desc, view, as_numpy)
+    _child_b[b_id] = (shm, B)
+
+    while len(_child_b) > SHARED_B_MAX:
+        _, (old_shm, old_B) = _child_b.popitem(last=False)
+        del old_B
+        try:
+            old_shm.close()
+        except BufferError:
+            pass
+    return B
+
+
+def _child_release() -> None:
+    # Solta as visões de B antes dos segmentos: no fim do interpretador,
+    # SharedMemory.__del__ não fecha um segmento com visões ainda vivas
+    while _child_b:
+        _, (shm, B) = _child_b.popitem(last=False)
+        del B
+        try:
+            shm.close()
+        except BufferError:
+            pass
+
+
+def _child_init(strassen_leaf: Dict[str, int]) -> None:
+    """
+    Inicializador dos filhos: mesmo tamanho de folha do pai e limpeza do
+    cache de B na saída.
+    """
+    restore_strassen_leaf(strassen_leaf)
+    atexit.register(_child_release)
+
+
+def _child_multiply(
+    kernel: str,
+    A_rows: Matrix,
+    b_id: str,
+    shm_name: str,
+    desc: Dict[str, Any],
+) -> Any:
+    """
+    Executada no processo filho: multiplica um pedaço das linhas de A pela B compartilhada.
+    """
+    as_numpy = kernel in NUMPY_KERNELS
+    B = _child_get_b(b_id, shm_name, desc, as_numpy)
+    return multiply_with(get_kernel(kernel), A_rows, B)
+
+
+class LocalProcessPool:
+    """
+    Reparte cada bloco recebido entre processos locais.
+
+    A conexão com o servidor continua única; o bloco de A é dividido por
+    linhas entre `processes` filhos de um ProcessPoolExecutor. A matriz B é
+    publicada uma vez em multiprocessing.shared_memory e os filhos a leem de
+    lá, em vez de recebê-la serializada a cada tarefa.
+
+    Os filhos são criados com "spawn": o cliente já tem a thread de
+    recepção rodando quando o pool sobe, e um fork com threads ativas pode
+    travar os filhos em locks copiados no meio do uso.
+    """
+
+    def __init__(self, processes: int, kernel: str):
+        self.processes = processes
+        self.kernel = kernel
+        self.executor = ProcessPoolExecutor(
+            max_workers=processes,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_child_init,
+            initargs=(dict(STRASSEN_LEAF),),
+        )
+        # b_id -> (segmento, descritor de forma/dtype)
+        self._shared: "OrderedDict[str, Tuple[shared_memory.SharedMemory, Dict[str, Any]]]" = OrderedDict()
+
+    def _publish_b(self, B: Any, b_id: str) -> Tuple[str, Dict[str, Any]]:
+        if b_id in self._shared:
+            self._shared.move_to_end(b_id)
+            shm, desc = self._shared[b_id]
+            return shm.name, desc
+
+        desc, payload = encode_matrix(B)
+        shm = shared_memory.SharedMemory(create=True, size=max(1, len(payload)))
+        shm.buf[:len(payload)] = payload
+        self._shared[b_id] = (shm, desc)
+
+        # Filhos que ainda usam um segmento antigo mantêm o próprio mapeamento
+        while len(self._shared) > SHARED_B_MAX:
+            _, (old, _) = self._shared.popitem(last=False)
+            old.close()
+            old.unlink()
+        return shm.name, desc
+
+    def multiply(self, A_block: Any, B: Any, b_id: str) -> Any:
+        """
+        Calcula A_block x B dividindo as linhas de A_block entre os processos.
+        """
+        shm_name, desc = self._publish_b(B, b_id)
+        parts = split_matrix_by_rows(A_block, max(1, min(self.processes, len(A_block))))
+        futures = [
+            self.executor.submit(_child_multiply, self.kernel, part, b_id, shm_name, desc)
+            for part in parts
+        ]
+        results = [f.result() for f in futures]
+
+        if is_sparse(results[0]):
+            return vstack_csr(results)
+        if np is not None and isinstance(results[0], np.ndarray):
+            return np.vstack(results)
+        C_block: List[List[Any]] = []
+        for rows in results:
+            C_block.extend(rows)
+        return C_block
+
+    def close(self) -> None:
+        self.executor.shutdown()
+        for shm, _ in self._shared.values():
+            shm.close()
+            shm.unlink()
+        self._shared.clear()
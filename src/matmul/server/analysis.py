@@ -0,0 +1,275 @@
+import random
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from matmul.utils.matrix_utils import Matrix, multiply_transposed
+from matmul.utils.kernels import NUMPY_KERNELS, get_kernel, as_list, multiply_with
+from matmul.utils.sparse import is_sparse, multiply_sparse
+from matmul.utils.protocol import matrix_dtype, np
+
+# Modos de validação do resultado distribuído
+VERIFY_NONE = "none"
+VERIFY_FREIVALDS = "freivalds"
+VERIFY_SPOT = "spot"
+VERIFY_FULL = "full"
+VERIFY_MODES = (VERIFY_NONE, VERIFY_FREIVALDS, VERIFY_SPOT, VERIFY_FULL)
+VERIFY_DEFAULT = VERIFY_FREIVALDS
+
+# Cada rodada de Freivalds deixa passar um C errado com probabilidade <= 1/2
+FREIVALDS_ROUNDS_DEFAULT = 10
+
+# Elementos de C conferidos na validação por amostragem
+SPOT_CHECK_ENTRIES = 64
+
+
+def sequential_baseline(A: Matrix, B: Matrix, kernel: str) -> Tuple[Matrix, float]:
+    """
+    Cálculo sequencial no servidor, para comparação. Usa o mesmo kernel dos
+    clientes para que o speedup compare iguais. Devolve (C_seq, tempo).
+    """
+    print(f"[SERVIDOR] Calculando sequencialmente (kernel {kernel}) para base de comparação...")
+    kernel_fn = get_kernel(kernel)
+    if kernel not in NUMPY_KERNELS:
+        # Como nos clientes: kernels puros recebem listas (ints do Python não estouram)
+        A, B = as_list(A), as_list(B)
+    start_seq = time.perf_counter()
+    C_seq = multiply_with(kernel_fn, A, B)
+    end_seq = time.perf_counter()
+    seq_time = end_seq - start_seq
+    print(f"[SERVIDOR] Tempo sequencial: {seq_time:.4f} s")
+    return as_list(C_seq), seq_time
+
+
+def results_match(C: Any, expected: Any) -> bool:
+    """
+    Compara o resultado distribuído com a referência: exato para inteiros,
+    com tolerância para floats (a ordem das somas muda entre kernels e
+    divisões; float32 tem tolerância maior). Matrizes esparsas são
+    comparadas na forma densa.
+    """
+    if is_sparse(C):
+        C = C.to_dense()
+    if is_sparse(expected):
+        expected = expected.to_dense()
+    if np is None:
+        return as_list(C) == as_list(expected)
+    C_arr = np.asarray(C)
+    expected_arr = np.asarray(expected)
+    if C_arr.shape != expected_arr.shape:
+        return False
+    if C_arr.dtype.kind != "f" and expected_arr.dtype.kind != "f":
+        return bool(np.array_equal(C_arr, expected_arr))
+    rtol = 1e-4 if np.float32 in (C_arr.dtype, expected_arr.dtype) else 1e-7
+    return bool(np.allclose(C_arr, expected_arr, rtol=rtol))
+
+
+def _rtol(*dtypes: str) -> float:
+    return 1e-4 if "float32" in dtypes else 1e-7
+
+
+def _times(M: Any, R: Any) -> Any:
+    # M x R, com R denso e estreito (poucas colunas): O(n²) para M n x n
+    if is_sparse(M):
+        P = multiply_sparse(M, R)
+    elif np is not None:
+        return np.asarray(M).astype(R.dtype, copy=False) @ R
+    else:
+        P = multiply_transposed(M, R)
+    return np.asarray(P, dtype=R.dtype) if np is not None else P
+
+
+def _close(x: Any, y: Any, rtol: float, scale: float) -> bool:
+    if isinstance(x, int) and isinstance(y, int):
+        return x == y
+    return abs(x - y) <= rtol * scale
+
+
+def freivalds(A: Any, B: Any, C: Any, rounds: int = FREIVALDS_ROUNDS_DEFAULT) -> bool:
+    """
+    Teste de Freivalds: para vetores r aleatórios de 0/1, confere se
+    C r == A (B r). Custa O(n²) por rodada em vez de O(n³); um C errado passa
+    com probabilidade no máximo 2^-rounds. As rodadas são feitas juntas, como
+    uma matriz R de `rounds` colunas. Inteiros são comparados exatamente
+    (em int64, inclusive módulo 2^64); floats com tolerância relativa ao
+    maior elemento de A (B R), então erros menores que ela em um único
+    elemento de C podem passar.
+    """
+    cols = len(B[0]) if not is_sparse(B) else B.shape[1]
+    dtypes = (matrix_dtype(A), matrix_dtype(B), matrix_dtype(C))
+    floats = any(dtype.startswith("float") for dtype in dtypes)
+
+    if np is not None:
+        R = np.random.default_rng().integers(0, 2, size=(cols, rounds)).astype(np.float64 if floats else np.int64)
+        CR = _times(C, R)
+        ABR = _times(A, _times(B, R))
+        if not floats:
+            return bool(np.array_equal(CR, ABR))
+        scale = float(np.abs(ABR).max()) if ABR.size else 0.0
+        return bool(np.allclose(CR, ABR, rtol=0.0, atol=_rtol(*dtypes) * scale))
+
+    R = [[random.randint(0, 1) for _ in range(rounds)] for _ in range(cols)]
+    CR = _times(C, R)
+    ABR = _times(A, _times(B, R))
+    scale = max((abs(x) for row in ABR for x in row), default=0)
+    return all(
+        _close(x, y, _rtol(*dtypes), scale)
+        for CR_i, ABR_i in zip(CR, ABR)
+        for x, y in zip(CR_i, ABR_i)
+    )
+
+
+def _python(values: Any) -> List[Any]:
+    # Escalares do Python: int8 x int8 somado em numpy estouraria
+    return [x.item() if hasattr(x, "item") else x for x in values]
+
+
+def _dense_row(M: Any, i: int) -> List[Any]:
+    if is_sparse(M):
+        return _python(M.to_csr().row_slice(i, i + 1).to_dense()[0])
+    return _python(M[i])
+
+
+def spot_check(A: Any, B: Any, C: Any, samples: int = SPOT_CHECK_ENTRIES) -> bool:
+    """
+    Confere `samples` elementos C[i][j] sorteados contra A[i] . B[:, j],
+    somados em Python (inteiros exatos, floats com tolerância). O(n) por
+    elemento: serve para jobs grandes demais para recalcular.
+    """
+    rows = len(A)
+    cols = len(B[0]) if not is_sparse(B) else B.shape[1]
+    rtol = _rtol(matrix_dtype(A), matrix_dtype(B), matrix_dtype(C))
+    B_cols = B.to_csc() if is_sparse(B) else B
+
+    entries: Dict[int, List[int]] = {}
+    for _ in range(samples):
+        entries.setdefault(random.randrange(rows), []).append(random.randrange(cols))
+
+    for i, js in entries.items():
+        A_i = _dense_row(A, i)
+        C_i = _dense_row(C, i)
+        for j in js:
+            if is_sparse(B_cols):
+                B_j = _python(row[0] for row in B_cols.col_slice(j, j + 1).to_dense())
+            else:
+                B_j = _python(B_cols[k][j] for k in range(len(A_i)))
+            terms = [a * b for a, b in zip(A_i, B_j)]
+            if not _close(C_i[j], sum(terms), rtol, sum(map(abs, terms))):
+                return False
+    return True
+
+
+def reference(
+    A: Any,
+    B: Any,
+    kernel: str,
+    verify: str,
+    calibration: Any = None,
+) -> Tuple[Optional[Matrix], Optional[float], bool]:
+    """
+    Referência de um job antes da execução distribuída: (C_seq, tempo
+    sequencial, tempo estimado?). Só o modo `full` recalcula C no servidor;
+    nos outros o tempo sequencial vem da calibração (None se não houver).
+    """
+    if verify == VERIFY_FULL:
+        C_seq, seq_time = sequential_baseline(A, B, kernel)
+        return C_seq, seq_time, False
+    seq_time = calibration.estimate(kernel, A, B) if calibration is not None else None
+    if seq_time is not None:
+        print(f"[SERVIDOR] Tempo sequencial estimado pela calibração: {seq_time:.4f} s")
+    return None, seq_time, True
+
+
+def check_result(
+    A: Any,
+    B: Any,
+    C: Any,
+    verify: str,
+    rounds: int = FREIVALDS_ROUNDS_DEFAULT,
+    C_seq: Optional[Matrix] = None,
+) -> Optional[bool]:
+    """
+    Valida o resultado distribuído no modo `verify` (None no modo `none`).
+    """
+    if verify == VERIFY_NONE:
+        return None
+    if verify == VERIFY_FULL:
+        return results_match(C, C_seq)
+    if verify == VERIFY_SPOT:
+        return spot_check(A, B, C)
+    return freivalds(A, B, C, rounds)
+
+
+def describe_verify(verify: str, rounds: int = FREIVALDS_ROUNDS_DEFAULT) -> str:
+    if verify == VERIFY_FREIVALDS:
+        return f"Freivalds, {rounds} rodadas"
+    if verify == VERIFY_SPOT:
+        return f"{SPOT_CHECK_ENTRIES} elementos amostrados"
+    if verify == VERIFY_FULL:
+        return "recálculo sequencial"
+    return "sem validação"
+
+
+def print_validation(verify: str, rounds: int, valid: Optional[bool]) -> None:
+    if valid is None:
+        print("[SERVIDOR] Validação desativada (--verify none)\n")
+        return
+    print(f"[SERVIDOR] Validação ({describe_verify(verify, rounds)}): Resultado distribuído == A x B? {valid}\n")
+
+
+def print_analysis(
+    seq_time: Optional[float],
+    dist_time: float,
+    metrics: Dict[str, float],
+    num_clients: int,
+    chunks_done: Dict[Any, int],
+    chunks_description: str,
+    seq_estimated: bool = False,
+) -> None:
+    """
+    Imprime a análise de desempenho de um job distribuído (sem speedup se
+    `seq_time` for None; `seq_estimated` marca tempos vindos da calibração).
+    """
+    time_parallel_computation = metrics["time_compute"] / num_clients
+
+    print("\n" + "="*70)
+    print("ANÁLISE DE DESEMPENHO")
+    print("="*70)
+    if seq_time is None:
+        print("⏱️  Tempo SEQUENCIAL:              (não calculado)")
+    elif seq_estimated:
+        print(f"⏱️  Tempo SEQUENCIAL:              {seq_time:.6f} segundos (calibração)")
+    else:
+        print(f"⏱️  Tempo SEQUENCIAL:              {seq_time:.6f} segundos")
+    print(f"⏱️  Tempo DISTRIBUÍDO (total):     {dist_time:.6f} segundos")
+    print()
+    print("📊 DECOMPOSIÇÃO DO TEMPO DISTRIBUÍDO:")
+    print(f"   • Overhead de divisão:         {metrics['overhead_split']:.6f} s")
+    print(f"   • Overhead de comunicação:     {metrics['overhead_send']:.6f} s")
+    print(f"   • Computação paralela (média): {time_parallel_computation:.6f} s")
+    print(f"   • Overhead de reconstrução:    {metrics['overhead_reconstruct']:.6f} s")
+    if "client_recv" in metrics:
+        # Fases informadas pelos clientes, em média por cliente como a computação
+        print("   Nos clientes (média por cliente):")
+        print(f"   • Recepção da tarefa:          {metrics['client_recv'] / num_clients:.6f} s")
+        print(f"   • Decodificação:               {metrics['client_decode'] / num_clients:.6f} s")
+        print(f"   • Codificação do resultado:    {metrics['client_encode'] / num_clients:.6f} s")
+        print(f"   • Tarefa enviada → resultado:  {metrics['time_round_trip'] / num_clients:.6f} s")
+    print()
+    print(f"🧩 BLOCOS POR CLIENTE ({chunks_description}):")
+    for addr, count in chunks_done.items():
+        print(f"   • {addr}: {count}")
+    print()
+    if seq_time is None:
+        print("="*70)
+        return
+    print("🚀 MÉTRICAS DE PARALELISMO:")
+    speedup = seq_time / dist_time
+    efficiency = speedup / num_clients * 100
+    print(f"   • Speedup:                     {speedup:.2f}x")
+    print(f"   • Eficiência:                  {efficiency:.1f}%")
+
+    if speedup > 1.0:
+        print(f"   ✅ Distribuído é {speedup:.2f}x MAIS RÁPIDO!")
+    else:
+        print(f"   ⚠️  Distribuído é {1/speedup:.2f}x MAIS LENTO (overhead domina)")
+    print("="*70)
@@ -0,0 +1,851 @@
+import asyncio
+import itertools
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from matmul.utils.matrix_utils import Matrix, describe_operands, generate_operands
+from matmul.utils.kernels import DEFAULT_KERNEL
+from matmul.utils.compression import AdaptiveCompressor, COMPRESS_AUTO, codecs_for_mode, make_compressor
+from matmul.utils.protocol import (
+    read_message,
+    write_message,
+    server_handshake_async,
+    Sink,
+    WIRE_JSON,
+    WRITTEN_KEY,
+)
+from matmul.utils.matrix_io import FileJob, create_output, open_file_job
+from matmul.server.analysis import (
+    FREIVALDS_ROUNDS_DEFAULT,
+    VERIFY_DEFAULT,
+    check_result,
+    print_analysis,
+    print_validation,
+    reference,
+)
+from matmul.server.calibration import Calibration
+from matmul.server.output import ResultAssembler
+from matmul.server.result_cache import CachedJob, ResultCache
+from matmul.server.job_log import JobLog, job_record
+from matmul.server.trace import Timeline, add_phase_metrics, client_phases, phase_metrics
+from matmul.server.live_metrics import JOB_CACHED, LiveMetrics
+from matmul.server.tuner import LOCAL_DESCRIPTION, LOCAL_WORKER, Tuner, run_local
+from matmul.server.strassen import (
+    combine_products,
+    describe as describe_strassen,
+    merge_metrics,
+    top_level_operands,
+)
+from matmul.server.scheduler import (
+    Chunk,
+    ChunkScheduler,
+    CHUNKS_PER_CLIENT_DEFAULT,
+    PARTITION_AUTO,
+    PARTITION_ROWS,
+    CHUNK_TIMEOUT_DEFAULT,
+    POLL_INTERVAL,
+    WINDOW_DEFAULT,
+    result_dtype,
+)
+
+# Prioridade de um job quando não informada (maior = atendido antes)
+PRIORITY_DEFAULT = 0
+
+
+class AsyncJob:
+    """
+    Uma multiplicação em andamento no coordenador assíncrono.
+    """
+
+    def __init__(
+        self,
+        scheduler: ChunkScheduler,
+        overhead_split: float,
+        out: Any = None,
+        priority: int = PRIORITY_DEFAULT,
+    ):
+        self.scheduler = scheduler
+        self.priority = priority
+        # C pré-alocada; as partes de resultado são gravadas conforme chegam
+        self.assembler = ResultAssembler(scheduler, out)
+        self.metrics: Dict[str, float] = {
+            "overhead_split": overhead_split,
+            "overhead_send": 0.0,
+            "time_compute": 0.0,
+            "overhead_reconstruct": 0.0,
+            "queue_wait": 0.0,
+            "bytes_sent": 0,
+            "bytes_received": 0,
+            **phase_metrics(),
+        }
+        self.chunks_done: Dict[Any, int] = {}
+        self.done = asyncio.Event()
+        # Blocos em voo deste job (compartilhamento justo na JobQueue)
+        self.in_flight = 0
+        # Ordem de chegada na fila (desempate entre jobs da mesma prioridade)
+        self.order = 0
+        self.submitted_at = time.perf_counter()
+        self.first_dispatch_at: Optional[float] = None
+        # Rótulo dos blocos deste job na linha do tempo
+        self.label = ""
+        # Limite de clientes do job (auto-tuner; None = todo o pool) e quem já recebeu blocos
+        self.max_workers: Optional[int] = None
+        self.workers: Set[Any] = set()
+        # Job rodado no servidor pelo auto-tuner (sem blocos distribuídos)
+        self.local = False
+
+    @property
+    def description(self) -> str:
+        return LOCAL_DESCRIPTION if self.local else self.scheduler.description
+
+    def accepts(self, owner: Any) -> bool:
+        """
+        O cliente `owner` pode receber blocos deste job (dentro do limite de clientes).
+        """
+        return self.max_workers is None or owner in self.workers or len(self.workers) < self.max_workers
+
+    def add_result(self, index: int, parts: List[Dict[str, float]], round_trip: float, addr: Any) -> None:
+        """
+        Registra um bloco completo (a última parte já foi gravada pelo assembler)
+        com as fases informadas pelo cliente em cada parte.
+        """
+        add_phase_metrics(self.metrics, parts, round_trip)
+        self.chunks_done[addr] = self.chunks_done.get(addr, 0) + 1
+        if self.assembler.done:
+            self.done.set()
+
+
+class JobQueue:
+    """
+    Fila de blocos de vários jobs simultâneos sobre o mesmo pool de clientes.
+
+    A cada pedido de um despachante, escolhe o job de maior prioridade que
+    ainda tem blocos pendentes. Entre jobs da mesma prioridade vale o
+    compartilhamento justo: ganha o que tem menos blocos em voo (empate: o
+    mais antigo). Assim um job pequeno não fica esperando um grande terminar
+    e nenhum cliente fica ocioso enquanto houver blocos de qualquer job.
+    Com `speculate`, um cliente sem blocos pendentes recebe cópias de
+    retardatários (veja ChunkScheduler.straggler).
+    """
+
+    def __init__(self, speculate: bool = False) -> None:
+        self.speculate = speculate
+        self._jobs: List[AsyncJob] = []
+        self._counter = itertools.count()
+        self._wakeup = asyncio.Event()
+
+    def add_job(self, job: AsyncJob) -> None:
+        job.order = next(self._counter)
+        self._jobs.append(job)
+        self._wakeup.set()
+
+    def requeue(self, job: AsyncJob, chunk: Chunk, owner: Any) -> bool:
+        """
+        O cliente `owner` caiu com o bloco em voo: ele volta para a frente da
+        fila do job (se nenhuma cópia especulativa ainda estiver rodando).
+        """
+        job.in_flight -= 1
+        # O cliente caiu: libera a vaga dele no limite de clientes do job
+        job.workers.discard(owner)
+        requeued = job.scheduler.fail(chunk, owner)
+        if requeued and job not in self._jobs:
+            self._jobs.append(job)
+        self._wakeup.set()
+        return requeued
+
+    def task_done(self, job: AsyncJob) -> None:
+        job.in_flight -= 1
+
+    def _by_priority(self) -> List[AsyncJob]:
+        self._jobs = [job for job in self._jobs if not job.scheduler.complete]
+        return sorted(self._jobs, key=lambda job: (-job.priority, job.in_flight, job.order))
+
+    def _take(self, owner: Any) -> Optional[Tuple[AsyncJob, Chunk]]:
+        jobs = [job for job in self._by_priority() if job.accepts(owner)]
+        for job in jobs:
+            chunk = job.scheduler.next_chunk(owner)
+            if chunk is not None:
+                return job, chunk
+        if self.speculate:
+            for job in jobs:
+                chunk = job.scheduler.straggler(owner)
+                if chunk is not None:
+                    print(f"[SERVIDOR] Bloco {chunk[0]} atrasado: cópia especulativa para {owner}.")
+                    return job, chunk
+        return None
+
+    async def get(self, owner: Any = None) -> Tuple[AsyncJob, Chunk]:
+        while True:
+            taken = self._take(owner)
+            if taken is not None:
+                job, chunk = taken
+                job.in_flight += 1
+                job.workers.add(owner)
+                if job.first_dispatch_at is None:
+                    job.first_dispatch_at = time.perf_counter()
+                    job.metrics["queue_wait"] = job.first_dispatch_at - job.submitted_at
+                return job, chunk
+            self._wakeup.clear()
+            if not self.speculate:
+                await self._wakeup.wait()
+                continue
+            # Com especulação, acorda de tempos em tempos para procurar retardatários
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+
+
+class AsyncWorker:
+    """
+    Cliente conectado ao coordenador assíncrono.
+    """
+
+    def __init__(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+        addr: Any,
+        wire_format: str = WIRE_JSON,
+        window: int = WINDOW_DEFAULT,
+        compressor: Optional[AdaptiveCompressor] = None,
+        kernel: Optional[str] = None,
+    ):
+        self.reader = reader
+        self.writer = writer
+        self.addr = addr
+        self.wire_format = wire_format
+        self.compressor = compressor
+        # Kernel anunciado no handshake (None para clientes antigos)
+        self.kernel = kernel
+        # Ids das matrizes B que este cliente já recebeu
+        self.cached_b: Set[str] = set()
+        # Limita quantos blocos ficam em voo neste cliente ao mesmo tempo
+        self.slots = asyncio.Semaphore(window)
+        # request_id -> (job, bloco, instante em que a tarefa terminou de ser enviada)
+        self.pending: Dict[int, Tuple[AsyncJob, Chunk, float]] = {}
+        # request_id -> (início do envio, fases de cada parte de resultado já recebida)
+        self.phases: Dict[int, Tuple[float, List[Dict[str, float]]]] = {}
+        self.request_ids = itertools.count()
+        # O cliente atende em ordem: um bloco só começa quando o anterior termina
+        self.last_result_at = 0.0
+
+    async def send(self, data: Dict[str, Any]) -> int:
+        return await write_message(self.writer, data, self.wire_format, self.compressor)
+
+    async def send_chunk(self, job: AsyncJob, chunk: Chunk, request_id: Optional[int] = None) -> None:
+        """
+        Envia B (se o cliente ainda não tiver) e a tarefa do bloco.
+        """
+        index, A_block, B_block, b_id = chunk
+        t_send_start = time.perf_counter()
+        if request_id is None:
+            request_id = next(self.request_ids)
+            self.phases[request_id] = (t_send_start, [])
+        # Registra antes de qualquer await: se a conexão cair no meio, o bloco é recolocado na fila
+        self.pending[request_id] = (job, chunk, t_send_start)
+
+        nbytes = 0
+        if b_id not in self.cached_b:
+            nbytes += await self.send({"type": "store_b", "b_id": b_id, "B": B_block})
+            self.cached_b.add(b_id)
+        nbytes += await self.send({
+            "type": "task",
+            "request_id": request_id,
+            "block_index": index,
+            "A_block": A_block,
+            "b_id": b_id,
+        })
+        t_send_end = time.perf_counter()
+
+        job.metrics["overhead_send"] += t_send_end - t_send_start
+        job.metrics["bytes_sent"] += nbytes
+        if request_id in self.pending:
+            self.pending[request_id] = (job, chunk, t_send_end)
+
+
+class AsyncCoordinator:
+    """
+    Coordenador baseado em asyncio.start_server.
+
+    Clientes podem entrar e sair a qualquer momento. Cada cliente tem um
+    despachante que mantém até `window` blocos em voo e um leitor que recebe
+    os resultados; os blocos de um cliente que sai (ou que passa de
+    `chunk_timeout` segundos num bloco) voltam para a fila.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        allowed: Tuple[str, ...],
+        window: int = WINDOW_DEFAULT,
+        chunk_timeout: float = CHUNK_TIMEOUT_DEFAULT,
+        speculate: bool = False,
+        compress: str = COMPRESS_AUTO,
+        link_mbps: float = 0.0,
+        result_cache: Optional[ResultCache] = None,
+        timeline: Optional[Timeline] = None,
+        live_metrics: Optional[LiveMetrics] = None,
+        tuner: Optional[Tuner] = None,
+    ):
+        self.host = host
+        self.port = port
+        self.allowed = allowed
+        # Produtos já calculados (jobs e blocos), por hash de conteúdo
+        self.result_cache = result_cache
+        # Linha do tempo por cliente (None: não registrada)
+        self.timeline = timeline
+        # Contadores e histogramas do endpoint /metrics (None: desligado)
+        self.live_metrics = live_metrics
+        # Modelo de custo por job: local x distribuído, clientes e blocos (None: desligado)
+        self.tuner = tuner
+        self.window = max(1, window)
+        self.chunk_timeout = chunk_timeout
+        # Modo de compressão e vazão informada do enlace (0 = medir)
+        self.compress = compress
+        self.link_mbps = link_mbps
+        self.workers: Dict[Any, AsyncWorker] = {}
+        self.jobs = JobQueue(speculate)
+        self._membership = asyncio.Condition()
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._handlers: Set[asyncio.Task] = set()
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._on_connect, self.host, self.port)
+        # Porta 0: o sistema escolhe uma livre; guarda a porta real para os clientes
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+        for worker in list(self.workers.values()):
+            try:
+                await worker.send({"type": "exit"})
+            except Exception:
+                pass
+        # Espera os clientes fecharem a conexão para encerrar os handlers sem cancelá-los
+        if self._handlers:
+            await asyncio.wait(self._handlers, timeout=5)
+        # Clientes travados não respondem ao exit: fecha a conexão do nosso lado
+        if self._handlers:
+            for worker in list(self.workers.values()):
+                worker.writer.close()
+            await asyncio.wait(self._handlers, timeout=5)
+        if self._server is not None:
+            await self._server.wait_closed()
+        if self.live_metrics is not None:
+            self.live_metrics.close()
+
+    async def wait_for_workers(self, count: int) -> None:
+        async with self._membership:
+            await self._membership.wait_for(lambda: len(self.workers) >= count)
+
+    async def _on_connect(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        handler = asyncio.current_task()
+        self._handlers.add(handler)
+        try:
+            await self._serve(reader, writer)
+        finally:
+            self._handlers.discard(handler)
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        addr = writer.get_extra_info("peername")
+        try:
+            wire_format, codecs, kernel = await server_handshake_async(
+                reader, writer, self.allowed, codecs_for_mode(self.compress)
+            )
+        except (asyncio.IncompleteReadError, ConnectionError) as e:
+            print(f"[SERVIDOR] Handshake falhou com {addr}: {e}")
+            writer.close()
+            return
+
+        compressor = make_compressor(codecs, self.compress, self.link_mbps)
+        worker = AsyncWorker(reader, writer, addr, wire_format, self.window, compressor, kernel)
+        async with self._membership:
+            self.workers[addr] = worker
+            self._membership.notify_all()
+        if self.live_metrics is not None:
+            self.live_metrics.worker_connected(addr)
+        print(
+            f"[SERVIDOR] Cliente conectado: {addr} [{wire_format}, compressão: {', '.join(codecs) or 'nenhuma'}, "
+            f"kernel {kernel or '?'}] ({len(self.workers)} no pool)"
+        )
+
+        dispatcher = asyncio.create_task(self._dispatch(worker))
+        # Conexão fechada sem blocos em voo é uma saída normal; o resto conta como erro
+        failed = False
+        try:
+            await self._read_results(worker)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            failed = bool(worker.pending)
+        except asyncio.TimeoutError:
+            print(f"[SERVIDOR] Cliente {addr} excedeu o limite de {self.chunk_timeout:.1f} s por bloco.")
+            failed = True
+        except Exception as e:
+            print(f"[SERVIDOR] Erro ao comunicar com cliente {addr}: {e}")
+            failed = True
+        finally:
+            dispatcher.cancel()
+            async with self._membership:
+                self.workers.pop(addr, None)
+            # Blocos que estavam em voo neste cliente voltam para a fila
+            requeued = 0
+            for request_id, (job, chunk, _) in worker.pending.items():
+                job.assembler.discard(chunk[0], (addr, request_id))
+                requeued += self.jobs.requeue(job, chunk, addr)
+            if worker.pending:
+                print(f"[SERVIDOR] {requeued} bloco(s) de {addr} recolocados na fila.")
+            if self.live_metrics is not None:
+                self.live_metrics.worker_disconnected(addr, failed, requeued)
+            worker.pending.clear()
+            worker.phases.clear()
+            writer.close()
+            print(f"[SERVIDOR] Cliente desconectado: {addr} ({len(self.workers)} no pool)")
+
+    async def _dispatch(self, worker: AsyncWorker) -> None:
+        while True:
+            await worker.slots.acquire()
+            job, chunk = await self.jobs.get(worker.addr)
+            await worker.send_chunk(job, chunk)
+
+    async def _next_message(
+        self,
+        worker: AsyncWorker,
+        sink: Sink,
+        phases: Optional[Dict[str, float]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Lê a próxima mensagem do cliente. Com `chunk_timeout`, levanta
+        asyncio.TimeoutError se o bloco em execução passar do prazo; a leitura
+        só é cancelada nesse caso, quando a conexão vai ser descartada.
+        """
+        read = asyncio.ensure_future(read_message(worker.reader, sink=sink, phases=phases))
+        if self.chunk_timeout <= 0:
+            return await read
+        try:
+            while True:
+                timeout = self.chunk_timeout
+                if worker.pending:
+                    oldest = min(t_sent for _, _, t_sent in worker.pending.values())
+                    deadline = max(oldest, worker.last_result_at) + self.chunk_timeout
+                    timeout = deadline - time.perf_counter()
+                    if timeout <= 0:
+                        raise asyncio.TimeoutError()
+                done, _ = await asyncio.wait({read}, timeout=timeout)
+                if done:
+                    return read.result()
+        except BaseException:
+            read.cancel()
+            raise
+
+    async def _read_results(self, worker: AsyncWorker) -> None:
+        def sink(header: Dict[str, Any], desc: Dict[str, Any]) -> Optional[memoryview]:
+            entry = worker.pending.get(header.get("request_id"))
+            if header.get("type") != "result" or entry is None:
+                return None
+            job, chunk, _ = entry
+            return job.assembler.sink(chunk[0], header.get("row_offset", 0), desc)
+
+        while True:
+            wire: Dict[str, float] = {}
+            response = await self._next_message(worker, sink, wire)
+            kind = response.get("type")
+            # Bytes recebidos contam para o job da tarefa (resultado ou pedido de B)
+            entry = worker.pending.get(response.get("request_id"))
+            if entry is not None:
+                entry[0].metrics["bytes_received"] += wire["bytes"]
+
+            if kind == "need_b":
+                # O cliente descartou B do cache: reenvia B e a mesma tarefa
+                worker.cached_b.discard(response["b_id"])
+                if entry is not None:
+                    job, chunk, _ = entry
+                    await worker.send_chunk(job, chunk, response["request_id"])
+                continue
+
+            if kind != "result":
+                print(f"[SERVIDOR] Resposta inesperada do cliente {worker.addr}: {response}")
+                continue
+
+            if entry is None:
+                continue
+            job, _, t_sent = entry
+            request_id = response["request_id"]
+
+            written = "C_block" in response.get(WRITTEN_KEY, ())
+            block = None if written else response["C_block"]
+            last = response.get("last", True)
+            completed = job.assembler.add_part(
+                response["block_index"], response.get("row_offset", 0), block, last, (worker.addr, request_id)
+            )
+            t_dispatch, parts = worker.phases[request_id]
+            parts.append(client_phases(response))
+            # Partes intermediárias não liberam a janela
+            if not last:
+                worker.last_result_at = time.perf_counter()
+                continue
+
+            del worker.pending[request_id]
+            del worker.phases[request_id]
+            self.jobs.task_done(job)
+            index = response["block_index"]
+            job.scheduler.finish(index, worker.addr)
+            t_received = time.perf_counter()
+            round_trip = t_received - max(t_sent, worker.last_result_at)
+            worker.last_result_at = t_received
+            # Só o primeiro resultado de cada bloco conta (cópias especulativas)
+            if completed:
+                job.add_result(index, parts, round_trip, worker.addr)
+                if self.timeline is not None:
+                    self.timeline.record(
+                        worker.addr, job.label, index, job.scheduler.queued_at(index),
+                        t_dispatch, t_sent, t_received, parts,
+                    )
+                if self.live_metrics is not None:
+                    self.live_metrics.chunk_done(worker.addr, round_trip, parts)
+            worker.slots.release()
+
+    async def run_job(
+        self,
+        A: Matrix,
+        B: Matrix,
+        chunks_per_client: int = CHUNKS_PER_CLIENT_DEFAULT,
+        partition: str = PARTITION_AUTO,
+        out: Any = None,
+        priority: int = PRIORITY_DEFAULT,
+    ) -> Tuple[Matrix, AsyncJob, float, int]:
+        """
+        Distribui A x B entre os clientes do pool e espera todos os blocos.
+        C é gravada em `out` (por exemplo, um np.memmap) se for informado.
+        Vários run_job podem rodar ao mesmo tempo; a JobQueue intercala os
+        blocos pela `priority` (maior primeiro) e por compartilhamento justo.
+        Com o auto-tuner, o job pode rodar no servidor ou usar só parte do
+        pool. Devolve (C, job, tempo distribuído, clientes do job).
+        """
+        await self.wait_for_workers(1)
+        num_clients = len(self.workers)
+        plan = self.tuner.plan(A, B, num_clients) if self.tuner is not None else None
+        if plan is not None:
+            print(f"[SERVIDOR] Auto-tuner: {plan.describe()}")
+            if plan.local:
+                return await self._run_local(A, B, out, priority)
+            num_clients = plan.workers
+            chunks_per_client = plan.chunks_per_client
+
+        start_time = time.perf_counter()
+        t_split_start = time.perf_counter()
+        # A divisão (hash de B, fatias) roda numa thread para não travar os outros jobs
+        loop = asyncio.get_running_loop()
+        scheduler = await loop.run_in_executor(
+            None, ChunkScheduler.for_clients, A, B, num_clients, chunks_per_client, partition
+        )
+        t_split_end = time.perf_counter()
+        print(f"[SERVIDOR] Divisão: {scheduler.description}")
+
+        job = AsyncJob(scheduler, t_split_end - t_split_start, out, priority)
+        if plan is not None:
+            job.max_workers = plan.workers
+        if self.timeline is not None:
+            job.label = self.timeline.new_job()
+        if self.live_metrics is not None:
+            self.live_metrics.job_started(scheduler)
+        cached = await loop.run_in_executor(None, CachedJob, self.result_cache, A, B, out, scheduler, job.assembler)
+        if cached.describe() is not None:
+            print(f"[SERVIDOR] Cache de resultados: {cached.describe()}")
+        if cached.C is not None:
+            dist_time = time.perf_counter() - start_time
+            if self.live_metrics is not None:
+                self.live_metrics.job_finished(scheduler, dist_time, job.metrics, JOB_CACHED)
+            return cached.C, job, dist_time, num_clients
+
+        if job.assembler.done:
+            job.done.set()
+        else:
+            self.jobs.add_job(job)
+
+        await job.done.wait()
+        end_time = time.perf_counter()
+
+        t_reconstruct_start = time.perf_counter()
+        C = job.assembler.result()
+        if hasattr(C, "flush"):
+            C.flush()
+        job.metrics["overhead_reconstruct"] = time.perf_counter() - t_reconstruct_start
+        await loop.run_in_executor(None, cached.store, C)
+        if self.live_metrics is not None:
+            self.live_metrics.job_finished(scheduler, end_time - start_time, job.metrics)
+
+        return C, job, end_time - start_time, num_clients
+
+    async def _run_local(self, A: Matrix, B: Matrix, out: Any, priority: int) -> Tuple[Matrix, AsyncJob, float, int]:
+        """
+        Job que o auto-tuner manda rodar no servidor (numa thread, sem travar
+        os outros jobs). O AsyncJob devolvido só carrega as métricas.
+        """
+        loop = asyncio.get_running_loop()
+        C, elapsed = await loop.run_in_executor(None, run_local, A, B, self.tuner.kernel, out)
+        job = AsyncJob(ChunkScheduler.for_clients(A, B, 1, 1, PARTITION_ROWS), 0.0, None, priority)
+        job.local = True
+        job.metrics["time_compute"] = elapsed
+        job.chunks_done[LOCAL_WORKER] = 1
+        if self.live_metrics is not None:
+            self.live_metrics.job_finished(None, elapsed, job.metrics)
+        return C, job, elapsed, 1
+
+    async def run_strassen_job(
+        self,
+        A: Matrix,
+        B: Matrix,
+        chunks_per_client: int = CHUNKS_PER_CLIENT_DEFAULT,
+        partition: str = PARTITION_AUTO,
+        out: Any = None,
+        priority: int = PRIORITY_DEFAULT,
+    ) -> Tuple[Any, List[AsyncJob], float, int]:
+        """
+        Calcula A x B pelo primeiro nível de Strassen-Winograd: os 7 produtos
+        de metade do tamanho viram jobs independentes, intercalados no pool
+        como quaisquer outros, e C é montada aqui com as 15 somas.
+        Devolve (C, jobs dos 7 produtos, tempo distribuído, clientes no início).
+        """
+        await self.wait_for_workers(1)
+        num_clients = len(self.workers)
+        print(f"[SERVIDOR] Divisão: {describe_strassen(A, B)}")
+
+        start_time = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        pairs = await loop.run_in_executor(None, top_level_operands, A, B)
+        t_operands = time.perf_counter() - start_time
+
+        results = await asyncio.gather(
+            *(self.run_job(X, Y, chunks_per_client, partition, None, priority) for X, Y in pairs)
+        )
+        jobs = [job for _, job, _, _ in results]
+
+        t_combine_start = time.perf_counter()
+        C = await loop.run_in_executor(
+            None, combine_products, [P for P, _, _, _ in results], len(A), len(B[0]), result_dtype(A, B)
+        )
+        if out is not None:
+            out[:] = C
+            C = out
+            if hasattr(C, "flush"):
+                C.flush()
+        jobs[0].metrics["overhead_split"] += t_operands
+        jobs[0].metrics["overhead_reconstruct"] += time.perf_counter() - t_combine_start
+
+        return C, jobs, time.perf_counter() - start_time, num_clients
+
+
+async def _run_distributed(
+    coordinator: AsyncCoordinator,
+    A: Matrix,
+    B: Matrix,
+    chunks_per_client: int,
+    partition: str,
+    out: Any = None,
+    strassen: bool = False,
+) -> Tuple[Any, Dict[str, float], Dict[Any, int], str, float, int]:
+    # Job único ou os 7 produtos de Strassen; devolve o necessário para print_analysis
+    if strassen:
+        C, jobs, dist_time, num_clients = await coordinator.run_strassen_job(A, B, chunks_per_client, partition, out)
+        metrics, chunks_done = merge_metrics(jobs)
+        return C, metrics, chunks_done, describe_strassen(A, B), dist_time, num_clients
+    C, job, dist_time, num_clients = await coordinator.run_job(A, B, chunks_per_client, partition, out)
+    return C, job.metrics, job.chunks_done, job.description, dist_time, num_clients
+
+
+async def run_multiplication_async(
+    coordinator: AsyncCoordinator,
+    rows_A: int,
+    cols_A: int,
+    cols_B: int,
+    kernel: str = DEFAULT_KERNEL,
+    chunks_per_client: int = CHUNKS_PER_CLIENT_DEFAULT,
+    partition: str = PARTITION_AUTO,
+    dtype: Optional[str] = None,
+    density: Optional[float] = None,
+    sparse_b: bool = False,
+    strassen: bool = False,
+    verify: str = VERIFY_DEFAULT,
+    verify_rounds: int = FREIVALDS_ROUNDS_DEFAULT,
+    calibration: Optional[Calibration] = None,
+    job_log: Optional[JobLog] = None,
+) -> None:
+    rows_B = cols_A
+
+    print(f"\n[SERVIDOR] Gerando matrizes A ({rows_A}x{cols_A}) e B ({rows_B}x{cols_B})...")
+    A, B = generate_operands(rows_A, cols_A, cols_B, dtype, density, sparse_b)
+    print(f"[SERVIDOR] Representação: {describe_operands(A, B)}")
+
+    # Referência (numa thread, para o laço de eventos continuar aceitando clientes)
+    loop = asyncio.get_running_loop()
+    C_seq, seq_time, seq_estimated = await loop.run_in_executor(None, reference, A, B, kernel, verify, calibration)
+
+    print("[SERVIDOR] Iniciando cálculo distribuído...")
+    C, metrics, chunks_done, description, dist_time, num_clients = await _run_distributed(
+        coordinator, A, B, chunks_per_client, partition, None, strassen
+    )
+
+    print_analysis(seq_time, dist_time, metrics, num_clients, chunks_done, description, seq_estimated)
+
+    # Validação
+    valid = await loop.run_in_executor(None, check_result, A, B, C, verify, verify_rounds, C_seq)
+    print_validation(verify, verify_rounds, valid)
+    if job_log is not None:
+        job_log.write(job_record(
+            A, B, "async", kernel, num_clients, description, dist_time, metrics, chunks_done,
+            seq_time, seq_estimated, verify, valid,
+        ))
+
+
+async def run_file_multiplication_async(
+    coordinator: AsyncCoordinator,
+    files: FileJob,
+    chunks_per_client: int = CHUNKS_PER_CLIENT_DEFAULT,
+    partition: str = PARTITION_AUTO,
+    strassen: bool = False,
+    kernel: str = DEFAULT_KERNEL,
+    verify: str = VERIFY_DEFAULT,
+    verify_rounds: int = FREIVALDS_ROUNDS_DEFAULT,
+    calibration: Optional[Calibration] = None,
+    job_log: Optional[JobLog] = None,
+) -> None:
+    A, B, out_spec = open_file_job(files)
+    print(f"\n[SERVIDOR] Matrizes em arquivo: A {A.shape} ({files[0]}), B {B.shape} ({files[1]})")
+    C_out = create_output(out_spec, A.shape[0], B.shape[1], result_dtype(A, B))
+    loop = asyncio.get_running_loop()
+    C_seq, seq_time, seq_estimated = await loop.run_in_executor(None, reference, A, B, kernel, verify, calibration)
+
+    print("[SERVIDOR] Iniciando cálculo distribuído...")
+    C, metrics, chunks_done, description, dist_time, num_clients = await _run_distributed(
+        coordinator, A, B, chunks_per_client, partition, C_out, strassen
+    )
+    print(f"[SERVIDOR] Resultado gravado em {out_spec}")
+
+    print_analysis(seq_time, dist_time, metrics, num_clients, chunks_done, description, seq_estimated)
+
+    valid = await loop.run_in_executor(None, check_result, A, B, C, verify, verify_rounds, C_seq)
+    print_validation(verify, verify_rounds, valid)
+    if job_log is not None:
+        job_log.write(job_record(
+            A, B, "async", kernel, num_clients, description, dist_time, metrics, chunks_done,
+            seq_time, seq_estimated, verify, valid,
+        ))
+
+
+async def main_async(
+    host: str,
+    port: int,
+    num_clients: int,
+    allowed: Tuple[str, ...],
+    kernel: str = DEFAULT_KERNEL,
+    chunks_per_client: int = CHUNKS_PER_CLIENT_DEFAULT,
+    partition: str = PARTITION_AUTO,
+    window: int = WINDOW_DEFAULT,
+    files: Optional[FileJob] = None,
+    chunk_timeout: float = CHUNK_TIMEOUT_DEFAULT,
+    speculate: bool = False,
+    compress: str = COMPRESS_AUTO,
+    link_mbps: float = 0.0,
+    dtype: Optional[str] = None,
+    density: Optional[float] = None,
+    sparse_b: bool = False,
+    strassen: bool = False,
+    verify: str = VERIFY_DEFAULT,
+    verify_rounds: int = FREIVALDS_ROUNDS_DEFAULT,
+    calibration: Optional[Calibration] = None,
+    result_cache: Optional[ResultCache] = None,
+    timeline: Optional[Timeline] = None,
+    job_log: Optional[JobLog] = None,
+    live_metrics: Optional[LiveMetrics] = None,
+    tuner: Optional[Tuner] = None,
+) -> None:
+    print(f"[SERVIDOR] Iniciando servidor assíncrono em {host}:{port} (janela {window} por cliente)")
+    print(f"[SERVIDOR] Aguardando conexão de {num_clients} clientes...")
+
+    coordinator = AsyncCoordinator(
+        host, port, allowed,
+        window=window,
+        chunk_timeout=chunk_timeout,
+        speculate=speculate,
+        compress=compress,
+        link_mbps=link_mbps,
+        result_cache=result_cache,
+        timeline=timeline,
+        live_metrics=live_metrics,
+        tuner=tuner,
+    )
+    await coordinator.start()
+    await coordinator.wait_for_workers(num_clients)
+    print("\n[SERVIDOR] Clientes conectados! Iniciando modo interativo (novos clientes podem entrar a qualquer momento).")
+
+    loop = asyncio.get_running_loop()
+
+    async def ask(prompt: str) -> str:
+        return await loop.run_in_executor(None, input, prompt)
+
+    try:
+        while True:
+            print("\n" + "-"*30)
+            print(" MENU PRINCIPAL")
+            print("-" * 30)
+            if files is not None:
+                print(f"1. Nova Multiplicação ({files[0]} x {files[1]} -> {files[2]})")
+            else:
+                print("1. Nova Multiplicação")
+            print("2. Sair")
+
+            opcao = (await ask("Escolha uma opção: ")).strip()
+
+            if opcao == "1" and files is not None:
+                try:
+                    await run_file_multiplication_async(
+                        coordinator, files,
+                        chunks_per_client=chunks_per_client,
+                        partition=partition,
+                        strassen=strassen,
+                        kernel=kernel,
+                        verify=verify,
+                        verify_rounds=verify_rounds,
+                        calibration=calibration,
+                        job_log=job_log,
+                    )
+                except (ValueError, OSError) as e:
+                    print(f"[SERVIDOR] Erro nos arquivos de entrada/saída: {e}")
+            elif opcao == "1":
+                try:
+                    rA = int(await ask("Linhas A: "))
+                    cA = int(await ask("Colunas A (e Linhas B): "))
+                    cB = int(await ask("Colunas B: "))
+                    await run_multiplication_async(
+                        coordinator, rA, cA, cB,
+                        kernel=kernel,
+                        chunks_per_client=chunks_per_client,
+                        partition=partition,
+                        dtype=dtype,
+                        density=density,
+                        sparse_b=sparse_b,
+                        strassen=strassen,
+                        verify=verify,
+                        verify_rounds=verify_rounds,
+                        calibration=calibration,
+                        job_log=job_log,
+                    )
+                except ValueError:
+                    print("Entrada inválida. Use números inteiros.")
+            elif opcao == "2":
+                print("Encerrando servidor e avisando clientes...")
+                break
+            else:
+                print("Opção inválida.")
+
+    except (KeyboardInterrupt, EOFError):
+        print("\nInterrupção manual.")
+    finally:
+        await coordinator.close()
+        if result_cache is not None:
+            print(f"[SERVIDOR] Cache de resultados: {result_cache.summary()}")
+        if timeline is not None:
+            timeline.export()
+        print("[SERVIDOR] Encerrado.")
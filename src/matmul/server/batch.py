@@ -0,0 +1,293 @@
+import json
+import os
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from matmul.utils.matrix_utils import Matrix, describe_operands, generate_operands
+from matmul.utils.compression import COMPRESS_AUTO
+from matmul.utils.dtypes import DTYPES
+from matmul.utils.matrix_io import create_output, open_file_job, parse_spec
+from matmul.server.analysis import (
+    FREIVALDS_ROUNDS_DEFAULT,
+    VERIFY_DEFAULT,
+    VERIFY_MODES,
+    VERIFY_NONE,
+    check_result,
+    reference,
+)
+from matmul.server.calibration import Calibration
+from matmul.server.async_server import PRIORITY_DEFAULT
+from matmul.server.coordinator import Coordinator
+from matmul.server.result_cache import ResultCache
+from matmul.server.trace import Timeline
+from matmul.server.live_metrics import LiveMetrics
+from matmul.server.tuner import Tuner
+from matmul.server.job_log import MODE_MANIFEST, JobLog, job_record
+from matmul.server.scheduler import CHUNK_TIMEOUT_DEFAULT, result_dtype
+
+OUT_FILE_DEFAULT = "C.npy"
+
+
+def load_manifest(path: str) -> Dict[str, Any]:
+    """
+    Lê e valida um manifesto de jobs (JSON):
+
+        {
+          "pipeline": false,
+          "jobs": [
+            {"name": "medio", "shape": [500, 500, 500], "repeat": 3},
+            {"name": "disco", "a_file": "A.npy", "b_file": "B.npy", "out_file": "C.npy"}
+          ]
+        }
+
+    `shape` é [linhas A, colunas A, colunas B] (matrizes geradas); `a_file` /
+    `b_file` aceitam as mesmas especificações de --a-file. Com `pipeline`
+    todos os jobs são submetidos de uma vez ao pool de clientes e seus blocos
+    são intercalados; `priority` (padrão 0, maior primeiro) ordena os jobs.
+    `"verify"` (none, freivalds, spot, full) troca o modo de validação do job
+    (`"baseline": false` equivale a `"verify": "none"`) e `"dtype"` (int8 ...
+    float64) gera as matrizes como ndarray compacto.
+    `"density"` gera A esparsa (CSR) com essa fração de não nulos, e
+    `"sparse_b": true` também B. `"strassen": true` distribui os 7 produtos do
+    primeiro nível de Strassen-Winograd (padrão: --strassen do servidor, que
+    não vale para jobs esparsos nem em arquivo).
+    Cada job em arquivo precisa do próprio `out_file` (padrão: C.npy).
+    """
+    with open(path, encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    jobs = manifest.get("jobs")
+    if not isinstance(jobs, list) or not jobs:
+        raise ValueError(f"{path}: o manifesto precisa de uma lista 'jobs' não vazia")
+    outputs: Dict[str, str] = {}
+    for index, job in enumerate(jobs):
+        job.setdefault("name", f"job{index}")
+        has_shape = "shape" in job
+        has_files = "a_file" in job and "b_file" in job
+        if has_shape == has_files:
+            raise ValueError(f"{path}: o job {job['name']!r} precisa de 'shape' ou de 'a_file' + 'b_file'")
+        if job.get("verify") is not None and job["verify"] not in VERIFY_MODES:
+            raise ValueError(f"{path}: 'verify' do job {job['name']!r} deve ser um de {', '.join(VERIFY_MODES)}")
+        if job.get("dtype") is not None and job["dtype"] not in DTYPES:
+            raise ValueError(f"{path}: dtype do job {job['name']!r} deve ser um de {', '.join(DTYPES)}")
+        if job.get("density") is not None and not 0 < job["density"] <= 1:
+            raise ValueError(f"{path}: 'density' do job {job['name']!r} deve estar em (0, 1]")
+        if has_shape and (len(job["shape"]) != 3 or min(job["shape"]) < 1):
+            raise ValueError(f"{path}: 'shape' do job {job['name']!r} deve ser [linhas A, colunas A, colunas B]")
+        if job.get("strassen") and job.get("density") is not None:
+            raise ValueError(f"{path}: o job {job['name']!r} não pode combinar 'strassen' com 'density'")
+        if job.get("strassen") and has_files:
+            raise ValueError(f"{path}: o job {job['name']!r} não pode combinar 'strassen' com 'a_file' / 'b_file'")
+        if int(job.get("repeat", 1)) < 1:
+            raise ValueError(f"{path}: 'repeat' do job {job['name']!r} deve ser >= 1")
+        if has_files:
+            out = job.get("out_file", OUT_FILE_DEFAULT)
+            out_path = os.path.abspath(parse_spec(out)[0] if ":" in out else out)
+            if out_path in outputs:
+                raise ValueError(
+                    f"{path}: os jobs {outputs[out_path]!r} e {job['name']!r} gravam no mesmo 'out_file' ({out})"
+                )
+            outputs[out_path] = job["name"]
+    return manifest
+
+
+class _PreparedJob:
+    """
+    Entradas de um job do manifesto e o necessário para validar o resultado.
+    """
+
+    def __init__(
+        self,
+        spec: Dict[str, Any],
+        kernel: str,
+        verify: str = VERIFY_DEFAULT,
+        verify_rounds: int = FREIVALDS_ROUNDS_DEFAULT,
+        calibration: Optional[Calibration] = None,
+    ):
+        self.spec = spec
+        self.name = spec["name"]
+        self.out_spec: Optional[str] = None
+        self.verify = VERIFY_NONE if spec.get("baseline", True) is False else spec.get("verify", verify)
+        self.verify_rounds = verify_rounds
+
+        if "shape" in spec:
+            rows_A, cols_A, cols_B = spec["shape"]
+            print(f"\n[SERVIDOR] [{self.name}] Gerando matrizes A ({rows_A}x{cols_A}) e B ({cols_A}x{cols_B})...")
+            self.A: Any
+            self.B: Any
+            self.A, self.B = generate_operands(
+                rows_A, cols_A, cols_B, spec.get("dtype"), spec.get("density"), bool(spec.get("sparse_b", False))
+            )
+            print(f"[SERVIDOR] [{self.name}] Representação: {describe_operands(self.A, self.B)}")
+        else:
+            files = (spec["a_file"], spec["b_file"], spec.get("out_file", OUT_FILE_DEFAULT))
+            self.A, self.B, self.out_spec = open_file_job(files)
+            print(f"\n[SERVIDOR] [{self.name}] Matrizes em arquivo: A {self.A.shape}, B {self.B.shape}")
+
+        self.C_seq: Optional[Matrix]
+        self.seq_time: Optional[float]
+        self.C_seq, self.seq_time, self.seq_estimated = reference(self.A, self.B, kernel, self.verify, calibration)
+        self._out: Any = None
+
+    def output(self) -> Any:
+        """
+        Saída em arquivo de C (None para matrizes geradas). O arquivo é
+        criado uma vez por job e reaproveitado pelas repetições.
+        """
+        if self.out_spec is not None and self._out is None:
+            self._out = create_output(self.out_spec, len(self.A), len(self.B[0]), result_dtype(self.A, self.B))
+        return self._out
+
+    def record(self, run: int, C: Any, report: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Relatório de uma execução, com speedup e validação no modo do job.
+        """
+        record: Dict[str, Any] = {"name": self.name, "run": run}
+        record.update(report)
+        record["seq_time"] = self.seq_time
+        record["seq_estimated"] = self.seq_estimated if self.seq_time else None
+        record["speedup"] = self.seq_time / report["dist_time"] if self.seq_time else None
+        if self.out_spec is not None:
+            record["out_file"] = self.out_spec
+        record["verify"] = self.verify
+        record["valid"] = check_result(self.A, self.B, C, self.verify, self.verify_rounds, self.C_seq)
+        return record
+
+    def log_record(self, kernel: str, record: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Registro JSON lines (veja job_log.job_record) de uma execução já validada.
+        """
+        return job_record(
+            self.A, self.B, MODE_MANIFEST, kernel, record["num_clients"], record["division"],
+            record["dist_time"], record["metrics"], record["chunks_done"], self.seq_time,
+            self.seq_estimated, self.verify, record["valid"], self.name, record["run"],
+        )
+
+
+def run_manifest(
+    coordinator: Coordinator,
+    manifest: Dict[str, Any],
+    kernel: str,
+    strassen: bool = False,
+    verify: str = VERIFY_DEFAULT,
+    verify_rounds: int = FREIVALDS_ROUNDS_DEFAULT,
+    calibration: Optional[Calibration] = None,
+    job_log: Optional[JobLog] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Executa todos os jobs do manifesto e devolve um relatório por execução
+    (também acrescentado ao `job_log`, se houver, assim que o job termina).
+    Com `pipeline`, as repetições de um job em arquivo continuam em série:
+    todas gravam no mesmo `out_file`, e a próxima só é submetida depois que
+    a anterior foi validada.
+    """
+    pipeline = bool(manifest.get("pipeline", False))
+    records: List[Dict[str, Any]] = []
+    submitted: Deque[Tuple[_PreparedJob, int, "Future[Tuple[Any, Dict[str, Any]]]"]] = deque()
+
+    def submit(job: _PreparedJob) -> "Future[Tuple[Any, Dict[str, Any]]]":
+        spec = job.spec
+        return coordinator.submit_job(
+            job.A,
+            job.B,
+            job.output(),
+            int(spec.get("priority", PRIORITY_DEFAULT)),
+            bool(spec.get("strassen", strassen and spec.get("density") is None and "shape" in spec)),
+        )
+
+    def finish(job: _PreparedJob, run: int, future: "Future[Tuple[Any, Dict[str, Any]]]") -> None:
+        C, report = future.result()
+        records.append(job.record(run, C, report))
+        print_record(records[-1])
+        if job_log is not None:
+            job_log.write(job.log_record(kernel, records[-1]))
+
+    for spec in manifest["jobs"]:
+        job = _PreparedJob(spec, kernel, verify, verify_rounds, calibration)
+        repeat = int(spec.get("repeat", 1))
+        if not pipeline:
+            for run in range(repeat):
+                finish(job, run, submit(job))
+            continue
+        runs = 1 if job.out_spec is not None else repeat
+        for run in range(runs):
+            submitted.append((job, run, submit(job)))
+
+    while submitted:
+        job, run, future = submitted.popleft()
+        finish(job, run, future)
+        if job.out_spec is not None and run + 1 < int(job.spec.get("repeat", 1)):
+            submitted.append((job, run + 1, submit(job)))
+
+    return records
+
+
+def print_record(record: Dict[str, Any]) -> None:
+    speedup = f"{record['speedup']:.2f}x" if record["speedup"] else "-"
+    print(
+        f"[SERVIDOR] [{record['name']} #{record['run']}] {record['division']}: "
+        f"{record['dist_time']:.4f} s, speedup {speedup}, válido: {record['valid']}"
+    )
+
+
+def main_batch(
+    host: str,
+    port: int,
+    num_clients: int,
+    allowed: Tuple[str, ...],
+    kernel: str,
+    chunks_per_client: int,
+    partition: str,
+    window: int,
+    manifest_path: str,
+    results_path: str,
+    chunk_timeout: float = CHUNK_TIMEOUT_DEFAULT,
+    speculate: bool = False,
+    compress: str = COMPRESS_AUTO,
+    link_mbps: float = 0.0,
+    strassen: bool = False,
+    verify: str = VERIFY_DEFAULT,
+    verify_rounds: int = FREIVALDS_ROUNDS_DEFAULT,
+    calibration: Optional[Calibration] = None,
+    result_cache: Optional[ResultCache] = None,
+    timeline: Optional[Timeline] = None,
+    job_log: Optional[JobLog] = None,
+    live_metrics: Optional[LiveMetrics] = None,
+    tuner: Optional[Tuner] = None,
+) -> None:
+    """
+    Modo não interativo: espera os clientes, roda o manifesto e grava os resultados em JSON.
+    """
+    manifest = load_manifest(manifest_path)
+    print(f"[SERVIDOR] Manifesto {manifest_path}: {len(manifest['jobs'])} job(s)")
+    print(f"[SERVIDOR] Iniciando servidor em {host}:{port}")
+    print(f"[SERVIDOR] Aguardando conexão de {num_clients} clientes...")
+
+    coordinator = Coordinator(
+        host, port, allowed,
+        window=window,
+        chunks_per_client=chunks_per_client,
+        partition=partition,
+        chunk_timeout=chunk_timeout,
+        speculate=speculate,
+        compress=compress,
+        link_mbps=link_mbps,
+        result_cache=result_cache,
+        timeline=timeline,
+        live_metrics=live_metrics,
+        tuner=tuner,
+    )
+    with coordinator:
+        coordinator.wait_for_workers(num_clients)
+        print("[SERVIDOR] Clientes conectados! Executando o manifesto.")
+        records = run_manifest(coordinator, manifest, kernel, strassen, verify, verify_rounds, calibration, job_log)
+        print("Encerrando servidor e avisando clientes...")
+    if result_cache is not None:
+        print(f"[SERVIDOR] Cache de resultados: {result_cache.summary()}")
+    if timeline is not None:
+        timeline.export()
+
+    with open(results_path, "w", encoding="utf-8") as f:
+        json.dump({"manifest": manifest_path, "kernel": kernel, "jobs": records}, f, indent=2)
+    print(f"[SERVIDOR] Resultados gravados em {results_path}")
@@ -0,0 +1,129 @@
+import argparse
+import json
+import os
+import time
+from typing import Any, Dict, Optional, Sequence
+
+from matmul.utils.matrix_utils import generate_operands
+from matmul.utils.kernels import DEFAULT_KERNEL, NUMPY_KERNELS, as_list, available_kernels, get_kernel, multiply_with
+from matmul.utils.dtypes import DTYPES
+from matmul.utils.protocol import matrix_dtype
+from matmul.utils.sparse import is_sparse
+
+CALIBRATION_DEFAULT = "calibration.json"
+
+# Tamanhos (n x n x n) medidos por padrão: o maior define a taxa usada nas estimativas
+PURE_SIZES = (64, 128, 192)
+NUMPY_SIZES = (256, 512, 1024)
+
+REPEATS = 3
+
+
+def calibration_key(kernel: str, dtype_a: str, dtype_b: str) -> str:
+    return f"{kernel}:{dtype_a}x{dtype_b}"
+
+
+class Calibration:
+    """
+    Tempos sequenciais de referência, medidos à parte e guardados em JSON.
+
+    Cada entrada (kernel e dtypes de A e B) guarda a taxa do kernel em
+    operações de ponto flutuante por segundo (2·n·m·p por produto). O tempo
+    sequencial de um job é estimado a partir dela, sem recalcular C no
+    servidor a cada multiplicação.
+    """
+
+    def __init__(self, path: str = CALIBRATION_DEFAULT):
+        self.path = path
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.entries = json.load(f).get("entries", {})
+
+    def estimate(self, kernel: str, A: Any, B: Any) -> Optional[float]:
+        """
+        Tempo sequencial estimado de A x B com `kernel` (None sem calibração
+        para esse kernel e dtypes, ou se algum operando for esparso).
+        """
+        if is_sparse(A) or is_sparse(B):
+            return None
+        entry = self.entries.get(calibration_key(kernel, matrix_dtype(A), matrix_dtype(B)))
+        if entry is None:
+            return None
+        return 2 * len(A) * len(B) * len(B[0]) / entry["flops_per_s"]
+
+    def measure(self, kernel: str, dtype: Optional[str] = None, sizes: Optional[Sequence[int]] = None) -> Dict[str, Any]:
+        """
+        Mede `kernel` em matrizes quadradas de `sizes` e grava a entrada.
+        """
+        if sizes is None:
+            sizes = NUMPY_SIZES if kernel in NUMPY_KERNELS else PURE_SIZES
+        kernel_fn = get_kernel(kernel)
+        timings: Dict[str, float] = {}
+        key = None
+        for n in sizes:
+            A, B = generate_operands(n, n, n, dtype)
+            key = calibration_key(kernel, matrix_dtype(A), matrix_dtype(B))
+            if kernel not in NUMPY_KERNELS:
+                A, B = as_list(A), as_list(B)
+            best = float("inf")
+            for _ in range(REPEATS):
+                start = time.perf_counter()
+                multiply_with(kernel_fn, A, B)
+                best = min(best, time.perf_counter() - start)
+            timings[str(n)] = best
+            print(f"[CALIBRAÇÃO] {key} {n}x{n}: {best:.4f} s")
+
+        largest = max(sizes)
+        entry = {
+            "sizes": timings,
+            "flops_per_s": 2 * largest ** 3 / timings[str(largest)],
+            "measured_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        self.entries[key] = entry
+        return entry
+
+    def save(self) -> None:
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump({"entries": self.entries}, f, indent=2)
+
+
+def load_calibration(path: str) -> Calibration:
+    """
+    Calibração do servidor; avisa quando não houver arquivo (sem speedup estimado).
+    """
+    calibration = Calibration(path)
+    if not calibration.entries:
+        print(f"[SERVIDOR] Sem calibração em {path}: rode `python -m matmul.server.calibration` para estimar o speedup")
+    return calibration
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Calibração do tempo sequencial de referência")
+    parser.add_argument(
+        "--kernel",
+        choices=available_kernels(),
+        action="append",
+        help=f"Kernel a medir (repita para vários; padrão: {DEFAULT_KERNEL})",
+    )
+    parser.add_argument(
+        "--dtype",
+        choices=DTYPES,
+        action="append",
+        help="dtype das matrizes (repita para vários; padrão: listas de inteiros do Python)",
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", help="Tamanhos n das matrizes n x n medidas")
+    parser.add_argument(
+        "--file",
+        default=CALIBRATION_DEFAULT,
+        help=f"Arquivo JSON da calibração (padrão: {CALIBRATION_DEFAULT})",
+    )
+    args = parser.parse_args()
+
+    calibration = Calibration(args.file)
+    for kernel in args.kernel or [DEFAULT_KERNEL]:
+        for dtype in args.dtype or [None]:
+            entry = calibration.measure(kernel, dtype, args.sizes)
+            print(f"[CALIBRAÇÃO] {kernel} ({dtype or 'listas'}): {entry['flops_per_s'] / 1e6:.1f} MFLOP/s")
+    calibration.save()
+    print(f"[CALIBRAÇÃO] Gravada em {args.file}")
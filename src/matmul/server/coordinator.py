@@ -0,0 +1,217 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Tuple
+
+from matmul.utils.matrix_utils import Matrix
+from matmul.utils.compression import COMPRESS_AUTO
+from matmul.utils.protocol import WIRE_FORMATS
+from matmul.server.async_server import AsyncCoordinator, AsyncJob, PRIORITY_DEFAULT
+from matmul.server.strassen import describe as describe_strassen, merge_metrics
+from matmul.server.result_cache import ResultCache
+from matmul.server.trace import Timeline
+from matmul.server.live_metrics import LiveMetrics, worker_label
+from matmul.server.tuner import Tuner
+from matmul.server.scheduler import (
+    CHUNKS_PER_CLIENT_DEFAULT,
+    CHUNK_TIMEOUT_DEFAULT,
+    PARTITION_AUTO,
+    WINDOW_DEFAULT,
+)
+
+
+def job_report(job: AsyncJob, dist_time: float, num_clients: int) -> Dict[str, Any]:
+    """
+    Métricas de um job em formato serializável (JSON).
+    """
+    return {
+        "shape": [job.scheduler.rows, job.scheduler.cols],
+        "priority": job.priority,
+        "division": job.description,
+        "num_clients": num_clients,
+        "dist_time": dist_time,
+        "metrics": dict(job.metrics),
+        "chunks_done": {worker_label(addr): count for addr, count in job.chunks_done.items()},
+    }
+
+
+def strassen_report(A: Matrix, B: Matrix, jobs: List[AsyncJob], dist_time: float, num_clients: int) -> Dict[str, Any]:
+    """
+    Métricas de um job Strassen: os 7 produtos somados, mais o relatório de cada um.
+    """
+    metrics, chunks_done = merge_metrics(jobs)
+    return {
+        "shape": [len(A), len(B[0])],
+        "priority": jobs[0].priority,
+        "division": describe_strassen(A, B),
+        "num_clients": num_clients,
+        "dist_time": dist_time,
+        "metrics": metrics,
+        "chunks_done": {worker_label(addr): count for addr, count in chunks_done.items()},
+        "products": [job_report(job, dist_time, num_clients) for job in jobs],
+    }
+
+
+class Coordinator:
+    """
+    API programática do coordenador, sem menu interativo.
+
+    Roda um AsyncCoordinator num laço de eventos em thread própria. Cada
+    chamada a `submit` devolve um concurrent.futures.Future; vários jobs
+    podem estar em andamento ao mesmo tempo sobre o mesmo pool de clientes,
+    com os blocos intercalados por prioridade e compartilhamento justo.
+
+        with Coordinator("127.0.0.1", 5000) as coord:
+            coord.wait_for_workers(2)
+            C = coord.submit(A, B).result()
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        allowed: Tuple[str, ...] = WIRE_FORMATS,
+        window: int = WINDOW_DEFAULT,
+        chunks_per_client: int = CHUNKS_PER_CLIENT_DEFAULT,
+        partition: str = PARTITION_AUTO,
+        chunk_timeout: float = CHUNK_TIMEOUT_DEFAULT,
+        speculate: bool = False,
+        compress: str = COMPRESS_AUTO,
+        link_mbps: float = 0.0,
+        result_cache: Optional[ResultCache] = None,
+        timeline: Optional[Timeline] = None,
+        live_metrics: Optional[LiveMetrics] = None,
+        tuner: Optional[Tuner] = None,
+    ):
+        self.host = host
+        self.port = port
+        self.allowed = allowed
+        self.window = window
+        self.chunks_per_client = chunks_per_client
+        self.partition = partition
+        self.chunk_timeout = chunk_timeout
+        self.speculate = speculate
+        self.compress = compress
+        self.link_mbps = link_mbps
+        self.result_cache = result_cache
+        self.timeline = timeline
+        self.live_metrics = live_metrics
+        self.tuner = tuner
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._coordinator: Optional[AsyncCoordinator] = None
+
+    def start(self) -> "Coordinator":
+        """
+        Abre o servidor; clientes podem conectar a partir daqui.
+        """
+        self._thread.start()
+        self._call(self._start()).result()
+        return self
+
+    async def _start(self) -> None:
+        # Criado dentro do laço: as filas e eventos do asyncio pertencem a ele
+        self._coordinator = AsyncCoordinator(
+            self.host, self.port, self.allowed,
+            window=self.window,
+            chunk_timeout=self.chunk_timeout,
+            speculate=self.speculate,
+            compress=self.compress,
+            link_mbps=self.link_mbps,
+            result_cache=self.result_cache,
+            timeline=self.timeline,
+            live_metrics=self.live_metrics,
+            tuner=self.tuner,
+        )
+        await self._coordinator.start()
+        self.port = self._coordinator.port
+
+    def _call(self, coro: Any) -> "Future[Any]":
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    @property
+    def num_workers(self) -> int:
+        return len(self._coordinator.workers) if self._coordinator is not None else 0
+
+    @property
+    def worker_kernels(self) -> Dict[Any, Optional[str]]:
+        """
+        Kernel anunciado por cada cliente no pool (None para clientes antigos).
+        """
+        if self._coordinator is None:
+            return {}
+        return {addr: worker.kernel for addr, worker in list(self._coordinator.workers.items())}
+
+    def wait_for_workers(self, count: int, timeout: Optional[float] = None) -> None:
+        """
+        Bloqueia até haver `count` clientes no pool (TimeoutError se passar de `timeout`).
+        """
+        self._call(self._coordinator.wait_for_workers(count)).result(timeout)
+
+    def submit_job(
+        self,
+        A: Matrix,
+        B: Matrix,
+        out: Any = None,
+        priority: int = PRIORITY_DEFAULT,
+        strassen: bool = False,
+    ) -> "Future[Tuple[Any, Dict[str, Any]]]":
+        """
+        Agenda A x B e devolve um Future de (C, relatório de métricas).
+        Jobs de `priority` maior recebem os clientes primeiro. Com `strassen`
+        os 7 produtos do primeiro nível de Strassen-Winograd são distribuídos
+        como jobs independentes.
+        """
+        return self._call(self._run(A, B, out, priority, strassen))
+
+    def submit(
+        self,
+        A: Matrix,
+        B: Matrix,
+        out: Any = None,
+        priority: int = PRIORITY_DEFAULT,
+        strassen: bool = False,
+    ) -> "Future[Any]":
+        """
+        Agenda A x B e devolve um Future de C.
+        """
+        result: "Future[Any]" = Future()
+        job_future = self.submit_job(A, B, out, priority, strassen)
+
+        def _done(f: "Future[Tuple[Any, Dict[str, Any]]]") -> None:
+            if f.cancelled():
+                result.cancel()
+            elif f.exception() is not None:
+                result.set_exception(f.exception())
+            else:
+                result.set_result(f.result()[0])
+
+        job_future.add_done_callback(_done)
+        return result
+
+    async def _run(self, A: Matrix, B: Matrix, out: Any, priority: int, strassen: bool) -> Tuple[Any, Dict[str, Any]]:
+        if strassen:
+            C, jobs, dist_time, num_clients = await self._coordinator.run_strassen_job(
+                A, B, self.chunks_per_client, self.partition, out, priority
+            )
+            return C, strassen_report(A, B, jobs, dist_time, num_clients)
+        C, job, dist_time, num_clients = await self._coordinator.run_job(
+            A, B, self.chunks_per_client, self.partition, out, priority
+        )
+        return C, job_report(job, dist_time, num_clients)
+
+    def close(self) -> None:
+        """
+        Avisa os clientes, fecha o servidor e para o laço de eventos.
+        """
+        if self._coordinator is not None:
+            self._call(self._coordinator.close()).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    def __enter__(self) -> "Coordinator":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
@@ -0,0 +1,94 @@
+import json
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from matmul.utils.matrix_utils import dimensions
+from matmul.utils.protocol import matrix_dtype
+from matmul.utils.sparse import is_sparse
+from matmul.server.scheduler import result_dtype
+
+# Valor de "mode" nos registros do modo manifesto (os demais usam --mode)
+MODE_MANIFEST = "manifest"
+
+
+def _format(M: Any) -> str:
+    return M.format if is_sparse(M) else "dense"
+
+
+def job_record(
+    A: Any,
+    B: Any,
+    mode: str,
+    kernel: str,
+    num_clients: int,
+    division: str,
+    dist_time: float,
+    metrics: Dict[str, float],
+    chunks_done: Dict[Any, int],
+    seq_time: Optional[float],
+    seq_estimated: bool,
+    verify: str,
+    valid: Optional[bool],
+    name: Optional[str] = None,
+    run: int = 0,
+) -> Dict[str, Any]:
+    """
+    Registro de um job para o log JSON lines: forma, clientes, kernel, dtypes,
+    bytes no fio e os tempos por fase (as métricas de print_analysis).
+    """
+    return {
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "name": name,
+        "run": run,
+        "mode": mode,
+        "kernel": kernel,
+        "shape": [dimensions(A)[0], *dimensions(B)],
+        "dtype": {"A": matrix_dtype(A), "B": matrix_dtype(B), "C": result_dtype(A, B)},
+        "format": {"A": _format(A), "B": _format(B)},
+        "num_clients": num_clients,
+        "division": division,
+        "t_sequential": seq_time,
+        "seq_estimated": seq_estimated if seq_time is not None else None,
+        "t_distributed": dist_time,
+        "speedup": seq_time / dist_time if seq_time is not None and dist_time > 0 else None,
+        "verify": verify,
+        "valid": valid,
+        "bytes_sent": int(metrics.get("bytes_sent", 0)),
+        "bytes_received": int(metrics.get("bytes_received", 0)),
+        "phases": {key: value for key, value in metrics.items() if not key.startswith("bytes_")},
+        "chunks_done": {
+            f"{addr[0]}:{addr[1]}" if isinstance(addr, tuple) else str(addr): count
+            for addr, count in chunks_done.items()
+        },
+    }
+
+
+class JobLog:
+    """
+    Arquivo JSON lines com um registro por job (veja job_record).
+
+    Cada registro é acrescentado e gravado no disco assim que o job termina:
+    varreduras longas não perdem execuções se o servidor cair no meio, e
+    generate_graphs.load_records lê o arquivo direto, sem copiar a saída do
+    console.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def write(self, record: Dict[str, Any]) -> None:
+        line = json.dumps(record)
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+            self.count += 1
+
+
+def make_job_log(path: Optional[str]) -> Optional[JobLog]:
+    if not path:
+        return None
+    print(f"[SERVIDOR] Registros dos jobs em {path} (JSON lines)")
+    return JobLog(path)
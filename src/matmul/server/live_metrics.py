@@ -0,0 +1,271 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from matmul.server.scheduler import ChunkScheduler
+
+# Porta padrão do endpoint /metrics (0 = desligado)
+METRICS_PORT_DEFAULT = 0
+
+# Limites (segundos) dos histogramas de latência
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+INF_BUCKET = 'le="+Inf"'
+
+# Resultado de um job em matmul_jobs_total
+JOB_OK = "ok"
+JOB_CACHED = "cached"
+JOB_FAILED = "failed"
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def worker_label(addr: Any) -> str:
+    return f"{addr[0]}:{addr[1]}" if isinstance(addr, tuple) else str(addr)
+
+
+def _labels(labels: Labels, extra: str = "") -> str:
+    pairs = [f'{key}="{value}"' for key, value in labels]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    """
+    Uma família de métricas (counter, gauge ou histogram), com um valor por
+    combinação de rótulos.
+    """
+
+    def __init__(self, name: str, kind: str, help_text: str, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.kind = kind
+        self.help = help_text
+        self.buckets = tuple(buckets)
+        # rótulos -> valor (counter/gauge) ou [contagens por limite, soma, total] (histogram)
+        self.values: Dict[Labels, Any] = {}
+
+    def inc(self, labels: Labels = (), amount: float = 1) -> None:
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def set(self, labels: Labels, value: float) -> None:
+        self.values[labels] = value
+
+    def observe(self, labels: Labels, value: float) -> None:
+        entry = self.values.get(labels)
+        if entry is None:
+            entry = self.values[labels] = [[0] * len(self.buckets), 0.0, 0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                entry[0][i] += 1
+        entry[1] += value
+        entry[2] += 1
+
+    def render(self, lines: List[str]) -> None:
+        lines.append(f"# HELP {self.name} {self.help}")
+        lines.append(f"# TYPE {self.name} {self.kind}")
+        for labels, value in sorted(self.values.items()):
+            if self.kind != "histogram":
+                lines.append(f"{self.name}{_labels(labels)} {_number(value)}")
+                continue
+            counts, total, count = value
+            for bound, bucket in zip(self.buckets, counts):
+                le = 'le="%s"' % bound
+                lines.append(f"{self.name}_bucket{_labels(labels, le)} {bucket}")
+            lines.append(f"{self.name}_bucket{_labels(labels, INF_BUCKET)} {count}")
+            lines.append(f"{self.name}_sum{_labels(labels)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(labels)} {count}")
+
+
+class LiveMetrics:
+    """
+    Métricas vivas do coordenador no formato texto do Prometheus.
+
+    Os mesmos pontos de medida de print_analysis alimentam contadores e
+    histogramas acumulados desde o início do servidor: jobs e sua duração,
+    blocos e a latência de cada um, bytes no fio, tempo por fase, tempo de
+    cálculo e falhas por cliente. Fila, blocos em execução e clientes
+    conectados são lidos no momento da coleta. `close` fecha o endpoint
+    /metrics que serve estas métricas (veja make_live_metrics).
+
+        taxa de jobs:        rate(matmul_jobs_total[5m])
+        utilização:          rate(matmul_worker_busy_seconds_total[1m])
+        taxa de erro:        rate(matmul_worker_errors_total[5m])
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._active: List[ChunkScheduler] = []
+        self._connected: Dict[str, bool] = {}
+        self._started = time.time()
+        self._server: Optional["MetricsServer"] = None
+        self.jobs = _Metric("matmul_jobs_total", "counter", "Jobs concluídos, por resultado (ok, cached, failed)")
+        self.job_seconds = _Metric("matmul_job_seconds", "histogram", "Tempo distribuído de cada job")
+        self.phase_seconds = _Metric("matmul_phase_seconds", "histogram", "Tempo de cada fase por job (métricas de print_analysis)")
+        self.bytes_sent = _Metric("matmul_bytes_sent_total", "counter", "Bytes enviados aos clientes")
+        self.bytes_received = _Metric("matmul_bytes_received_total", "counter", "Bytes recebidos dos clientes")
+        self.chunks = _Metric("matmul_chunks_total", "counter", "Blocos concluídos, por cliente")
+        self.chunk_seconds = _Metric("matmul_chunk_seconds", "histogram", "Do envio da tarefa ao resultado, por bloco")
+        self.busy = _Metric("matmul_worker_busy_seconds_total", "counter", "Tempo de cálculo informado por cliente")
+        self.requeued = _Metric("matmul_chunks_requeued_total", "counter", "Blocos recolocados na fila após falha do cliente")
+        self.errors = _Metric("matmul_worker_errors_total", "counter", "Clientes que caíram ou estouraram o tempo por bloco")
+        self.worker_up = _Metric("matmul_worker_up", "gauge", "1 enquanto o cliente está no pool")
+        self.last_seen = _Metric("matmul_worker_last_seen_timestamp_seconds", "gauge", "Último resultado (ou conexão) do cliente, em time.time()")
+        self._families = [
+            self.jobs, self.job_seconds, self.phase_seconds, self.bytes_sent, self.bytes_received,
+            self.chunks, self.chunk_seconds, self.busy, self.requeued, self.errors, self.worker_up, self.last_seen,
+        ]
+        self.bytes_sent.inc((), 0)
+        self.bytes_received.inc((), 0)
+
+    def worker_connected(self, addr: Any) -> None:
+        worker = (("worker", worker_label(addr)),)
+        with self._lock:
+            self._connected[worker_label(addr)] = True
+            self.worker_up.set(worker, 1)
+            self.last_seen.set(worker, time.time())
+
+    def worker_disconnected(self, addr: Any, failed: bool = False, requeued: int = 0) -> None:
+        """
+        Cliente saiu do pool; `failed` conta um erro e `requeued` os blocos
+        dele que voltaram para a fila.
+        """
+        worker = (("worker", worker_label(addr)),)
+        with self._lock:
+            self._connected.pop(worker_label(addr), None)
+            self.worker_up.set(worker, 0)
+            if failed:
+                self.errors.inc(worker)
+            if requeued:
+                self.requeued.inc(worker, requeued)
+
+    def chunk_done(self, addr: Any, round_trip: float, parts: List[Dict[str, float]]) -> None:
+        """
+        Bloco concluído por `addr`: `round_trip` do servidor e as fases
+        informadas pelo cliente em cada parte do resultado.
+        """
+        worker = (("worker", worker_label(addr)),)
+        # Como em add_phase_metrics: sem as fases do cliente, vale o round trip
+        if not parts or any("compute" not in phases for phases in parts):
+            compute = round_trip
+        else:
+            compute = sum(phases["compute"] for phases in parts)
+        with self._lock:
+            self.chunks.inc(worker)
+            self.chunk_seconds.observe((), round_trip)
+            self.busy.inc(worker, compute)
+            self.last_seen.set(worker, time.time())
+
+    def job_started(self, scheduler: ChunkScheduler) -> None:
+        with self._lock:
+            self._active.append(scheduler)
+
+    def job_finished(
+        self,
+        scheduler: Optional[ChunkScheduler],
+        dist_time: Optional[float] = None,
+        metrics: Optional[Dict[str, float]] = None,
+        outcome: str = JOB_OK,
+    ) -> None:
+        """
+        Fim de um job (outcome ok, cached ou failed; `scheduler` None para
+        jobs que o auto-tuner rodou no servidor). Jobs que falharam não
+        entram nos histogramas de tempo.
+        """
+        with self._lock:
+            if scheduler in self._active:
+                self._active.remove(scheduler)
+            self.jobs.inc((("outcome", outcome),))
+            if metrics is not None:
+                self.bytes_sent.inc((), metrics.get("bytes_sent", 0))
+                self.bytes_received.inc((), metrics.get("bytes_received", 0))
+            if outcome == JOB_FAILED or metrics is None or dist_time is None:
+                return
+            self.job_seconds.observe((), dist_time)
+            for phase, seconds in metrics.items():
+                if not phase.startswith("bytes_"):
+                    self.phase_seconds.observe((("phase", phase),), seconds)
+
+    def close(self) -> None:
+        """
+        Fecha o endpoint HTTP, liberando a porta; chamado no encerramento do coordenador.
+        """
+        server, self._server = self._server, None
+        if server is not None:
+            server.close()
+
+    def render(self) -> str:
+        with self._lock:
+            lines: List[str] = []
+            gauges = (
+                ("matmul_jobs_in_progress", "Jobs em andamento", len(self._active)),
+                ("matmul_chunks_queued", "Blocos na fila dos jobs em andamento",
+                 sum(scheduler.num_pending for scheduler in self._active)),
+                ("matmul_chunks_running", "Blocos em execução nos clientes",
+                 sum(scheduler.num_running for scheduler in self._active)),
+                ("matmul_workers_connected", "Clientes no pool", len(self._connected)),
+                ("matmul_uptime_seconds", "Segundos desde o início do servidor", time.time() - self._started),
+            )
+            for name, help_text, value in gauges:
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge", f"{name} {_number(value)}"]
+            for family in self._families:
+                family.render(lines)
+        return "\n".join(lines) + "\n"
+
+
+class MetricsServer:
+    """
+    Endpoint HTTP /metrics (http.server da biblioteca padrão) numa thread
+    própria, para o Prometheus ou um curl.
+    """
+
+    def __init__(self, live: LiveMetrics, host: str, port: int):
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if self.path.split("?", 1)[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = live.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args: Any) -> None:
+                # Sem uma linha no console a cada coleta
+                pass
+
+        self._httpd = ThreadingHTTPServer((host, port), Handler)
+        self._httpd.daemon_threads = True
+        self.port = self._httpd.server_address[1]
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+
+    def close(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+def make_live_metrics(host: str, port: int) -> Optional[LiveMetrics]:
+    """
+    Métricas vivas servidas em http://host:port/metrics, ou None se `port` for 0.
+    O endpoint fica com as métricas e fecha com LiveMetrics.close.
+    """
+    if port <= 0:
+        return None
+    live = LiveMetrics()
+    try:
+        server = MetricsServer(live, host, port)
+    except OSError as e:
+        print(f"[SERVIDOR] Não foi possível abrir /metrics na porta {port}: {e}")
+        return None
+    live._server = server
+    print(f"[SERVIDOR] Métricas em http://{host}:{server.port}/metrics")
+    return live
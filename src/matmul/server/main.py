@@ -1,183 +1,711 @@
+import asyncio
+import itertools
+import select
 import socket
 import threading
 import time
 import argparse
-from typing import Dict, List, Tuple, Optional
+from typing import Any, Dict, List, Set, Tuple, Optional
 
 from matmul.utils.matrix_utils import (
-    generate_matrix,
-    split_matrix_by_rows,
+    describe_operands,
+    generate_operands,
     print_matrix,
-    multiply,
     Matrix,
 )
-from matmul.utils.protocol import send_json, recv_json
+from matmul.utils.kernels import DEFAULT_KERNEL, available_kernels, set_strassen_leaf
+from matmul.utils.dtypes import DTYPES
+from matmul.utils.compression import (
+    AdaptiveCompressor,
+    COMPRESS_AUTO,
+    COMPRESS_OFF,
+    available_codecs,
+    codecs_for_mode,
+    make_compressor,
+)
+from matmul.utils.protocol import (
+    send_json,
+    send_message,
+    recv_message,
+    server_handshake,
+    Sink,
+    WIRE_BINARY,
+    WIRE_JSON,
+    WRITTEN_KEY,
+)
+from matmul.server.async_server import main_async
+from matmul.server.batch import main_batch
+from matmul.utils.matrix_io import FileJob, create_output, open_file_job
+from matmul.server.analysis import (
+    FREIVALDS_ROUNDS_DEFAULT,
+    VERIFY_DEFAULT,
+    VERIFY_MODES,
+    check_result,
+    print_analysis,
+    print_validation,
+    reference,
+)
+from matmul.server.calibration import CALIBRATION_DEFAULT, Calibration, load_calibration
+from matmul.server.output import ResultAssembler
+from matmul.server.result_cache import RESULT_CACHE_MB_DEFAULT, CachedJob, ResultCache, make_result_cache
+from matmul.server.job_log import JobLog, job_record, make_job_log
+from matmul.server.trace import Timeline, add_phase_metrics, client_phases, make_timeline, phase_metrics
+from matmul.server.live_metrics import (
+    JOB_CACHED,
+    JOB_FAILED,
+    METRICS_PORT_DEFAULT,
+    LiveMetrics,
+    make_live_metrics,
+)
+from matmul.server.tuner import LOCAL_DESCRIPTION, LOCAL_WORKER, Tuner, make_tuner, run_local
+from matmul.server.scheduler import (
+    Chunk,
+    ChunkScheduler,
+    CHUNKS_PER_CLIENT_DEFAULT,
+    CHUNK_TIMEOUT_DEFAULT,
+    PARTITIONS,
+    PARTITION_AUTO,
+    PARTITION_ROWS,
+    POLL_INTERVAL,
+    WINDOW_DEFAULT,
+    result_dtype,
+)
 
 # CONFIGURAÇÕES DO SERVIDOR
 HOST = "127.0.0.1"   # localhost
 PORT = 5000          # porta do servidor
 
+# Modos de coordenação
+MODE_THREADS = "threads"   # uma thread por cliente, conexões aceitas só no início
+MODE_ASYNC = "async"       # asyncio: clientes entram/saem a qualquer momento, vários blocos em voo
 
-def handle_client_task(
-    conn: socket.socket,
-    addr: Tuple[str, int],
-    block_index: int,
-    A_block: Matrix,
-    B: Matrix,
-    results: Dict[int, Matrix],
-    lock: threading.Lock,
-    metrics: Dict[str, float],
-) -> None:
+# Segundos que uma thread tem para largar o cliente depois que o job termina
+STUCK_CLIENT_GRACE = 10.0
+
+# Arquivo de resultados do modo manifesto
+RESULTS_DEFAULT = "results.json"
+
+
+class ClientConnection:
     """
-    Envia uma tarefa para um cliente JÁ CONECTADO e aguarda o resultado.
+    Cliente já conectado e o estado que o servidor mantém sobre ele.
     """
-    try:
-        # Monta a tarefa para o cliente
-        task = {
-            "type": "task",
-            "block_index": block_index,
-            "A_block": A_block,
-            "B": B,
-        }
+    def __init__(
+        self,
+        conn: socket.socket,
+        addr: Tuple[str, int],
+        wire_format: str = WIRE_JSON,
+        compressor: Optional[AdaptiveCompressor] = None,
+    ):
+        self.conn = conn
+        self.addr = addr
+        self.wire_format = wire_format
+        # Escolhe a compressão dos payloads enviados (None: codecs não negociados)
+        self.compressor = compressor
+        # Ids das matrizes B que este cliente já recebeu (cache do lado do cliente)
+        self.cached_b: Set[str] = set()
+        # Gera o request_id de cada tarefa enviada nesta conexão
+        self.request_ids = itertools.count()
+        # False depois de uma falha: o cliente não recebe mais tarefas
+        self.alive = True
+        # Tarefas de jobs já concluídos (cópias especulativas que perderam);
+        # o resultado ainda vai chegar e deve ser ignorado
+        self.abandoned: Set[int] = set()
+
+    def send(self, data: Dict) -> int:
+        return send_message(self.conn, data, self.wire_format, self.compressor)
+
+    def recv(self, sink: Optional[Sink] = None, phases: Optional[Dict[str, float]] = None) -> Dict:
+        return recv_message(self.conn, sink=sink, phases=phases)
+
+    def close(self) -> None:
+        """
+        Tira o cliente do pool (conexão caiu ou deixou de responder).
+        """
+        self.alive = False
+        # shutdown também destrava outra thread presa num envio para este cliente
+        try:
+            self.conn.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.conn.close()
 
-        # Envia a tarefa (overhead de comunicação)
-        t_send_start = time.perf_counter()
-        send_json(conn, task)
-        t_send_end = time.perf_counter()
 
-        # Aguarda o resultado (tempo de computação no cliente)
-        t_compute_start = time.perf_counter()
-        response = recv_json(conn)
-        t_compute_end = time.perf_counter()
+def ensure_b(client: ClientConnection, B: Matrix, b_id: str) -> int:
+    """
+    Envia B ao cliente uma única vez; depois as tarefas só referenciam o id.
+    Devolve os bytes enviados (0 se o cliente já tinha B).
+    """
+    if b_id in client.cached_b:
+        return 0
+    nbytes = client.send({"type": "store_b", "b_id": b_id, "B": B})
+    client.cached_b.add(b_id)
+    return nbytes
 
-        if response.get("type") != "result":
-            print(f"[SERVIDOR] Resposta inesperada do cliente {addr}: {response}")
-            return
 
-        result_block_index = response["block_index"]
-        C_block = response["C_block"]
+def send_task(client: ClientConnection, request_id: int, chunk: Chunk) -> Tuple[float, int]:
+    """
+    Envia B (se o cliente ainda não tiver) e a tarefa do bloco.
+    Devolve o tempo gasto no envio (overhead de comunicação) e os bytes enviados.
+    """
+    block_index, A_block, B_block, b_id = chunk
+    task = {
+        "type": "task",
+        "request_id": request_id,
+        "block_index": block_index,
+        "A_block": A_block,
+        "b_id": b_id,
+    }
+    t_send_start = time.perf_counter()
+    nbytes = ensure_b(client, B_block, b_id)
+    nbytes += client.send(task)
+    return time.perf_counter() - t_send_start, nbytes
 
-        # Guarda o resultado no dicionário compartilhado
-        with lock:
-            results[result_block_index] = C_block
-            # Acumula métricas
-            metrics["overhead_send"] += (t_send_end - t_send_start)
-            metrics["time_compute"] += (t_compute_end - t_compute_start)
 
-        # print(f"[SERVIDOR] Recebeu resultado do cliente {addr} (bloco {result_block_index})")
+def wait_readable(client: ClientConnection, deadline: Optional[float], scheduler: ChunkScheduler) -> bool:
+    """
+    Espera o próximo dado do cliente. Levanta TimeoutError se passar de
+    `deadline` (perf_counter) e devolve False se o job terminar antes, com os
+    blocos entregues por outros clientes (cópias especulativas).
+    """
+    while True:
+        timeout = POLL_INTERVAL
+        if deadline is not None:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                raise TimeoutError("bloco excedeu o limite de tempo")
+            timeout = min(timeout, remaining)
+        if select.select([client.conn], [], [], timeout)[0]:
+            return True
+        if scheduler.complete:
+            return False
 
-    except Exception as e:
-        print(f"[SERVIDOR] Erro ao comunicar com cliente {addr}: {e}")
 
+def handle_client_task(
+    client: ClientConnection,
+    scheduler: ChunkScheduler,
+    assembler: ResultAssembler,
+    lock: threading.Lock,
+    metrics: Dict[str, float],
+    chunks_done: Dict[Tuple[str, int], int],
+    window: int = WINDOW_DEFAULT,
+    chunk_timeout: float = CHUNK_TIMEOUT_DEFAULT,
+    speculate: bool = False,
+    timeline: Optional[Timeline] = None,
+    job_label: str = "",
+    live_metrics: Optional[LiveMetrics] = None,
+) -> bool:
+    """
+    Atende um cliente JÁ CONECTADO até todos os blocos do job terminarem.
+
+    Mantém até `window` tarefas em voo na conexão: enquanto o cliente calcula
+    um bloco, os próximos já estão chegando. Cada resultado volta com o
+    request_id da tarefa e libera espaço para enviar mais um bloco.
+    Os resultados (inteiros ou em partes de linhas) são gravados direto na
+    matriz C do `assembler`.
+
+    Sem blocos na fila, a thread continua disponível: pega blocos recolocados
+    por clientes que falharam e, com `speculate`, cópias de retardatários.
+    Se a conexão cair ou um bloco passar de `chunk_timeout` segundos, os
+    blocos em voo voltam para a fila, o cliente sai do pool e a função
+    devolve False.
+
+    Cada resultado traz as fases medidas no cliente (recepção,
+    decodificação, computação, codificação); com `timeline`, cada bloco
+    concluído entra na linha do tempo do cliente, e com `live_metrics`, nas
+    métricas do endpoint /metrics.
+    """
+    addr = client.addr
+    # request_id -> (bloco, instante em que a tarefa terminou de ser enviada)
+    in_flight: Dict[int, Tuple[Chunk, float]] = {}
+    # request_id -> (início do envio, fases de cada parte de resultado já recebida)
+    phases_by_request: Dict[int, Tuple[float, List[Dict[str, float]]]] = {}
+    # O cliente atende em ordem: um bloco só começa quando o anterior termina
+    last_result_at = 0.0
+
+    def sink(header: Dict, desc: Dict) -> Optional[memoryview]:
+        entry = in_flight.get(header.get("request_id"))
+        if header.get("type") != "result" or entry is None:
+            return None
+        return assembler.sink(entry[0][0], header.get("row_offset", 0), desc)
 
-def run_multiplication(
-    clients: List[Tuple[socket.socket, Tuple[str, int]]],
-    rows_A: int,
-    cols_A: int,
-    cols_B: int
-) -> None:
-    num_clients = len(clients)
-    rows_B = cols_A
+    try:
+        while not scheduler.complete:
+            # Completa a janela com novos blocos da fila compartilhada (ou retardatários)
+            while len(in_flight) < window:
+                chunk = scheduler.next_chunk(addr)
+                if chunk is None and speculate:
+                    chunk = scheduler.straggler(addr)
+                    if chunk is not None:
+                        print(f"[SERVIDOR] Bloco {chunk[0]} atrasado: cópia especulativa para {addr}.")
+                if chunk is None:
+                    break
+                request_id = next(client.request_ids)
+                # Registra antes de enviar: se o envio falhar, o bloco volta para a fila
+                t_dispatch = time.perf_counter()
+                in_flight[request_id] = (chunk, t_dispatch)
+                phases_by_request[request_id] = (t_dispatch, [])
+                send_time, sent_bytes = send_task(client, request_id, chunk)
+                in_flight[request_id] = (chunk, time.perf_counter())
+                with lock:
+                    metrics["overhead_send"] += send_time
+                    metrics["bytes_sent"] += sent_bytes
+
+            if not in_flight:
+                # Nada a fazer agora: espera blocos recolocados, o fim do job
+                # ou (com especulação) o próximo retardatário
+                scheduler.wait(POLL_INTERVAL if speculate else None)
+                continue
+
+            deadline = None
+            if chunk_timeout > 0:
+                oldest = min(t_sent for _, t_sent in in_flight.values())
+                deadline = max(oldest, last_result_at) + chunk_timeout
+            if not wait_readable(client, deadline, scheduler):
+                break
+            wire: Dict[str, float] = {}
+            response = client.recv(sink, wire)
+            t_received = time.perf_counter()
+            with lock:
+                metrics["bytes_received"] += wire["bytes"]
+
+            # O cliente pode ter descartado B do cache: reenvia e repete a tarefa
+            if response.get("type") == "need_b":
+                client.cached_b.discard(response["b_id"])
+                request_id = response["request_id"]
+                if request_id in client.abandoned:
+                    client.abandoned.discard(request_id)
+                    continue
+                chunk, _ = in_flight[request_id]
+                send_time, sent_bytes = send_task(client, request_id, chunk)
+                in_flight[request_id] = (chunk, time.perf_counter())
+                with lock:
+                    metrics["overhead_send"] += send_time
+                    metrics["bytes_sent"] += sent_bytes
+                continue
+
+            if response.get("type") != "result":
+                raise ValueError(f"resposta inesperada: {response}")
+
+            request_id = response["request_id"]
+            if request_id in client.abandoned:
+                if response.get("last", True):
+                    client.abandoned.discard(request_id)
+                continue
+
+            # Partes intermediárias vão para C e não liberam a janela
+            written = "C_block" in response.get(WRITTEN_KEY, ())
+            block = None if written else response["C_block"]
+            last = response.get("last", True)
+            completed = assembler.add_part(
+                response["block_index"], response.get("row_offset", 0), block, last, (addr, request_id)
+            )
+            t_dispatch, parts = phases_by_request[request_id]
+            parts.append(client_phases(response))
+            if not last:
+                last_result_at = t_received
+                continue
+
+            _, t_sent = in_flight.pop(request_id)
+            del phases_by_request[request_id]
+            t_compute_start = max(t_sent, last_result_at)
+            last_result_at = t_received
+            scheduler.finish(response["block_index"], addr)
+            # Cópia especulativa que chegou depois da outra: descartada
+            if not completed:
+                continue
+
+            with lock:
+                # Acumula métricas
+                add_phase_metrics(metrics, parts, t_received - t_compute_start)
+                chunks_done[addr] = chunks_done.get(addr, 0) + 1
+            if live_metrics is not None:
+                live_metrics.chunk_done(addr, t_received - t_compute_start, parts)
+            if timeline is not None:
+                index = response["block_index"]
+                timeline.record(
+                    addr, job_label, index, scheduler.queued_at(index), t_dispatch, t_sent, t_received, parts
+                )
+
+        # Cópias que ainda estão no cliente, mas cujo bloco outro cliente já entregou
+        client.abandoned.update(in_flight)
+        return True
 
-    print(f"\n[SERVIDOR] Gerando matrizes A ({rows_A}x{cols_A}) e B ({rows_B}x{cols_B})...")
-    A = generate_matrix(rows_A, cols_A)
-    B = generate_matrix(rows_B, cols_B)
+    except Exception as e:
+        print(f"[SERVIDOR] Erro ao comunicar com cliente {addr}: {e}")
+        # Os blocos deste cliente voltam para a fila e ele sai do pool
+        requeued = 0
+        for request_id, (chunk, _) in in_flight.items():
+            assembler.discard(chunk[0], (addr, request_id))
+            requeued += scheduler.fail(chunk, addr)
+        if in_flight:
+            print(f"[SERVIDOR] {requeued} bloco(s) de {addr} recolocados na fila.")
+        if live_metrics is not None:
+            live_metrics.worker_disconnected(addr, True, requeued)
+        client.close()
+        return False
+
+
+def run_distributed(
+    clients: List[ClientConnection],
+    A: Matrix,
+    B: Matrix,
+    chunks_per_client: int = CHUNKS_PER_CLIENT_DEFAULT,
+    partition: str = PARTITION_ROWS,
+    window: int = WINDOW_DEFAULT,
+    out: Any = None,
+    chunk_timeout: float = CHUNK_TIMEOUT_DEFAULT,
+    speculate: bool = False,
+    result_cache: Optional[ResultCache] = None,
+    timeline: Optional[Timeline] = None,
+    live_metrics: Optional[LiveMetrics] = None,
+    tuner: Optional[Tuner] = None,
+) -> Optional[Tuple[Any, Dict[str, float], Dict[Tuple[str, int], int], str, float]]:
+    """
+    Distribui A x B entre os clientes e grava C em `out` (ou numa matriz nova).
+    Clientes que falham saem de `clients` e seus blocos vão para os demais.
+    Devolve (C, métricas, blocos por cliente, descrição da divisão, tempo
+    distribuído), ou None se algum resultado não chegar.
 
-    # Cálculo Sequencial (para comparação)
-    print("[SERVIDOR] Calculando sequencialmente para base de comparação...")
-    start_seq = time.perf_counter()
-    C_seq = multiply(A, B)
-    end_seq = time.perf_counter()
-    seq_time = end_seq - start_seq
-    print(f"[SERVIDOR] Tempo sequencial: {seq_time:.4f} s")
+    Com `tuner`, o modelo de custo do perfil decide se o job roda no próprio
+    servidor ou quantos clientes e blocos por cliente ele usa.
+    """
+    if not clients:
+        print("[SERVIDOR] ERRO: Nenhum cliente disponível no pool.")
+        return None
+
+    pool = clients
+    plan = tuner.plan(A, B, len(clients)) if tuner is not None else None
+    if plan is not None:
+        print(f"[SERVIDOR] Auto-tuner: {plan.describe()}")
+        pool = clients[:plan.workers]
+        chunks_per_client = plan.chunks_per_client
+    if plan is not None and plan.local:
+        C, elapsed = run_local(A, B, tuner.kernel, out)
+        metrics = {
+            "overhead_split": 0.0,
+            "overhead_send": 0.0,
+            "time_compute": elapsed,
+            "overhead_reconstruct": 0.0,
+            "bytes_sent": 0,
+            "bytes_received": 0,
+            **phase_metrics(),
+        }
+        if live_metrics is not None:
+            live_metrics.job_finished(None, elapsed, metrics)
+        return C, metrics, {LOCAL_WORKER: 1}, LOCAL_DESCRIPTION, elapsed
 
-    # Cálculo Distribuído
     print("[SERVIDOR] Iniciando cálculo distribuído...")
     start_time = time.perf_counter()
 
-    # 1. Divisão
+    # 1. Divisão (mais blocos do que clientes, numa fila compartilhada).
+    # Cada bloco leva o id de conteúdo do seu pedaço de B: clientes que já
+    # têm esse pedaço não o recebem de novo.
     t_split_start = time.perf_counter()
-    blocks = split_matrix_by_rows(A, num_clients)
+    scheduler = ChunkScheduler.for_clients(A, B, len(pool), chunks_per_client, partition)
     t_split_end = time.perf_counter()
+    print(f"[SERVIDOR] Divisão: {scheduler.description}")
 
-    results: Dict[int, Matrix] = {}
+    # C é pré-alocada: cada resultado é gravado na sua posição assim que chega
+    assembler = ResultAssembler(scheduler, out)
     metrics: Dict[str, float] = {
         "overhead_split": t_split_end - t_split_start,
         "overhead_send": 0.0,
         "time_compute": 0.0,
         "overhead_reconstruct": 0.0,
+        "bytes_sent": 0,
+        "bytes_received": 0,
+        **phase_metrics(),
     }
+    chunks_done: Dict[Tuple[str, int], int] = {client.addr: 0 for client in pool}
     lock = threading.Lock()
+    if live_metrics is not None:
+        live_metrics.job_started(scheduler)
+
+    # Jobs e blocos já calculados saem do cache em vez de ir para os clientes
+    cached = CachedJob(result_cache, A, B, out, scheduler, assembler)
+    if cached.describe() is not None:
+        print(f"[SERVIDOR] Cache de resultados: {cached.describe()}")
+    if cached.C is not None:
+        dist_time = time.perf_counter() - start_time
+        if live_metrics is not None:
+            live_metrics.job_finished(scheduler, dist_time, metrics, JOB_CACHED)
+        return cached.C, metrics, chunks_done, scheduler.description, dist_time
+
     threads: List[threading.Thread] = []
+    job_label = timeline.new_job() if timeline is not None else ""
 
-    # 2. Distribuição e Execução
-    for i, (conn, addr) in enumerate(clients):
-        A_block = blocks[i]
+    # 2. Distribuição e Execução (cada cliente puxa novos blocos conforme devolve resultados)
+    for client in pool:
         t = threading.Thread(
             target=handle_client_task,
-            args=(conn, addr, i, A_block, B, results, lock, metrics),
+            args=(
+                client, scheduler, assembler, lock, metrics, chunks_done, window, chunk_timeout, speculate,
+                timeline, job_label, live_metrics,
+            ),
         )
         t.start()
         threads.append(t)
 
-    for t in threads:
-        t.join()
+    # Espera o job terminar (ou todos os clientes falharem)
+    while not scheduler.complete and any(t.is_alive() for t in threads):
+        scheduler.wait(POLL_INTERVAL)
+
+    # Uma thread ainda presa depois do fim do job está num cliente travado
+    # (por exemplo, num envio que ele não lê): o cliente sai do pool
+    for client, t in zip(pool, threads):
+        t.join(STUCK_CLIENT_GRACE)
+        if t.is_alive():
+            print(f"[SERVIDOR] Cliente {client.addr} não responde; encerrando a conexão.")
+            client.close()
+            t.join()
+
+    # Clientes que caíram ou estouraram o tempo deixam o pool
+    dead = [client.addr for client in clients if not client.alive]
+    clients[:] = [client for client in clients if client.alive]
+    for addr in dead:
+        print(f"[SERVIDOR] Cliente {addr} removido do pool ({len(clients)} restantes).")
 
     end_time = time.perf_counter()
 
-    # 3. Reconstrução
-    if len(results) != num_clients:
+    # 3. Reconstrução: os blocos já foram gravados em C durante a recepção
+    if not assembler.done:
         print("[SERVIDOR] ERRO: Nem todos os resultados foram recebidos.")
-        return
+        if live_metrics is not None:
+            live_metrics.job_finished(scheduler, metrics=metrics, outcome=JOB_FAILED)
+        return None
 
     t_reconstruct_start = time.perf_counter()
-    C: Matrix = []
-    for idx in sorted(results.keys()):
-        C.extend(results[idx])
+    C = assembler.result()
+    # Saída mapeada em arquivo: garante que as páginas escritas cheguem ao disco
+    if hasattr(C, "flush"):
+        C.flush()
     t_reconstruct_end = time.perf_counter()
     metrics["overhead_reconstruct"] = t_reconstruct_end - t_reconstruct_start
+    cached.store(C)
+    if live_metrics is not None:
+        live_metrics.job_finished(scheduler, end_time - start_time, metrics)
+
+    return C, metrics, chunks_done, scheduler.description, end_time - start_time
+
+
+def run_multiplication(
+    clients: List[ClientConnection],
+    rows_A: int,
+    cols_A: int,
+    cols_B: int,
+    kernel: str = DEFAULT_KERNEL,
+    chunks_per_client: int = CHUNKS_PER_CLIENT_DEFAULT,
+    partition: str = PARTITION_ROWS,
+    window: int = WINDOW_DEFAULT,
+    chunk_timeout: float = CHUNK_TIMEOUT_DEFAULT,
+    speculate: bool = False,
+    dtype: Optional[str] = None,
+    density: Optional[float] = None,
+    sparse_b: bool = False,
+    verify: str = VERIFY_DEFAULT,
+    verify_rounds: int = FREIVALDS_ROUNDS_DEFAULT,
+    calibration: Optional[Calibration] = None,
+    result_cache: Optional[ResultCache] = None,
+    timeline: Optional[Timeline] = None,
+    job_log: Optional[JobLog] = None,
+    live_metrics: Optional[LiveMetrics] = None,
+    tuner: Optional[Tuner] = None,
+) -> None:
+    rows_B = cols_A
+
+    print(f"\n[SERVIDOR] Gerando matrizes A ({rows_A}x{cols_A}) e B ({rows_B}x{cols_B})...")
+    A, B = generate_operands(rows_A, cols_A, cols_B, dtype, density, sparse_b)
+    print(f"[SERVIDOR] Representação: {describe_operands(A, B)}")
+
+    # Referência: recálculo sequencial só no modo full; senão, tempo da calibração
+    C_seq, seq_time, seq_estimated = reference(A, B, kernel, verify, calibration)
+
+    # Cálculo Distribuído
+    outcome = run_distributed(
+        clients, A, B,
+        chunks_per_client=chunks_per_client,
+        partition=partition,
+        window=window,
+        out=None,
+        chunk_timeout=chunk_timeout,
+        speculate=speculate,
+        result_cache=result_cache,
+        timeline=timeline,
+        live_metrics=live_metrics,
+        tuner=tuner,
+    )
+    if outcome is None:
+        return
+    C, metrics, chunks_done, description, dist_time = outcome
+    # Clientes usados no job (o auto-tuner pode usar menos que o pool, ou só o servidor)
+    num_clients = len(chunks_done)
 
     # Métricas Finais
-    dist_time = end_time - start_time
-    total_overhead = (metrics["overhead_split"] + 
-                      metrics["overhead_send"] + 
-                      metrics["overhead_reconstruct"])
-    time_parallel_computation = metrics["time_compute"] / num_clients
-
-    print("\n" + "="*70)
-    print("ANÁLISE DE DESEMPENHO")
-    print("="*70)
-    print(f"⏱️  Tempo SEQUENCIAL:              {seq_time:.6f} segundos")
-    print(f"⏱️  Tempo DISTRIBUÍDO (total):     {dist_time:.6f} segundos")
-    print()
-    print("📊 DECOMPOSIÇÃO DO TEMPO DISTRIBUÍDO:")
-    print(f"   • Overhead de divisão:         {metrics['overhead_split']:.6f} s")
-    print(f"   • Overhead de comunicação:     {metrics['overhead_send']:.6f} s")
-    print(f"   • Computação paralela (média): {time_parallel_computation:.6f} s")
-    print(f"   • Overhead de reconstrução:    {metrics['overhead_reconstruct']:.6f} s")
-    print()
-    print("🚀 MÉTRICAS DE PARALELISMO:")
-    speedup = seq_time / dist_time
-    efficiency = speedup / num_clients * 100
-    print(f"   • Speedup:                     {speedup:.2f}x")
-    print(f"   • Eficiência:                  {efficiency:.1f}%")
-    
-    if speedup > 1.0:
-        print(f"   ✅ Distribuído é {speedup:.2f}x MAIS RÁPIDO!")
-    else:
-        print(f"   ⚠️  Distribuído é {1/speedup:.2f}x MAIS LENTO (overhead domina)")
-    print("="*70)
+    print_analysis(seq_time, dist_time, metrics, num_clients, chunks_done, description, seq_estimated)
 
     # Validação
-    iguais = C == C_seq
-    print(f"[SERVIDOR] Validação: Resultado distribuído == Sequencial? {iguais}\n")
+    valid = check_result(A, B, C, verify, verify_rounds, C_seq)
+    print_validation(verify, verify_rounds, valid)
+    if job_log is not None:
+        job_log.write(job_record(
+            A, B, MODE_THREADS, kernel, num_clients, description, dist_time, metrics, chunks_done,
+            seq_time, seq_estimated, verify, valid,
+        ))
+
+
+def run_file_multiplication(
+    clients: List[ClientConnection],
+    files: FileJob,
+    chunks_per_client: int = CHUNKS_PER_CLIENT_DEFAULT,
+    partition: str = PARTITION_ROWS,
+    window: int = WINDOW_DEFAULT,
+    chunk_timeout: float = CHUNK_TIMEOUT_DEFAULT,
+    speculate: bool = False,
+    kernel: str = DEFAULT_KERNEL,
+    verify: str = VERIFY_DEFAULT,
+    verify_rounds: int = FREIVALDS_ROUNDS_DEFAULT,
+    calibration: Optional[Calibration] = None,
+    result_cache: Optional[ResultCache] = None,
+    timeline: Optional[Timeline] = None,
+    job_log: Optional[JobLog] = None,
+    live_metrics: Optional[LiveMetrics] = None,
+    tuner: Optional[Tuner] = None,
+) -> None:
+    """
+    Multiplica matrizes em arquivo (np.memmap) sem carregá-las na memória.
+    O resultado é conferido no modo `verify` (Freivalds por padrão).
+    """
+    A, B, out_spec = open_file_job(files)
+    print(f"\n[SERVIDOR] Matrizes em arquivo: A {A.shape} ({files[0]}), B {B.shape} ({files[1]})")
+    C_out = create_output(out_spec, A.shape[0], B.shape[1], result_dtype(A, B))
+    C_seq, seq_time, seq_estimated = reference(A, B, kernel, verify, calibration)
+
+    outcome = run_distributed(
+        clients, A, B,
+        chunks_per_client=chunks_per_client,
+        partition=partition,
+        window=window,
+        out=C_out,
+        chunk_timeout=chunk_timeout,
+        speculate=speculate,
+        result_cache=result_cache,
+        timeline=timeline,
+        live_metrics=live_metrics,
+        tuner=tuner,
+    )
+    if outcome is None:
+        return
+    C, metrics, chunks_done, description, dist_time = outcome
+    # Clientes usados no job (o auto-tuner pode usar menos que o pool, ou só o servidor)
+    num_clients = len(chunks_done)
+    print(f"[SERVIDOR] Resultado gravado em {out_spec}")
+
+    print_analysis(seq_time, dist_time, metrics, num_clients, chunks_done, description, seq_estimated)
+
+    valid = check_result(A, B, C, verify, verify_rounds, C_seq)
+    print_validation(verify, verify_rounds, valid)
+    if job_log is not None:
+        job_log.write(job_record(
+            A, B, MODE_THREADS, kernel, num_clients, description, dist_time, metrics, chunks_done,
+            seq_time, seq_estimated, verify, valid,
+        ))
+
+
+def main(
+    num_clients: int,
+    wire: str = WIRE_BINARY,
+    kernel: str = DEFAULT_KERNEL,
+    chunks_per_client: int = CHUNKS_PER_CLIENT_DEFAULT,
+    partition: str = PARTITION_AUTO,
+    mode: str = MODE_THREADS,
+    window: int = WINDOW_DEFAULT,
+    files: Optional[FileJob] = None,
+    manifest: Optional[str] = None,
+    results: str = RESULTS_DEFAULT,
+    chunk_timeout: float = CHUNK_TIMEOUT_DEFAULT,
+    speculate: bool = False,
+    compress: str = COMPRESS_AUTO,
+    link_mbps: float = 0.0,
+    dtype: Optional[str] = None,
+    density: Optional[float] = None,
+    sparse_b: bool = False,
+    strassen: bool = False,
+    verify: str = VERIFY_DEFAULT,
+    verify_rounds: int = FREIVALDS_ROUNDS_DEFAULT,
+    calibration_path: str = CALIBRATION_DEFAULT,
+    result_cache_mb: int = RESULT_CACHE_MB_DEFAULT,
+    result_cache_dir: Optional[str] = None,
+    trace_path: Optional[str] = None,
+    job_log_path: Optional[str] = None,
+    metrics_port: int = METRICS_PORT_DEFAULT,
+    profile_path: Optional[str] = None,
+) -> None:
+    # Formatos aceitos na negociação (JSON é sempre o fallback)
+    allowed = (WIRE_BINARY, WIRE_JSON) if wire == WIRE_BINARY else (WIRE_JSON,)
+    calibration = load_calibration(calibration_path)
+    result_cache = make_result_cache(result_cache_mb, result_cache_dir)
+    timeline = make_timeline(trace_path)
+    job_log = make_job_log(job_log_path)
+    live_metrics = make_live_metrics(HOST, metrics_port)
+    tuner = make_tuner(profile_path, kernel, window)
+
+    if manifest is not None:
+        main_batch(
+            HOST, PORT, num_clients, allowed,
+            kernel=kernel,
+            chunks_per_client=chunks_per_client,
+            partition=partition,
+            window=window,
+            manifest_path=manifest,
+            results_path=results,
+            chunk_timeout=chunk_timeout,
+            speculate=speculate,
+            compress=compress,
+            link_mbps=link_mbps,
+            strassen=strassen,
+            verify=verify,
+            verify_rounds=verify_rounds,
+            calibration=calibration,
+            result_cache=result_cache,
+            timeline=timeline,
+            job_log=job_log,
+            live_metrics=live_metrics,
+            tuner=tuner,
+        )
+        return
 
+    if mode == MODE_ASYNC:
+        asyncio.run(main_async(
+            HOST, PORT, num_clients, allowed,
+            kernel=kernel,
+            chunks_per_client=chunks_per_client,
+            partition=partition,
+            window=window,
+            files=files,
+            chunk_timeout=chunk_timeout,
+            speculate=speculate,
+            compress=compress,
+            link_mbps=link_mbps,
+            dtype=dtype,
+            density=density,
+            sparse_b=sparse_b,
+            strassen=strassen,
+            verify=verify,
+            verify_rounds=verify_rounds,
+            calibration=calibration,
+            result_cache=result_cache,
+            timeline=timeline,
+            job_log=job_log,
+            live_metrics=live_metrics,
+            tuner=tuner,
+        ))
+        return
 
-def main(num_clients: int) -> None:
     print(f"[SERVIDOR] Iniciando servidor em {HOST}:{PORT}")
     print(f"[SERVIDOR] Aguardando conexão de {num_clients} clientes...")
 
-    clients: List[Tuple[socket.socket, Tuple[str, int]]] = []
+    clients: List[ClientConnection] = []
 
     with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as server_sock:
         server_sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
@@ -187,8 +715,14 @@ def main(num_clients: int) -> None:
         # 1. Fase de Conexão (Bloqueante até todos conectarem)
         while len(clients) < num_clients:
             conn, addr = server_sock.accept()
-            clients.append((conn, addr))
-            print(f"[SERVIDOR] Cliente conectado: {addr} ({len(clients)}/{num_clients})")
+            wire_format, codecs, client_kernel = server_handshake(conn, allowed, codecs_for_mode(compress))
+            clients.append(ClientConnection(conn, addr, wire_format, make_compressor(codecs, compress, link_mbps)))
+            if live_metrics is not None:
+                live_metrics.worker_connected(addr)
+            print(
+                f"[SERVIDOR] Cliente conectado: {addr} [{wire_format}, compressão: {', '.join(codecs) or 'nenhuma'}, "
+                f"kernel {client_kernel or '?'}] ({len(clients)}/{num_clients})"
+            )
 
         print("\n[SERVIDOR] Todos os clientes conectados! Iniciando modo interativo.")
 
@@ -198,17 +732,60 @@ def main(num_clients: int) -> None:
                 print("\n" + "-"*30)
                 print(" MENU PRINCIPAL")
                 print("-" * 30)
-                print("1. Nova Multiplicação")
+                if files is not None:
+                    print(f"1. Nova Multiplicação ({files[0]} x {files[1]} -> {files[2]})")
+                else:
+                    print("1. Nova Multiplicação")
                 print("2. Sair")
                 
                 opcao = input("Escolha uma opção: ").strip()
 
-                if opcao == "1":
+                if opcao == "1" and files is not None:
+                    try:
+                        run_file_multiplication(
+                            clients, files,
+                            chunks_per_client=chunks_per_client,
+                            partition=partition,
+                            window=window,
+                            chunk_timeout=chunk_timeout,
+                            speculate=speculate,
+                            kernel=kernel,
+                            verify=verify,
+                            verify_rounds=verify_rounds,
+                            calibration=calibration,
+                            result_cache=result_cache,
+                            timeline=timeline,
+                            job_log=job_log,
+                            live_metrics=live_metrics,
+                            tuner=tuner,
+                        )
+                    except (ValueError, OSError) as e:
+                        print(f"[SERVIDOR] Erro nos arquivos de entrada/saída: {e}")
+                elif opcao == "1":
                     try:
                         rA = int(input("Linhas A: "))
                         cA = int(input("Colunas A (e Linhas B): "))
                         cB = int(input("Colunas B: "))
-                        run_multiplication(clients, rA, cA, cB)
+                        run_multiplication(
+                            clients, rA, cA, cB,
+                            chunks_per_client=chunks_per_client,
+                            partition=partition,
+                            window=window,
+                            chunk_timeout=chunk_timeout,
+                            speculate=speculate,
+                            kernel=kernel,
+                            dtype=dtype,
+                            density=density,
+                            sparse_b=sparse_b,
+                            verify=verify,
+                            verify_rounds=verify_rounds,
+                            calibration=calibration,
+                            result_cache=result_cache,
+                            timeline=timeline,
+                            job_log=job_log,
+                            live_metrics=live_metrics,
+                            tuner=tuner,
+                        )
                     except ValueError:
                         print("Entrada inválida. Use números inteiros.")
                 elif opcao == "2":
@@ -221,17 +798,216 @@ def main(num_clients: int) -> None:
             print("\nInterrupção manual.")
         finally:
             # Envia sinal de exit para clientes e fecha conexões
-            for conn, _ in clients:
+            for client in clients:
                 try:
-                    send_json(conn, {"type": "exit"})
-                    conn.close()
+                    send_json(client.conn, {"type": "exit"})
+                    client.conn.close()
                 except:
                     pass
+            if live_metrics is not None:
+                live_metrics.close()
+            if result_cache is not None:
+                print(f"[SERVIDOR] Cache de resultados: {result_cache.summary()}")
+            if timeline is not None:
+                timeline.export()
             print("[SERVIDOR] Encerrado.")
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Servidor de Matrizes Persistente")
     parser.add_argument("--num-clients", type=int, default=2, help="Número de clientes esperados")
+    parser.add_argument(
+        "--wire",
+        choices=[WIRE_BINARY, WIRE_JSON],
+        default=WIRE_BINARY,
+        help="Formato de mensagem preferido (json força o formato antigo)",
+    )
+    parser.add_argument(
+        "--kernel",
+        choices=available_kernels(),
+        default=DEFAULT_KERNEL,
+        help="Kernel usado no cálculo sequencial de referência (use o mesmo dos clientes)",
+    )
+    parser.add_argument(
+        "--chunks-per-client",
+        type=int,
+        default=CHUNKS_PER_CLIENT_DEFAULT,
+        help="Granularidade: quantos blocos de linhas de A criar por cliente (1 = divisão estática)",
+    )
+    parser.add_argument(
+        "--partition",
+        choices=PARTITIONS,
+        default=PARTITION_AUTO,
+        help="Divisão do trabalho: rows (blocos de linhas), 2d (tiles de A x B) ou auto (pela forma do job)",
+    )
+    parser.add_argument(
+        "--mode",
+        choices=[MODE_THREADS, MODE_ASYNC],
+        default=MODE_THREADS,
+        help="threads (uma thread por cliente) ou async (asyncio, clientes entram e saem a qualquer momento)",
+    )
+    parser.add_argument(
+        "--window",
+        type=int,
+        default=WINDOW_DEFAULT,
+        help=f"Blocos em voo por cliente (padrão: {WINDOW_DEFAULT}; 1 = uma tarefa por vez)",
+    )
+    parser.add_argument(
+        "--a-file",
+        help="Matriz A em arquivo (.npy ou binário cru caminho:LINHASxCOLUNAS[:dtype]), lida via np.memmap",
+    )
+    parser.add_argument("--b-file", help="Matriz B em arquivo (mesmo formato de --a-file)")
+    parser.add_argument(
+        "--out-file",
+        default="C.npy",
+        help="Arquivo de saída de C, escrito via np.memmap (padrão: C.npy)",
+    )
+    parser.add_argument(
+        "--manifest",
+        help="Roda sem menu os jobs de um manifesto JSON (formas ou arquivos, repetições) e sai",
+    )
+    parser.add_argument(
+        "--results",
+        default=RESULTS_DEFAULT,
+        help=f"Arquivo JSON com resultados e métricas do modo --manifest (padrão: {RESULTS_DEFAULT})",
+    )
+    parser.add_argument(
+        "--chunk-timeout",
+        type=float,
+        default=CHUNK_TIMEOUT_DEFAULT,
+        help="Segundos máximos por bloco; um cliente que passar disso sai do pool e seus blocos vão para outros (padrão: 0 = sem limite)",
+    )
+    parser.add_argument(
+        "--speculate",
+        action="store_true",
+        help="Clientes ociosos recebem cópias de blocos atrasados; vale o primeiro resultado",
+    )
+    parser.add_argument(
+        "--compress",
+        choices=[COMPRESS_AUTO, COMPRESS_OFF, *available_codecs()],
+        default=COMPRESS_AUTO,
+        help="Compressão dos payloads binários: auto (escolhe o codec pela vazão medida e pela razão de compressão), off ou um codec fixo",
+    )
+    parser.add_argument(
+        "--link-mbps",
+        type=float,
+        default=0.0,
+        help="Vazão do enlace em Mbit/s usada pela compressão auto (padrão: 0 = medida nos envios)",
+    )
+    parser.add_argument(
+        "--dtype",
+        choices=DTYPES,
+        help="dtype das matrizes geradas (ndarray compacto; requer numpy). Padrão: listas de inteiros do Python",
+    )
+    parser.add_argument(
+        "--density",
+        type=float,
+        help="Gera A esparsa (CSR) com essa fração de não nulos, por exemplo 0.05 (padrão: densa)",
+    )
+    parser.add_argument(
+        "--sparse-b",
+        action="store_true",
+        help="Com --density, gera também B esparsa (C sai em CSR)",
+    )
+    parser.add_argument(
+        "--strassen",
+        action="store_true",
+        help="Distribui os 7 produtos do primeiro nível de Strassen-Winograd como jobs independentes (--mode async ou --manifest)",
+    )
+    parser.add_argument(
+        "--strassen-leaf",
+        type=int,
+        default=None,
+        help="Tamanho de folha dos kernels strassen: abaixo dele usa o kernel base (padrão: 64 / 1024 com numpy)",
+    )
+    parser.add_argument(
+        "--verify",
+        choices=VERIFY_MODES,
+        default=VERIFY_DEFAULT,
+        help="Validação de C: none, freivalds (O(n²) por rodada), spot (elementos sorteados) ou full (recálculo sequencial)",
+    )
+    parser.add_argument(
+        "--verify-rounds",
+        type=int,
+        default=FREIVALDS_ROUNDS_DEFAULT,
+        help=f"Rodadas do teste de Freivalds (erro <= 2^-rodadas; padrão: {FREIVALDS_ROUNDS_DEFAULT})",
+    )
+    parser.add_argument(
+        "--calibration",
+        default=CALIBRATION_DEFAULT,
+        help=f"Calibração do tempo sequencial (python -m matmul.server.calibration) usada no speedup (padrão: {CALIBRATION_DEFAULT})",
+    )
+    parser.add_argument(
+        "--result-cache-mb",
+        type=int,
+        default=RESULT_CACHE_MB_DEFAULT,
+        help="Orçamento em MB do cache de resultados (jobs e blocos repetidos, por hash de conteúdo; padrão: 0 = desligado)",
+    )
+    parser.add_argument(
+        "--result-cache-dir",
+        help="Diretório onde o cache de resultados também grava cada produto como .npy (sobrevive a reinícios)",
+    )
+    parser.add_argument(
+        "--job-log",
+        help="Acrescenta um registro JSON por job (forma, clientes, dtypes, bytes, tempos por fase) neste arquivo .jsonl",
+    )
+    parser.add_argument(
+        "--trace",
+        help="Grava a linha do tempo de cada cliente (envio, recepção, cálculo, retorno) neste arquivo JSON no formato Chrome trace/Perfetto",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=METRICS_PORT_DEFAULT,
+        help="Serve métricas vivas no formato do Prometheus em http://HOST:PORTA/metrics (padrão: 0 = desligado)",
+    )
+    parser.add_argument(
+        "--profile",
+        help="Perfil do auto-tuner (python -m matmul.server.tuner): por job, escolhe rodar no servidor ou quantos clientes e blocos por cliente usar",
+    )
     args = parser.parse_args()
-    main(args.num_clients)
+    if (args.a_file is None) != (args.b_file is None):
+        parser.error("--a-file e --b-file devem ser usados juntos")
+    if args.density is not None and not 0 < args.density <= 1:
+        parser.error("--density deve estar em (0, 1]")
+    if args.strassen and args.mode != MODE_ASYNC and args.manifest is None:
+        parser.error("--strassen requer --mode async ou --manifest")
+    if args.strassen and args.density is not None:
+        parser.error("--strassen requer matrizes densas (sem --density)")
+    if args.strassen and args.a_file is not None:
+        parser.error("--strassen requer matrizes em memória (sem --a-file / --b-file)")
+    if args.verify_rounds < 1:
+        parser.error("--verify-rounds deve ser >= 1")
+    if args.strassen_leaf is not None and args.strassen_leaf < 1:
+        parser.error("--strassen-leaf deve ser >= 1")
+    set_strassen_leaf(args.strassen_leaf)
+    files = (args.a_file, args.b_file, args.out_file) if args.a_file else None
+    main(
+        args.num_clients,
+        wire=args.wire,
+        kernel=args.kernel,
+        chunks_per_client=args.chunks_per_client,
+        partition=args.partition,
+        mode=args.mode,
+        window=args.window,
+        files=files,
+        manifest=args.manifest,
+        results=args.results,
+        chunk_timeout=args.chunk_timeout,
+        speculate=args.speculate,
+        compress=args.compress,
+        link_mbps=args.link_mbps,
+        dtype=args.dtype,
+        density=args.density,
+        sparse_b=args.sparse_b,
+        strassen=args.strassen,
+        verify=args.verify,
+        verify_rounds=args.verify_rounds,
+        calibration_path=args.calibration,
+        result_cache_mb=args.result_cache_mb,
+        result_cache_dir=args.result_cache_dir,
+        trace_path=args.trace,
+        job_log_path=args.job_log,
+        metrics_port=args.metrics_port,
+        profile_path=args.profile,
+    )
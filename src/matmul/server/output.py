@@ -0,0 +1,191 @@
+import sys
+import threading
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from matmul.utils.protocol import np
+from matmul.utils.sparse import CSRMatrix, is_sparse, vstack_csr
+from matmul.server.scheduler import ChunkScheduler
+
+
+class OutputBuffer:
+    """
+    Matriz C pré-alocada onde os resultados são escritos conforme chegam.
+
+    Com numpy, C é um ndarray (int64 ou float64) ou o np.memmap de um arquivo
+    de saída passado em `data`; sem numpy, uma lista de listas de zeros. Cada parte de resultado vai direto para a sua posição,
+    então não há passo de reconstrução no fim do job.
+    """
+
+    def __init__(self, rows: int, cols: int, dtype: str = "float64", data: Any = None):
+        self.rows = rows
+        self.cols = cols
+        self.dtype = dtype
+        if data is not None:
+            self.data: Any = data
+        elif np is not None:
+            self.data = np.zeros((rows, cols), dtype=dtype)
+        else:
+            self.data = [[0] * cols for _ in range(rows)]
+        # Só escritas acumuladas (divisão em k) precisam de exclusão mútua
+        self._lock = threading.Lock()
+
+    def region_view(self, row: int, n_rows: int, col: int, n_cols: int, dtype: str) -> Optional[memoryview]:
+        """
+        Devolve a região [row:row+n_rows] como bytes graváveis, para o socket
+        escrever o payload direto nela, ou None se isso não for possível
+        (região não contígua, dtype diferente ou sem numpy).
+        """
+        if np is None or sys.byteorder != "little":
+            return None
+        if col != 0 or n_cols != self.cols or dtype != self.dtype:
+            return None
+        return memoryview(self.data[row:row + n_rows]).cast("B")
+
+    def read(self, row: int, col: int, n_rows: int, n_cols: int) -> Any:
+        """
+        Cópia da região C[row:row+n_rows][col:col+n_cols].
+        """
+        if np is not None:
+            return np.array(self.data[row:row + n_rows, col:col + n_cols])
+        return [C_row[col:col + n_cols] for C_row in self.data[row:row + n_rows]]
+
+    def write(self, row: int, col: int, block: Any, accumulate: bool = False) -> None:
+        """
+        Escreve (ou soma, se `accumulate`) um bloco de linhas a partir de C[row][col].
+        """
+        n_rows = len(block)
+        if n_rows == 0:
+            return
+
+        if np is not None:
+            block = np.asarray(block)
+            region = self.data[row:row + n_rows, col:col + block.shape[1]]
+            if accumulate:
+                with self._lock:
+                    region += block.astype(self.dtype, copy=False)
+            else:
+                region[...] = block
+            return
+
+        n_cols = len(block[0])
+        if accumulate:
+            with self._lock:
+                for offset, block_row in enumerate(block):
+                    C_row = self.data[row + offset]
+                    for j in range(n_cols):
+                        C_row[col + j] += block_row[j]
+        else:
+            for offset, block_row in enumerate(block):
+                self.data[row + offset][col:col + n_cols] = block_row
+
+
+class SparseOutput:
+    """
+    Matriz C esparsa (A e B em CSR): guarda os blocos de linhas CSR pela
+    linha inicial e os empilha no fim. A memória acompanha nnz(C), não
+    linhas x colunas. Só há divisão por linhas, então não há soma de parcelas.
+    """
+
+    def __init__(self, rows: int, cols: int, dtype: str = "float64"):
+        self.rows = rows
+        self.cols = cols
+        self.dtype = dtype
+        # linha inicial -> bloco CSR
+        self._blocks: Dict[int, CSRMatrix] = {}
+        self._lock = threading.Lock()
+
+    def region_view(self, row: int, n_rows: int, col: int, n_cols: int, dtype: str) -> Optional[memoryview]:
+        return None
+
+    def write(self, row: int, col: int, block: Any, accumulate: bool = False) -> None:
+        if not is_sparse(block):
+            # Clientes no formato JSON devolvem o bloco denso
+            block = CSRMatrix.from_dense(block, self.dtype)
+        with self._lock:
+            self._blocks[row] = block.to_csr()
+
+    def read(self, row: int, col: int, n_rows: int, n_cols: int) -> CSRMatrix:
+        # Os blocos são sempre de linhas inteiras, gravados pela linha inicial
+        with self._lock:
+            return self._blocks[row]
+
+    @property
+    def data(self) -> CSRMatrix:
+        with self._lock:
+            blocks = [self._blocks[row] for row in sorted(self._blocks)]
+        C = vstack_csr(blocks)
+        C.shape = (self.rows, self.cols)
+        C.dtype = self.dtype
+        return C
+
+
+class ResultAssembler:
+    """
+    Recebe as partes de resultado de um job e as grava no OutputBuffer.
+
+    Um cliente pode devolver um bloco em várias partes de linhas
+    (`row_offset`, `last`). Sem divisão em k cada parte vai direto para C;
+    com divisão em k as partes de um bloco ficam guardadas (por origem) até a
+    última chegar, para que um bloco recolocado na fila ou executado em
+    duplicata nunca some parcelas em dobro. Vale o primeiro bloco completo.
+    """
+
+    def __init__(self, scheduler: ChunkScheduler, out: Any = None):
+        self.scheduler = scheduler
+        if scheduler.sparse_output:
+            self.output: Any = SparseOutput(scheduler.rows, scheduler.cols, scheduler.dtype)
+        else:
+            self.output = OutputBuffer(scheduler.rows, scheduler.cols, scheduler.dtype, out)
+        self.completed: Set[int] = set()
+        # (índice do bloco, origem) -> partes recebidas (só com divisão em k)
+        self._staged: Dict[Tuple[int, Any], List[Tuple[int, Any]]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def done(self) -> bool:
+        return len(self.completed) == self.scheduler.num_chunks
+
+    def sink(self, index: int, row_offset: int, desc: Dict[str, Any]) -> Optional[memoryview]:
+        """
+        Região de C onde o payload da parte pode ser lido direto do socket.
+        """
+        if self.scheduler.accumulate or index in self.completed:
+            return None
+        r0, c0 = self.scheduler.offsets[index]
+        n_rows, n_cols = desc["shape"]
+        return self.output.region_view(r0 + row_offset, n_rows, c0, n_cols, desc["dtype"])
+
+    def add_part(self, index: int, row_offset: int, block: Any, last: bool = True, source: Any = None) -> bool:
+        """
+        Grava uma parte do bloco `index` (block=None se o sink já a gravou).
+        `source` identifica a execução (cliente, request_id) que a enviou.
+        Devolve True quando o bloco acaba de ficar completo.
+        """
+        r0, c0 = self.scheduler.offsets[index]
+        with self._lock:
+            if index in self.completed:
+                self._staged.pop((index, source), None)
+                return False
+            if self.scheduler.accumulate:
+                self._staged.setdefault((index, source), []).append((row_offset, block))
+                if not last:
+                    return False
+                parts = self._staged.pop((index, source))
+            else:
+                parts = [] if block is None else [(row_offset, block)]
+            if last:
+                self.completed.add(index)
+
+        for offset, part in parts:
+            self.output.write(r0 + offset, c0, part, self.scheduler.accumulate)
+        return last
+
+    def discard(self, index: int, source: Any = None) -> None:
+        """
+        Esquece partes guardadas de uma execução do bloco que não vai terminar.
+        """
+        with self._lock:
+            self._staged.pop((index, source), None)
+
+    def result(self) -> Any:
+        return self.output.data
@@ -0,0 +1,190 @@
+import copy
+import os
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+from matmul.utils.cache import LRUCache
+from matmul.utils.protocol import matrix_digest, np
+from matmul.utils.sparse import is_sparse
+from matmul.server.output import ResultAssembler
+from matmul.server.scheduler import ChunkScheduler
+
+# Orçamento padrão do cache de resultados em MB (0 = desligado)
+RESULT_CACHE_MB_DEFAULT = 0
+
+
+class ResultCache:
+    """
+    Cache de produtos já calculados, endereçado pelo conteúdo dos operandos.
+
+    Guarda dois tipos de entrada no mesmo LRU (limitado por bytes):
+
+        job:   (hash(A), hash(B))        -> C inteira
+        bloco: (hash(A_block), hash(B_block)) -> resultado do bloco
+
+    Com `directory`, cada resultado denso também é gravado como <chave>.npy e
+    volta do disco quando sai da memória (ou após reiniciar o servidor).
+    Um job que repete A e B sai inteiro do cache; um job que muda só algumas
+    linhas de A (com a mesma divisão) recalcula só os blocos dessas linhas.
+    """
+
+    def __init__(self, budget_bytes: int, directory: Optional[str] = None):
+        self.memory = LRUCache(budget_bytes)
+        self.directory = directory
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+        self.hits = {"job": 0, "block": 0}
+        self.misses = {"job": 0, "block": 0}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(kind: str, digest_a: str, digest_b: str) -> str:
+        return f"{kind}-{digest_a}-{digest_b}"
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.npy")
+
+    def get(self, key: str) -> Optional[Any]:
+        kind = key.split("-", 1)[0]
+        value = self.memory.get(key)
+        if value is None and self.directory is not None and np is not None and os.path.exists(self._path(key)):
+            value = np.load(self._path(key))
+            self.memory.put(key, value)
+        with self._lock:
+            if value is None:
+                self.misses[kind] += 1
+            else:
+                self.hits[kind] += 1
+        return value
+
+    def put(self, key: str, value: Any) -> None:
+        self.memory.put(key, value)
+        # .npy guarda só matrizes densas; CSR fica apenas na memória
+        if self.directory is None or np is None or is_sparse(value) or os.path.exists(self._path(key)):
+            return
+        tmp = f"{self._path(key)}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            np.save(f, np.asarray(value))
+        os.replace(tmp, self._path(key))
+
+    def summary(self) -> str:
+        return (
+            f"jobs {self.hits['job']}/{self.hits['job'] + self.misses['job']}, "
+            f"blocos {self.hits['block']}/{self.hits['block'] + self.misses['block']} reaproveitados "
+            f"({self.memory.used_bytes / 1e6:.1f} MB em memória)"
+        )
+
+
+def make_result_cache(budget_mb: int, directory: Optional[str] = None) -> Optional[ResultCache]:
+    """
+    Cache de resultados do coordenador, ou None se desligado (orçamento 0 e sem diretório).
+    """
+    if budget_mb <= 0 and directory is None:
+        return None
+    return ResultCache(budget_mb * 1024 * 1024, directory)
+
+
+def _copy(C: Any) -> Any:
+    """
+    Cópia independente de C: quem recebe C do cache (ou a entregou ao
+    cache) pode alterá-la sem corromper a entrada guardada.
+    """
+    if np is not None and isinstance(C, np.ndarray):
+        return np.array(C)
+    return copy.deepcopy(C)
+
+
+def job_key(A: Any, B: Any) -> str:
+    return ResultCache.key("job", matrix_digest(A), matrix_digest(B))
+
+
+def prefill_blocks(cache: ResultCache, scheduler: ChunkScheduler, assembler: ResultAssembler) -> Dict[int, str]:
+    """
+    Grava em C os blocos já calculados e os tira da fila do escalonador.
+    Devolve índice -> chave dos blocos que faltam, para `store_blocks`.
+    Blocos com divisão em k são parcelas somadas em C: não entram no cache.
+    """
+    if scheduler.accumulate:
+        return {}
+    missing: Dict[int, str] = {}
+    cached = set()
+    for index, A_block, _, b_id in scheduler.chunks():
+        key = ResultCache.key("block", matrix_digest(A_block), b_id)
+        block = cache.get(key)
+        if block is None:
+            missing[index] = key
+            continue
+        assembler.add_part(index, 0, block, True, "cache")
+        cached.add(index)
+    scheduler.skip(cached)
+    return missing
+
+
+def store_blocks(cache: ResultCache, scheduler: ChunkScheduler, assembler: ResultAssembler, keys: Dict[int, str]) -> None:
+    """
+    Guarda no cache o resultado de cada bloco recém-calculado, lido de C.
+    """
+    for index, key in keys.items():
+        row, col = scheduler.offsets[index]
+        n_rows, n_cols = scheduler.block_shape(index)
+        cache.put(key, assembler.output.read(row, col, n_rows, n_cols))
+
+
+def lookup_job(cache: Optional[ResultCache], A: Any, B: Any, out: Any = None) -> Tuple[Optional[str], Optional[Any]]:
+    """
+    (chave do job, cópia de C do cache ou None). Jobs com saída em arquivo
+    (`out`) só usam o cache de blocos: C não é guardada inteira.
+    """
+    if cache is None or out is not None:
+        return None, None
+    key = job_key(A, B)
+    C = cache.get(key)
+    return key, _copy(C) if C is not None else None
+
+
+class CachedJob:
+    """
+    Uso do cache por um job: antes de distribuir, procura C inteira e depois
+    os blocos já conhecidos (gravados em C e tirados da fila); ao fim,
+    `store` guarda os blocos recém-calculados e C.
+    """
+
+    def __init__(
+        self,
+        cache: Optional[ResultCache],
+        A: Any,
+        B: Any,
+        out: Any,
+        scheduler: ChunkScheduler,
+        assembler: ResultAssembler,
+    ):
+        self.cache = cache
+        self.scheduler = scheduler
+        self.assembler = assembler
+        self.key: Optional[str] = None
+        # C inteira vinda do cache (job repetido); None se o job vai rodar
+        self.C: Optional[Any] = None
+        self.block_keys: Dict[int, str] = {}
+        self.reused_blocks = 0
+        if cache is None:
+            return
+        self.key, self.C = lookup_job(cache, A, B, out)
+        if self.C is not None:
+            scheduler.skip({chunk[0] for chunk in scheduler.chunks()})
+            return
+        self.block_keys = prefill_blocks(cache, scheduler, assembler)
+        self.reused_blocks = len(assembler.completed)
+
+    def describe(self) -> Optional[str]:
+        if self.cache is None:
+            return None
+        if self.C is not None:
+            return "job repetido, C inteira reaproveitada"
+        return f"{self.reused_blocks}/{self.scheduler.num_chunks} blocos reaproveitados"
+
+    def store(self, C: Any) -> None:
+        if self.cache is None or self.C is not None:
+            return
+        store_blocks(self.cache, self.scheduler, self.assembler, self.block_keys)
+        if self.key is not None:
+            self.cache.put(self.key, _copy(C))
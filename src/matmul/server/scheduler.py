@@ -0,0 +1,363 @@
+import math
+import statistics
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from matmul.utils.matrix_utils import (
+    Matrix,
+    dimensions,
+    split_matrix_2d,
+    split_ranges,
+)
+from matmul.utils.sparse import is_sparse, split_ranges_by_nnz
+from matmul.utils.dtypes import accumulation_dtype
+from matmul.utils.protocol import matrix_digest, matrix_dtype
+
+# Blocos por cliente quando a granularidade não é informada
+CHUNKS_PER_CLIENT_DEFAULT = 4
+
+# Blocos em voo por cliente (enviados e ainda sem resultado)
+WINDOW_DEFAULT = 2
+
+# Estratégias de divisão do trabalho
+PARTITION_ROWS = "rows"
+PARTITION_2D = "2d"
+PARTITION_AUTO = "auto"
+PARTITIONS = (PARTITION_AUTO, PARTITION_ROWS, PARTITION_2D)
+
+# No modo auto, a divisão 2D só compensa para jobs grandes com vários clientes
+AUTO_2D_MIN_SIZE = 512
+AUTO_2D_MIN_CLIENTS = 4
+
+# Limite de divisões na dimensão interna k (cada uma vira uma parcela a somar)
+K_PARTS_MAX = 4
+
+# Execução especulativa: um bloco em voo há mais de SPECULATE_FACTOR vezes a
+# duração mediana dos blocos concluídos ganha uma cópia num cliente ocioso
+SPECULATE_FACTOR = 2.0
+SPECULATE_MIN_SAMPLES = 3
+# Intervalo em que um cliente ocioso (ou esperando resposta) reavalia o job:
+# procura retardatários ou percebe que outro cliente já concluiu os blocos
+POLL_INTERVAL = 0.25
+
+# Limite de tempo por bloco (0 = sem limite); estourado, o cliente sai do pool
+CHUNK_TIMEOUT_DEFAULT = 0.0
+
+# Um bloco de trabalho: (índice, A_block, B_block, b_id)
+Chunk = Tuple[int, Matrix, Matrix, str]
+
+
+def choose_tiling(rows: int, inner: int, cols: int, num_tiles: int) -> Tuple[int, int, int]:
+    """
+    Escolhe (row_parts, col_parts, k_parts) para cerca de `num_tiles` tiles.
+
+    Entre as fatorações row_parts x col_parts == num_tiles, escolhe a que deixa
+    os tiles de C mais próximos de quadrados. Se a dimensão interna for bem
+    maior que o lado do tile, divide também em k para limitar a memória de
+    cada tarefa.
+    """
+    best: Optional[Tuple[float, int, int]] = None
+    for row_parts in range(1, num_tiles + 1):
+        if num_tiles % row_parts:
+            continue
+        col_parts = num_tiles // row_parts
+        if row_parts > rows or col_parts > cols:
+            continue
+        tile_rows = rows / row_parts
+        tile_cols = cols / col_parts
+        score = max(tile_rows, tile_cols) / min(tile_rows, tile_cols)
+        if best is None or score < best[0]:
+            best = (score, row_parts, col_parts)
+
+    if best is None:
+        row_parts, col_parts = max(1, min(num_tiles, rows)), 1
+    else:
+        _, row_parts, col_parts = best
+
+    tile_side = max(math.ceil(rows / row_parts), math.ceil(cols / col_parts))
+    k_parts = 1
+    if inner >= 4 * tile_side:
+        k_parts = min(K_PARTS_MAX, inner // (2 * tile_side))
+
+    return row_parts, col_parts, k_parts
+
+
+def resolve_partition(partition: str, rows: int, cols: int, num_clients: int) -> str:
+    """
+    Traduz PARTITION_AUTO para a estratégia concreta a partir da forma do job.
+    """
+    if partition != PARTITION_AUTO:
+        return partition
+    if min(rows, cols) >= AUTO_2D_MIN_SIZE and num_clients >= AUTO_2D_MIN_CLIENTS:
+        return PARTITION_2D
+    return PARTITION_ROWS
+
+
+def result_dtype(A: Matrix, B: Matrix) -> str:
+    """
+    dtype da matriz C = A x B: o de acumulação, sem overflow para a dimensão
+    interna inteira (parcelas de divisão em k são somadas nele).
+    """
+    return accumulation_dtype(matrix_dtype(A), matrix_dtype(B), len(B))
+
+
+class ChunkScheduler:
+    """
+    Fila compartilhada de blocos de trabalho (escalonamento dinâmico).
+
+    O produto é cortado em mais blocos do que clientes; cada cliente puxa o
+    próximo bloco assim que termina o anterior. Clientes rápidos acabam
+    processando mais blocos, e um cliente lento não segura o tempo total do job.
+
+    O escalonador também acompanha quem está executando cada bloco: blocos de
+    um cliente que falha voltam para a fila (`fail`), retardatários podem ser
+    copiados para outro cliente (`straggler`) e só o primeiro resultado de
+    cada bloco conta (`finish`).
+    """
+
+    def __init__(
+        self,
+        chunks: List[Chunk],
+        rows: int,
+        cols: int,
+        offsets: List[Tuple[int, int]],
+        tiles: Optional[List[Dict[str, Any]]] = None,
+        dtype: str = "float64",
+        sparse_output: bool = False,
+    ):
+        self.rows = rows
+        self.cols = cols
+        # dtype de C (veja result_dtype)
+        self.dtype = dtype
+        # A e B esparsas: C também é montada em CSR
+        self.sparse_output = sparse_output
+        # Blocos de linhas cortados por não nulos (A esparsa)
+        self.nnz_balanced = False
+        self.num_chunks = len(chunks)
+        # (linha, coluna) de C onde começa o resultado de cada bloco
+        self.offsets = offsets
+        # Metadados dos tiles 2D (None na divisão por linhas)
+        self.tiles = tiles
+        # Com divisão em k, vários blocos somam parcelas na mesma região de C
+        self.accumulate = tiles is not None and len({t["k"] for t in tiles}) > 1
+        self._chunks = list(chunks)
+        self._pending: "deque[Chunk]" = deque(chunks)
+        # Instante em que cada bloco entrou (ou voltou) na fila
+        created_at = time.perf_counter()
+        self._queued_at: Dict[int, float] = {chunk[0]: created_at for chunk in chunks}
+        # índice -> (bloco, {dono: instante de início}) dos blocos em execução
+        self._running: Dict[int, Tuple[Chunk, Dict[Any, float]]] = {}
+        self._done: Set[int] = set()
+        # Duração dos blocos concluídos (base para detectar retardatários)
+        self._durations: List[float] = []
+        self._cond = threading.Condition()
+
+    @classmethod
+    def by_rows(cls, A: Matrix, B: Matrix, num_chunks: int) -> "ChunkScheduler":
+        """
+        Blocos de linhas de A; todos compartilham a B inteira. Uma A esparsa
+        é cortada por número de não nulos, não de linhas.
+        """
+        # Nunca mais blocos do que linhas (evita blocos vazios)
+        num_chunks = max(1, min(num_chunks, len(A)))
+        b_id = matrix_digest(B)
+        if is_sparse(A):
+            A = A.to_csr()
+            ranges = split_ranges_by_nnz(A, num_chunks)
+        else:
+            ranges = split_ranges(len(A), num_chunks)
+        chunks = [(index, A[start:end], B, b_id) for index, (start, end) in enumerate(ranges)]
+        offsets = [(start, 0) for start, _ in ranges]
+        scheduler = cls(
+            chunks, len(A), dimensions(B)[1], offsets,
+            dtype=result_dtype(A, B), sparse_output=is_sparse(A) and is_sparse(B),
+        )
+        scheduler.nnz_balanced = is_sparse(A)
+        return scheduler
+
+    @classmethod
+    def tiled(cls, A: Matrix, B: Matrix, num_tiles: int) -> "ChunkScheduler":
+        """
+        Tiles 2D (linhas de A x colunas de B, com k opcional); cada tarefa leva
+        só o pedaço de B de que precisa.
+        """
+        row_parts, col_parts, k_parts = choose_tiling(len(A), len(B), len(B[0]), max(1, num_tiles))
+        tiles = split_matrix_2d(A, B, row_parts, col_parts, k_parts)
+
+        # Tiles com a mesma faixa (k, colunas) usam o mesmo pedaço de B
+        b_ids: Dict[Tuple[Tuple[int, int], Tuple[int, int]], str] = {}
+        chunks = []
+        for index, tile in enumerate(tiles):
+            key = (tile["k"], tile["cols"])
+            if key not in b_ids:
+                b_ids[key] = matrix_digest(tile["B"])
+            chunks.append((index, tile["A"], tile["B"], b_ids[key]))
+
+        offsets = [(tile["rows"][0], tile["cols"][0]) for tile in tiles]
+        return cls(chunks, len(A), len(B[0]), offsets, tiles, result_dtype(A, B))
+
+    @classmethod
+    def for_clients(
+        cls,
+        A: Matrix,
+        B: Matrix,
+        num_clients: int,
+        chunks_per_client: int = CHUNKS_PER_CLIENT_DEFAULT,
+        partition: str = PARTITION_ROWS,
+    ) -> "ChunkScheduler":
+        num_chunks = num_clients * max(1, chunks_per_client)
+        # Tiles 2D cortam colunas: só para matrizes densas
+        if is_sparse(A) or is_sparse(B):
+            return cls.by_rows(A, B, num_chunks)
+        if resolve_partition(partition, len(A), len(B[0]), num_clients) == PARTITION_2D:
+            return cls.tiled(A, B, num_chunks)
+        return cls.by_rows(A, B, num_chunks)
+
+    @property
+    def description(self) -> str:
+        if self.tiles is None and self.nnz_balanced:
+            return f"{self.num_chunks} blocos de linhas (balanceados por não nulos)"
+        if self.tiles is None:
+            return f"{self.num_chunks} blocos de linhas"
+        parts_r = len({t["rows"] for t in self.tiles})
+        parts_c = len({t["cols"] for t in self.tiles})
+        parts_k = len({t["k"] for t in self.tiles})
+        return f"{self.num_chunks} tiles 2D ({parts_r}x{parts_c}, k={parts_k})"
+
+    def chunks(self) -> List[Chunk]:
+        """
+        Todos os blocos do job, na ordem dos índices.
+        """
+        return self._chunks
+
+    def block_shape(self, index: int) -> Tuple[int, int]:
+        """
+        (linhas, colunas) da região de C que o bloco `index` produz.
+        """
+        _, A_block, B_block, _ = self._chunks[index]
+        return len(A_block), dimensions(B_block)[1]
+
+    def skip(self, indices: Set[int]) -> None:
+        """
+        Marca blocos como concluídos sem executá-los (resultado já conhecido).
+        """
+        with self._cond:
+            self._done.update(indices)
+            self._pending = deque(chunk for chunk in self._pending if chunk[0] not in self._done)
+            self._cond.notify_all()
+
+    def queued_at(self, index: int) -> float:
+        """
+        Instante (perf_counter) em que o bloco entrou na fila pela última vez.
+        """
+        return self._queued_at[index]
+
+    @property
+    def complete(self) -> bool:
+        return len(self._done) == self.num_chunks
+
+    @property
+    def has_pending(self) -> bool:
+        return bool(self._pending)
+
+    @property
+    def num_pending(self) -> int:
+        # Blocos na fila que ainda não terminaram (lido também por outras threads)
+        with self._cond:
+            return sum(1 for chunk in self._pending if chunk[0] not in self._done)
+
+    @property
+    def num_running(self) -> int:
+        with self._cond:
+            return len(self._running)
+
+    def next_chunk(self, owner: Any = None) -> Optional[Chunk]:
+        """
+        Devolve o próximo bloco pendente, registrado como em execução por
+        `owner`, ou None se não há nenhum agora (blocos em voo podem voltar).
+        """
+        with self._cond:
+            while self._pending:
+                chunk = self._pending.popleft()
+                if chunk[0] in self._done:
+                    continue
+                self._start(chunk, owner)
+                return chunk
+            return None
+
+    def _start(self, chunk: Chunk, owner: Any) -> None:
+        _, owners = self._running.setdefault(chunk[0], (chunk, {}))
+        owners[owner] = time.perf_counter()
+
+    def straggler(self, owner: Any, factor: float = SPECULATE_FACTOR) -> Optional[Chunk]:
+        """
+        Execução especulativa: devolve (e registra para `owner`) uma cópia do
+        bloco em execução há mais tempo, se ele já passou de `factor` vezes a
+        duração mediana dos blocos concluídos. Cada bloco tem no máximo uma cópia.
+        """
+        with self._cond:
+            if len(self._durations) < SPECULATE_MIN_SAMPLES:
+                return None
+            limit = factor * statistics.median(self._durations)
+            now = time.perf_counter()
+            candidates = [
+                (now - min(owners.values()), chunk)
+                for index, (chunk, owners) in self._running.items()
+                if len(owners) == 1 and owner not in owners and index not in self._done
+            ]
+            late = [(elapsed, chunk) for elapsed, chunk in candidates if elapsed > limit]
+            if not late:
+                return None
+            _, chunk = max(late, key=lambda item: item[0])
+            self._start(chunk, owner)
+            return chunk
+
+    def finish(self, index: int, owner: Any = None) -> bool:
+        """
+        Marca o bloco como concluído por `owner`. Devolve True só para o primeiro
+        resultado; cópias especulativas que chegam depois são descartadas.
+        """
+        with self._cond:
+            entry = self._running.get(index)
+            if entry is not None and owner in entry[1]:
+                started = entry[1].pop(owner)
+                if index not in self._done:
+                    self._durations.append(time.perf_counter() - started)
+                if not entry[1]:
+                    del self._running[index]
+            if index in self._done:
+                return False
+            self._done.add(index)
+            self._cond.notify_all()
+            return True
+
+    def fail(self, chunk: Chunk, owner: Any = None) -> bool:
+        """
+        O `owner` não vai devolver o bloco (caiu ou estourou o tempo). Se
+        nenhuma outra cópia estiver em execução, o bloco volta para a frente
+        da fila. Devolve True se ele foi recolocado.
+        """
+        index = chunk[0]
+        with self._cond:
+            entry = self._running.get(index)
+            if entry is not None:
+                entry[1].pop(owner, None)
+                if entry[1]:
+                    return False
+                del self._running[index]
+            if index in self._done:
+                return False
+            self._pending.appendleft(chunk)
+            self._queued_at[index] = time.perf_counter()
+            self._cond.notify_all()
+            return True
+
+    def wait(self, timeout: Optional[float] = None) -> None:
+        """
+        Espera até algum bloco voltar para a fila, terminar ou `timeout` passar.
+        """
+        with self._cond:
+            if not self._pending and not self.complete:
+                self._cond.wait(timeout)
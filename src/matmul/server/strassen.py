@@ -0,0 +1,77 @@
+from typing import Any, Dict, List, Tuple
+
+from matmul.utils.dtypes import smallest_int_dtype
+from matmul.utils.matrix_utils import pad_matrix, submatrix, winograd_combine, winograd_operands
+from matmul.utils.protocol import np
+from matmul.utils.sparse import is_sparse
+
+
+def _widen(M: Any) -> Any:
+    # Somas de quadrantes e de produtos crescem: ndarray passa a int64/float64
+    if np is not None and isinstance(M, np.ndarray):
+        return M.astype(np.float64 if M.dtype.kind == "f" else np.int64, copy=False)
+    return M
+
+
+def _narrow(M: Any) -> Any:
+    # Operando inteiro viaja no menor dtype que comporta seus valores
+    if np is not None and isinstance(M, np.ndarray) and M.dtype.kind in "iu" and M.size:
+        return np.ascontiguousarray(M, dtype=smallest_int_dtype(int(M.min()), int(M.max())))
+    if np is not None and isinstance(M, np.ndarray):
+        return np.ascontiguousarray(M)
+    return M
+
+
+def top_level_operands(A: Any, B: Any) -> List[Tuple[Any, Any]]:
+    """
+    Os 7 pares (X, Y) do primeiro nível de Strassen-Winograd de A x B, para
+    serem distribuídos como jobs independentes. Dimensões ímpares são
+    completadas com uma linha/coluna de zeros. As somas de quadrantes são
+    cópias em memória: operandos em arquivo (np.memmap) não são aceitos.
+    """
+    if is_sparse(A) or is_sparse(B):
+        raise ValueError("Strassen distribuído requer A e B densas")
+    if np is not None and (isinstance(A, np.memmap) or isinstance(B, np.memmap)):
+        raise ValueError("Strassen distribuído requer A e B em memória (não em arquivo)")
+    if len(A[0]) != len(B):
+        raise ValueError(f"Dimensões incompatíveis: {len(A[0])} != {len(B)}")
+
+    rows, inner, cols = (d + d % 2 for d in (len(A), len(B), len(B[0])))
+    A = pad_matrix(A, rows, inner)
+    B = pad_matrix(B, inner, cols)
+    # Floats ficam no dtype original; inteiros somam em int64 e depois encolhem
+    if np is not None and isinstance(A, np.ndarray) and A.dtype.kind != "f":
+        A = A.astype(np.int64, copy=False)
+    if np is not None and isinstance(B, np.ndarray) and B.dtype.kind != "f":
+        B = B.astype(np.int64, copy=False)
+    return [(_narrow(X), _narrow(Y)) for X, Y in winograd_operands(A, B)]
+
+
+def combine_products(P: List[Any], rows: int, cols: int, dtype: str) -> Any:
+    """
+    C (rows x cols, no dtype de acumulação `dtype`) a partir dos 7 produtos.
+    """
+    C = winograd_combine([_widen(M) for M in P])
+    C = submatrix(C, 0, rows, 0, cols)
+    if np is not None and isinstance(C, np.ndarray):
+        return np.ascontiguousarray(C, dtype=dtype)
+    return C
+
+
+def merge_metrics(jobs: List[Any]) -> Tuple[Dict[str, float], Dict[Any, int]]:
+    """
+    Métricas e blocos por cliente somados sobre os jobs dos 7 produtos.
+    """
+    metrics: Dict[str, float] = {}
+    chunks_done: Dict[Any, int] = {}
+    for job in jobs:
+        for key, value in job.metrics.items():
+            metrics[key] = metrics.get(key, 0.0) + value
+        for addr, count in job.chunks_done.items():
+            chunks_done[addr] = chunks_done.get(addr, 0) + count
+    return metrics, chunks_done
+
+
+def describe(A: Any, B: Any) -> str:
+    rows, inner, cols = (d + d % 2 for d in (len(A), len(B), len(B[0])))
+    return f"Strassen-Winograd: 7 produtos de {rows // 2}x{inner // 2} x {inner // 2}x{cols // 2}"
@@ -0,0 +1,173 @@
+import json
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from matmul.utils.protocol import PHASES_KEY
+
+# Linhas (threads do Chrome trace) de cada cliente na linha do tempo
+TRACK_SEND = 1      # servidor enviando B e a tarefa
+TRACK_RECV = 2      # cliente recebendo e decodificando a tarefa
+TRACK_COMPUTE = 3   # cliente calculando e codificando o resultado
+TRACK_RETURN = 4    # resultado a caminho do servidor
+TRACK_NAMES = {
+    TRACK_SEND: "envio (servidor)",
+    TRACK_RECV: "recepção (cliente)",
+    TRACK_COMPUTE: "cálculo (cliente)",
+    TRACK_RETURN: "retorno",
+}
+
+
+def client_phases(response: Dict[str, Any]) -> Dict[str, float]:
+    """
+    Tempos de fase de uma mensagem de resultado ({} para clientes antigos).
+    """
+    return response.get(PHASES_KEY) or {}
+
+
+def add_phase_metrics(
+    metrics: Dict[str, float],
+    parts: List[Dict[str, float]],
+    round_trip: float,
+) -> None:
+    """
+    Soma nas métricas do job as fases de um bloco concluído (uma entrada de
+    `parts` por mensagem de resultado). time_compute passa a ser a computação
+    informada pelo cliente; `round_trip` (do envio da tarefa até o resultado,
+    com rede e serialização) vai para time_round_trip e só substitui a
+    computação quando o cliente não informa as fases.
+    """
+    metrics["time_round_trip"] += round_trip
+    if not parts or any("compute" not in phases for phases in parts):
+        metrics["time_compute"] += round_trip
+        return
+    for phases in parts:
+        metrics["time_compute"] += phases["compute"]
+        for phase in ("recv", "decode", "encode"):
+            metrics[f"client_{phase}"] += phases.get(phase, 0.0)
+
+
+def phase_metrics() -> Dict[str, float]:
+    """
+    Métricas por fase zeradas, para o dicionário de métricas de um job.
+    """
+    return {"time_round_trip": 0.0, "client_recv": 0.0, "client_decode": 0.0, "client_encode": 0.0}
+
+
+class Timeline:
+    """
+    Linha do tempo por cliente de todos os blocos executados, exportada no
+    formato Chrome trace (abre em chrome://tracing ou ui.perfetto.dev).
+
+    Cada bloco registra os instantes em que entrou na fila, foi enviado,
+    começou e terminou de ser calculado no cliente e chegou ao servidor.
+    Cada cliente vira um processo do trace, com uma linha por etapa, e cada
+    bloco aparece também como um intervalo assíncrono da fila até a chegada:
+    retardatários e clientes ociosos ficam visíveis.
+
+    Os instantes do servidor são perf_counter; os do cliente chegam em
+    time.time() e são convertidos pelo relógio de parede (clientes em outras
+    máquinas dependem dos relógios sincronizados).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._origin = time.perf_counter()
+        self._wall_offset = time.time() - self._origin
+        self._events: List[Dict[str, Any]] = []
+        self._pids: Dict[str, int] = {}
+        self._next_id = 0
+        self._jobs = 0
+        self._lock = threading.Lock()
+
+    def new_job(self) -> str:
+        """
+        Rótulo do próximo job (os blocos de cada job aparecem com ele no trace).
+        """
+        with self._lock:
+            self._jobs += 1
+            return f"job {self._jobs}"
+
+    def _us(self, t: float) -> float:
+        return round((t - self._origin) * 1e6, 1)
+
+    def _pid(self, worker: str) -> int:
+        pid = self._pids.get(worker)
+        if pid is None:
+            pid = self._pids[worker] = len(self._pids) + 1
+            self._events.append({"name": "process_name", "ph": "M", "pid": pid, "args": {"name": f"cliente {worker}"}})
+            for tid, name in TRACK_NAMES.items():
+                self._events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}})
+        return pid
+
+    def _span(self, pid: int, tid: int, name: str, start: float, end: float, args: Dict[str, Any]) -> None:
+        if end < start:
+            return
+        self._events.append({
+            "name": name, "cat": "bloco", "ph": "X", "pid": pid, "tid": tid,
+            "ts": self._us(start), "dur": self._us(end) - self._us(start), "args": args,
+        })
+
+    def record(
+        self,
+        worker: Any,
+        job: str,
+        index: int,
+        queued: float,
+        dispatched: float,
+        sent: float,
+        received: float,
+        parts: List[Dict[str, float]],
+    ) -> None:
+        """
+        Registra um bloco entregue por `worker`. `queued`, `dispatched`, `sent`
+        e `received` são perf_counter do servidor; `parts` são os tempos de
+        fase de cada mensagem de resultado do bloco (uma por parte).
+        """
+        if isinstance(worker, tuple):
+            worker = f"{worker[0]}:{worker[1]}"
+        label = f"{job} bloco {index}"
+        args = {"job": job, "bloco": index}
+        with self._lock:
+            pid = self._pid(worker)
+            self._span(pid, TRACK_SEND, label, dispatched, sent, args)
+
+            started = finished = None
+            for phases in parts:
+                if "recv_at" in phases:
+                    recv_at = phases["recv_at"] - self._wall_offset
+                    decoded = recv_at + phases.get("recv", 0.0) + phases.get("decode", 0.0)
+                    self._span(pid, TRACK_RECV, label, recv_at, decoded, {
+                        **args, "recv": phases.get("recv", 0.0), "decode": phases.get("decode", 0.0),
+                    })
+                if "compute_at" in phases:
+                    compute_at = phases["compute_at"] - self._wall_offset
+                    encoded = compute_at + phases.get("compute", 0.0) + phases.get("encode", 0.0)
+                    self._span(pid, TRACK_COMPUTE, label, compute_at, encoded, {
+                        **args, "compute": phases.get("compute", 0.0), "encode": phases.get("encode", 0.0),
+                    })
+                    started = compute_at if started is None else started
+                    finished = encoded
+            if finished is not None:
+                self._span(pid, TRACK_RETURN, label, finished, received, args)
+
+            # Intervalo assíncrono do bloco: da fila até o resultado chegar
+            self._next_id += 1
+            stamps = {"queued": queued, "sent": sent, "started": started, "finished": finished, "received": received}
+            block_args = {**args, **{k: self._us(v) for k, v in stamps.items() if v is not None}}
+            for ph, t in (("b", queued), ("e", received)):
+                self._events.append({
+                    "name": label, "cat": "bloco", "ph": ph, "id": self._next_id, "pid": pid,
+                    "ts": self._us(t), "args": block_args if ph == "b" else {},
+                })
+
+    def export(self) -> None:
+        with self._lock:
+            events = list(self._events)
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+        print(f"[SERVIDOR] Linha do tempo ({len(self._pids)} cliente(s)) gravada em {self.path}")
+
+
+def make_timeline(path: Optional[str]) -> Optional[Timeline]:
+    return Timeline(path) if path else None
@@ -0,0 +1,341 @@
+import argparse
+import json
+import math
+import os
+import statistics
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from matmul.utils.dtypes import DTYPES
+from matmul.utils.kernels import NUMPY_KERNELS, as_list, available_kernels, get_kernel, multiply_with
+from matmul.utils.matrix_utils import generate_operands
+from matmul.utils.protocol import matrix_dtype, np
+from matmul.utils.sparse import is_sparse
+from matmul.server.calibration import calibration_key
+from matmul.server.scheduler import CHUNKS_PER_CLIENT_DEFAULT, WINDOW_DEFAULT
+
+PROFILE_DEFAULT = "profile.json"
+
+# Tamanho (n x n x n) do job de sondagem: o bastante para a computação e a
+# transferência dominarem o custo fixo
+PROBE_SIZE_NUMPY = 512
+PROBE_SIZE_PURE = 128
+# Job mínimo usado para medir a latência e o custo fixo de um job distribuído
+LATENCY_SIZE = 2
+
+REPEATS = 3
+
+# Blocos por cliente considerados pelo modelo de custo
+CHUNK_CHOICES = (1, 2, 4, 8, 16)
+
+# Nome do "cliente" e descrição da divisão dos jobs que o auto-tuner manda rodar no próprio servidor
+LOCAL_WORKER = "servidor (local)"
+LOCAL_DESCRIPTION = "local (auto-tuner)"
+
+
+class Plan:
+    """
+    Decisão do auto-tuner para um job: rodar no servidor (`local`) ou
+    distribuir entre `workers` clientes com `chunks_per_client` blocos
+    cada, com os tempos estimados pelo modelo de custo.
+    """
+
+    def __init__(self, local: bool, workers: int, chunks_per_client: int, estimate: float, local_estimate: float):
+        self.local = local
+        self.workers = workers
+        self.chunks_per_client = chunks_per_client
+        self.estimate = estimate
+        self.local_estimate = local_estimate
+
+    def describe(self) -> str:
+        if self.local:
+            return f"local no servidor (estimado {self.local_estimate:.4f} s; distribuído {self.estimate:.4f} s)"
+        return (
+            f"{self.workers} cliente(s), {self.chunks_per_client} bloco(s) por cliente "
+            f"(estimado {self.estimate:.4f} s; local {self.local_estimate:.4f} s)"
+        )
+
+
+class Profile:
+    """
+    Perfil de desempenho do cluster, medido à parte e guardado em JSON
+    (mesmo formato de entradas por kernel e dtypes da Calibration).
+
+    Cada entrada é medida com clientes rodando o próprio kernel da chave
+    (anunciado no handshake) e guarda a taxa desse kernel no servidor e em
+    cada cliente (FLOP/s), a latência por bloco e o custo fixo de um job distribuído, a
+    vazão efetiva do enlace (com a codificação no servidor), os bytes por
+    elemento no fio e o custo de (de)serialização por elemento nos clientes.
+    """
+
+    def __init__(self, path: str = PROFILE_DEFAULT):
+        self.path = path
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.entries = json.load(f).get("entries", {})
+
+    def entry(self, kernel: str, A: Any, B: Any) -> Optional[Dict[str, Any]]:
+        return self.entries.get(calibration_key(kernel, matrix_dtype(A), matrix_dtype(B)))
+
+    def measure(
+        self,
+        coordinator: Any,
+        kernel: Optional[str] = None,
+        dtype: Optional[str] = None,
+        size: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        Mede a entrada do perfil com os clientes já conectados ao `coordinator`
+        (API Coordinator): um job mínimo para a latência e o custo fixo, e um
+        job de sondagem n x n x n para a taxa dos clientes, a vazão e a
+        serialização. A taxa local é medida no próprio servidor com o mesmo
+        kernel. `kernel` (padrão: o dos clientes) deve ser o que os clientes
+        anunciaram; ValueError se não for. Grava a entrada e a devolve.
+        """
+        clients = clients_kernel(coordinator)
+        if kernel is None:
+            kernel = clients
+        elif kernel != clients:
+            raise ValueError(
+                f"os clientes usam o kernel {clients}; para medir {kernel}, inicie-os com --kernel {kernel}"
+            )
+        if size is None:
+            size = PROBE_SIZE_NUMPY if kernel in NUMPY_KERNELS else PROBE_SIZE_PURE
+
+        # As sondagens mudam os blocos por cliente do coordenador; o valor do chamador volta no fim
+        chunks_per_client = coordinator.chunks_per_client
+        try:
+            # Latência: com 1 bloco de 2 linhas por cliente, o ciclo é quase só rede
+            coordinator.chunks_per_client = 1
+            A, B = generate_operands(LATENCY_SIZE, LATENCY_SIZE, LATENCY_SIZE, dtype)
+            latencies: List[float] = []
+            overheads: List[float] = []
+            for _ in range(REPEATS):
+                _, report = coordinator.submit_job(A, B).result()
+                chunks = sum(report["chunks_done"].values())
+                latency = _link_time(report["metrics"]) / max(1, chunks)
+                latencies.append(latency)
+                overheads.append(max(0.0, report["dist_time"] - latency))
+            latency = statistics.median(latencies)
+            print(f"[PERFIL] Latência por bloco: {latency * 1e3:.3f} ms")
+
+            coordinator.chunks_per_client = CHUNKS_PER_CLIENT_DEFAULT
+            A, B = generate_operands(size, size, size, dtype)
+            key = calibration_key(kernel, matrix_dtype(A), matrix_dtype(B))
+            flops = 2 * size ** 3
+            worker_flops: List[float] = []
+            bandwidths: List[float] = []
+            bytes_per_element: List[float] = []
+            serialize: List[float] = []
+            for _ in range(REPEATS):
+                _, report = coordinator.submit_job(A, B).result()
+                metrics = report["metrics"]
+                workers = sum(1 for count in report["chunks_done"].values() if count)
+                chunks = sum(report["chunks_done"].values())
+                elements = size * size + workers * size * size + size * size
+                wire_bytes = metrics["bytes_sent"] + metrics["bytes_received"]
+                # time_compute soma os clientes: a razão é a taxa de um cliente
+                worker_flops.append(flops / metrics["time_compute"])
+                bandwidths.append(wire_bytes / max(1e-9, _link_time(metrics) - latency * chunks))
+                bytes_per_element.append(wire_bytes / elements)
+                serialize.append((metrics["client_decode"] + metrics["client_encode"]) / elements)
+        finally:
+            coordinator.chunks_per_client = chunks_per_client
+
+        local_times: List[float] = []
+        for _ in range(REPEATS):
+            local_times.append(run_local(A, B, kernel)[1])
+
+        entry = {
+            "local_flops": flops / min(local_times),
+            "worker_flops": statistics.median(worker_flops),
+            "latency_s": latency,
+            "job_overhead_s": statistics.median(overheads),
+            "bandwidth_Bps": statistics.median(bandwidths),
+            "bytes_per_element": statistics.median(bytes_per_element),
+            "serialize_s_per_element": statistics.median(serialize),
+            "workers": coordinator.num_workers,
+            "probe_size": size,
+            "measured_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        self.entries[key] = entry
+        print(
+            f"[PERFIL] {key}: servidor {entry['local_flops'] / 1e6:.1f} MFLOP/s, "
+            f"cliente {entry['worker_flops'] / 1e6:.1f} MFLOP/s, enlace {entry['bandwidth_Bps'] * 8 / 1e6:.1f} Mbit/s, "
+            f"{entry['bytes_per_element']:.2f} B/elemento, serialização {entry['serialize_s_per_element'] * 1e9:.1f} ns/elemento"
+        )
+        return entry
+
+    def save(self) -> None:
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump({"entries": self.entries}, f, indent=2)
+
+
+def local_estimate(entry: Dict[str, Any], flops: float) -> float:
+    return flops / entry["local_flops"]
+
+
+def distributed_estimate(
+    entry: Dict[str, Any],
+    rows: int,
+    inner: int,
+    cols: int,
+    workers: int,
+    chunks_per_client: int,
+    window: int = WINDOW_DEFAULT,
+) -> float:
+    """
+    Tempo estimado de A x B distribuído por linhas entre `workers` clientes.
+
+        custo fixo + latência · rodadas + bytes / vazão + elementos · serialização
+        + computação paralela + cauda (o último bloco)
+
+    A vai uma vez, B uma vez por cliente (cache de B) e C volta uma vez.
+    Mais blocos por cliente encurtam a cauda, mas pagam mais latência
+    (amortizada pela janela de blocos em voo).
+    """
+    flops = 2 * rows * inner * cols
+    elements = rows * inner + workers * inner * cols + rows * cols
+    transfer = elements * entry["bytes_per_element"] / entry["bandwidth_Bps"]
+    serialize = elements * entry["serialize_s_per_element"]
+    rounds = math.ceil(chunks_per_client / max(1, window))
+    compute = flops / (workers * entry["worker_flops"])
+    tail = compute / chunks_per_client
+    return entry["job_overhead_s"] + entry["latency_s"] * rounds + transfer + serialize + compute + tail
+
+
+class Tuner:
+    """
+    Auto-tuner do coordenador: para cada job, compara o tempo estimado no
+    servidor com o melhor plano distribuído (clientes x blocos por cliente)
+    e escolhe o menor. Jobs sem entrada no perfil (ou esparsos) seguem a
+    configuração da linha de comando.
+    """
+
+    def __init__(self, profile: Profile, kernel: str, window: int = WINDOW_DEFAULT):
+        self.profile = profile
+        self.kernel = kernel
+        self.window = window
+        # Chaves sem entrada no perfil, avisadas uma vez só
+        self._missing: Set[str] = set()
+
+    def plan(self, A: Any, B: Any, available: int) -> Optional[Plan]:
+        if is_sparse(A) or is_sparse(B):
+            return None
+        entry = self.profile.entry(self.kernel, A, B)
+        if entry is None:
+            key = calibration_key(self.kernel, matrix_dtype(A), matrix_dtype(B))
+            if key not in self._missing:
+                self._missing.add(key)
+                print(f"[SERVIDOR] Auto-tuner: sem perfil para {key}; usando a configuração da linha de comando")
+            return None
+        rows, inner, cols = len(A), len(B), len(B[0])
+        t_local = local_estimate(entry, 2 * rows * inner * cols)
+        best: Optional[Tuple[float, int, int]] = None
+        for workers in range(1, max(1, available) + 1):
+            for chunks in CHUNK_CHOICES:
+                # Blocos de pelo menos uma linha
+                if workers * chunks > rows:
+                    continue
+                estimate = distributed_estimate(entry, rows, inner, cols, workers, chunks, self.window)
+                if best is None or estimate < best[0]:
+                    best = (estimate, workers, chunks)
+        if best is None or available < 1:
+            return Plan(True, 0, 0, float("inf"), t_local)
+        estimate, workers, chunks = best
+        return Plan(t_local <= estimate, workers, chunks, estimate, t_local)
+
+
+def make_tuner(path: Optional[str], kernel: str, window: int = WINDOW_DEFAULT) -> Optional[Tuner]:
+    """
+    Auto-tuner com o perfil em `path`, ou None se desligado (sem --profile).
+    """
+    if not path:
+        return None
+    profile = Profile(path)
+    if not profile.entries:
+        print(f"[SERVIDOR] Sem perfil em {path}: rode `python -m matmul.server.tuner` (auto-tuner desligado)")
+        return None
+    print(f"[SERVIDOR] Auto-tuner: perfil {path} ({len(profile.entries)} entrada(s))")
+    return Tuner(profile, kernel, window)
+
+
+def run_local(A: Any, B: Any, kernel: str, out: Any = None) -> Tuple[Any, float]:
+    """
+    Calcula A x B no próprio servidor com `kernel` (jobs pequenos demais
+    para compensar a distribuição). C vai para `out` se informado.
+    """
+    kernel_fn = get_kernel(kernel)
+    if kernel not in NUMPY_KERNELS:
+        A, B = as_list(A), as_list(B)
+    start = time.perf_counter()
+    C = multiply_with(kernel_fn, A, B)
+    elapsed = time.perf_counter() - start
+    if out is not None:
+        out[:] = np.asarray(C)
+        C = out
+    return C, elapsed
+
+
+def clients_kernel(coordinator: Any) -> str:
+    """
+    Kernel anunciado pelos clientes do `coordinator` (API Coordinator).
+    ValueError se os clientes usarem kernels diferentes ou não o anunciarem:
+    a taxa medida não teria um kernel ao qual pertencer.
+    """
+    kernels = set(coordinator.worker_kernels.values())
+    if None in kernels:
+        raise ValueError("há clientes que não anunciam o kernel no handshake (versão antiga do cliente)")
+    if len(kernels) != 1:
+        raise ValueError(f"os clientes usam kernels diferentes ({', '.join(sorted(kernels))}); use um só kernel por perfil")
+    return kernels.pop()
+
+
+def _link_time(metrics: Dict[str, float]) -> float:
+    """
+    Tempo de rede de um job: envio no servidor mais o que sobra do
+    ciclo tarefa → resultado depois de descontar o trabalho do cliente.
+    """
+    client_work = metrics["time_compute"] + metrics["client_recv"] + metrics["client_decode"] + metrics["client_encode"]
+    return metrics["overhead_send"] + max(0.0, metrics["time_round_trip"] - client_work)
+
+
+if __name__ == "__main__":
+    # Importados aqui: o coordenador usa este módulo (evita import circular)
+    from matmul.server.coordinator import Coordinator
+    from matmul.server.main import HOST, PORT
+
+    parser = argparse.ArgumentParser(description="Perfil do auto-tuner: mede servidor, clientes e enlace")
+    parser.add_argument("--num-clients", type=int, default=2, help="Número de clientes esperados")
+    parser.add_argument("--port", type=int, default=PORT, help=f"Porta do servidor (padrão: {PORT})")
+    parser.add_argument(
+        "--kernel",
+        choices=available_kernels(),
+        help="Kernel a medir; deve ser o mesmo dos clientes (padrão: o anunciado por eles no handshake)",
+    )
+    parser.add_argument(
+        "--dtype",
+        choices=DTYPES,
+        action="append",
+        help="dtype das matrizes (repita para vários; padrão: listas de inteiros do Python)",
+    )
+    parser.add_argument("--size", type=int, help="Tamanho n do job de sondagem n x n x n")
+    parser.add_argument(
+        "--file",
+        default=PROFILE_DEFAULT,
+        help=f"Arquivo JSON do perfil (padrão: {PROFILE_DEFAULT})",
+    )
+    args = parser.parse_args()
+
+    profile = Profile(args.file)
+    print(f"[PERFIL] Aguardando {args.num_clients} clientes em {HOST}:{args.port}...")
+    with Coordinator(HOST, args.port) as coordinator:
+        coordinator.wait_for_workers(args.num_clients)
+        try:
+            for dtype in args.dtype or [None]:
+                profile.measure(coordinator, args.kernel, dtype, args.size)
+        except ValueError as e:
+            parser.exit(1, f"[PERFIL] {e}\n")
+    profile.save()
+    print(f"[PERFIL] Gravado em {args.file}")
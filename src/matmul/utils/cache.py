@@ -0,0 +1,79 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+from matmul.utils.sparse import is_sparse
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Estimativa de memória por elemento numa lista de listas (ponteiro + objeto Python)
+LIST_BYTES_PER_ELEMENT = 32
+
+
+def _vector_nbytes(values: Any) -> int:
+    if np is not None and isinstance(values, np.ndarray):
+        return int(values.nbytes)
+    return len(values) * LIST_BYTES_PER_ELEMENT
+
+
+def matrix_nbytes(M: Any) -> int:
+    """
+    Estima quantos bytes uma matriz ocupa na memória.
+    """
+    if np is not None and isinstance(M, np.ndarray):
+        return int(M.nbytes)
+    if is_sparse(M):
+        return sum(_vector_nbytes(v) for v in (M.indptr, M.indices, M.data))
+    if not M:
+        return 0
+    return len(M) * len(M[0]) * LIST_BYTES_PER_ELEMENT
+
+
+class LRUCache:
+    """
+    Cache LRU limitado por um orçamento de bytes.
+
+    O item mais recente é sempre mantido, mesmo que sozinho passe do orçamento,
+    para que uma matriz grande ainda possa ser usada logo após ser guardada.
+    """
+
+    def __init__(self, budget_bytes: int, sizeof: Callable[[Any], int] = matrix_nbytes):
+        self.budget_bytes = budget_bytes
+        self.sizeof = sizeof
+        self.used_bytes = 0
+        self._items: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._sizes = {}
+        self._lock = threading.Lock()
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._items
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            if key not in self._items:
+                return None
+            self._items.move_to_end(key)
+            return self._items[key]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        size = self.sizeof(value)
+        with self._lock:
+            if key in self._items:
+                self.used_bytes -= self._sizes[key]
+            self._items[key] = value
+            self._items.move_to_end(key)
+            self._sizes[key] = size
+            self.used_bytes += size
+            self._evict()
+
+    def _evict(self) -> None:
+        while self.used_bytes > self.budget_bytes and len(self._items) > 1:
+            key, _ = self._items.popitem(last=False)
+            self.used_bytes -= self._sizes.pop(key)
@@ -0,0 +1,213 @@
+import lzma
+import threading
+import time
+import zlib
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+try:
+    import lz4.frame as _lz4
+except ImportError:  # lz4 é opcional
+    _lz4 = None
+
+try:
+    import zstandard as _zstd
+except ImportError:  # zstd é opcional
+    _zstd = None
+
+# Modos de compressão (além do nome de um codec, que fixa a escolha)
+COMPRESS_AUTO = "auto"
+COMPRESS_OFF = "off"
+
+# Payload enviado sem compressão
+CODEC_NONE = "none"
+
+# Payloads menores que isso não compensam o custo de comprimir
+MIN_COMPRESS_BYTES = 64 * 1024
+
+# Amostra comprimida para medir razão e velocidade de cada codec
+PROBE_BYTES = 64 * 1024
+# A cada PROBE_INTERVAL payloads os codecs são medidos de novo (os dados mudam)
+PROBE_INTERVAL = 32
+
+# Só envios grandes medem a vazão: rajadas menores cabem no buffer do socket
+THROUGHPUT_SAMPLE_BYTES = 1024 * 1024
+
+# Peso da medida mais recente nas médias móveis
+EWMA_ALPHA = 0.3
+
+# Codecs: nome -> (comprimir, descomprimir). Níveis rápidos: o alvo é a rede,
+# não a menor saída possível.
+_CODECS: Dict[str, Tuple[Callable[[bytes], bytes], Callable[[bytes], bytes]]] = {
+    "zlib": (lambda data: zlib.compress(data, 1), zlib.decompress),
+    "lzma": (lambda data: lzma.compress(data, preset=0), lzma.decompress),
+}
+if _lz4 is not None:
+    _CODECS["lz4"] = (_lz4.compress, _lz4.decompress)
+if _zstd is not None:
+    _CODECS["zstd"] = (
+        lambda data: _zstd.ZstdCompressor(level=1).compress(data),
+        lambda data: _zstd.ZstdDecompressor().decompress(data),
+    )
+
+# Ordem de preferência anunciada no handshake (os mais rápidos primeiro)
+_PREFERENCE = ("lz4", "zstd", "zlib", "lzma")
+
+
+def available_codecs() -> Tuple[str, ...]:
+    """
+    Codecs disponíveis neste ambiente, em ordem de preferência.
+    """
+    return tuple(name for name in _PREFERENCE if name in _CODECS)
+
+
+def compress(codec: str, data: bytes) -> bytes:
+    return _CODECS[codec][0](data)
+
+
+def decompress(codec: str, data: bytes, size: int) -> bytes:
+    """
+    Descomprime um payload e confere se ele tem o tamanho esperado.
+    """
+    raw = _CODECS[codec][1](data)
+    if len(raw) != size:
+        raise ValueError(f"Payload {codec} com {len(raw)} bytes; esperados {size}")
+    return raw
+
+
+def codecs_for_mode(mode: str) -> Tuple[str, ...]:
+    """
+    Codecs anunciados no handshake para um modo de --compress.
+    """
+    if mode == COMPRESS_OFF:
+        return ()
+    if mode == COMPRESS_AUTO:
+        return available_codecs()
+    if mode not in _CODECS:
+        raise ValueError(f"Codec de compressão indisponível: {mode}")
+    return (mode,)
+
+
+def make_compressor(codecs: Sequence[str], mode: str = COMPRESS_AUTO, link_mbps: float = 0.0) -> Optional["AdaptiveCompressor"]:
+    """
+    Compressor de uma conexão a partir dos codecs negociados, ou None se não
+    houver codec em comum. `link_mbps` > 0 fixa a vazão do enlace (Mbit/s)
+    em vez de medi-la.
+    """
+    if mode == COMPRESS_OFF or not codecs:
+        return None
+    link_bytes_per_s = link_mbps * 1e6 / 8 if link_mbps > 0 else None
+    return AdaptiveCompressor(codecs, mode, link_bytes_per_s)
+
+
+class AdaptiveCompressor:
+    """
+    Escolhe, para cada payload enviado numa conexão, o codec (ou nenhum) que
+    minimiza o tempo estimado de entrega:
+
+        sem compressão: n / vazão
+        com codec:      n / velocidade do codec + n * razão / vazão
+
+    A vazão do enlace vem do tempo gasto nos envios grandes (ou de
+    `link_bytes_per_s`, se informada); razão e velocidade de cada codec vêm de
+    amostras do próprio payload, renovadas de tempos em tempos. Enquanto a
+    vazão não foi medida, os payloads saem crus (e servem de medida).
+    """
+
+    def __init__(
+        self,
+        codecs: Sequence[str],
+        mode: str = COMPRESS_AUTO,
+        link_bytes_per_s: Optional[float] = None,
+    ):
+        self.codecs: List[str] = [c for c in codecs if c in _CODECS]
+        if mode not in (COMPRESS_AUTO, COMPRESS_OFF):
+            # Codec fixo: só vale se o par também o aceitar
+            self.codecs = [c for c in self.codecs if c == mode]
+        self.mode = mode
+        self.fixed_throughput = link_bytes_per_s is not None
+        self.throughput: Optional[float] = link_bytes_per_s
+        # codec -> (razão comprimido/original, bytes por segundo na compressão)
+        self.stats: Dict[str, Tuple[float, float]] = {}
+        # Payloads enviados por codec (inclui CODEC_NONE)
+        self.counts: Dict[str, int] = {}
+        self._payloads = 0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != COMPRESS_OFF and bool(self.codecs)
+
+    def observe_send(self, nbytes: int, seconds: float) -> None:
+        """
+        Registra um envio de `nbytes` que levou `seconds` no socket.
+        """
+        if self.fixed_throughput or nbytes < THROUGHPUT_SAMPLE_BYTES or seconds <= 0:
+            return
+        rate = nbytes / seconds
+        with self._lock:
+            if self.throughput is None:
+                self.throughput = rate
+            else:
+                self.throughput += EWMA_ALPHA * (rate - self.throughput)
+
+    def _update(self, codec: str, original: int, compressed: int, seconds: float) -> None:
+        ratio = compressed / original
+        speed = original / max(seconds, 1e-9)
+        old = self.stats.get(codec)
+        if old is not None:
+            ratio = old[0] + EWMA_ALPHA * (ratio - old[0])
+            speed = old[1] + EWMA_ALPHA * (speed - old[1])
+        self.stats[codec] = (ratio, speed)
+
+    def _probe(self, payload: bytes) -> None:
+        sample = bytes(memoryview(payload)[:PROBE_BYTES])
+        for codec in self.codecs:
+            start = time.perf_counter()
+            out = compress(codec, sample)
+            self._update(codec, len(sample), len(out), time.perf_counter() - start)
+
+    def choose(self, payload: bytes) -> str:
+        """
+        Codec para este payload (CODEC_NONE quando comprimir não compensa).
+        """
+        n = len(payload)
+        if not self.enabled or n < MIN_COMPRESS_BYTES:
+            return CODEC_NONE
+        if self.mode != COMPRESS_AUTO:
+            return self.codecs[0]
+
+        with self._lock:
+            if self.throughput is None:
+                return CODEC_NONE
+            if self._payloads % PROBE_INTERVAL == 0 or len(self.stats) < len(self.codecs):
+                self._probe(payload)
+            self._payloads += 1
+            best, best_time = CODEC_NONE, n / self.throughput
+            for codec, (ratio, speed) in self.stats.items():
+                estimate = n / speed + n * ratio / self.throughput
+                if estimate < best_time:
+                    best, best_time = codec, estimate
+            return best
+
+    def compress(self, payload: bytes) -> Tuple[str, bytes]:
+        """
+        Devolve (codec, payload) já comprimido com o codec escolhido.
+        """
+        codec = self.choose(payload)
+        if codec != CODEC_NONE:
+            start = time.perf_counter()
+            out = compress(codec, payload)
+            with self._lock:
+                self._update(codec, len(payload), len(out), time.perf_counter() - start)
+            # Não ajudou (dados aleatórios): manda o original
+            if len(out) < len(payload):
+                payload = out
+            else:
+                codec = CODEC_NONE
+        with self._lock:
+            self.counts[codec] = self.counts.get(codec, 0) + 1
+        return codec, payload
+
+    def summary(self) -> str:
+        counts = ", ".join(f"{codec}: {n}" for codec, n in sorted(self.counts.items()))
+        return counts or "nenhum payload grande"
@@ -0,0 +1,135 @@
+import math
+from array import array
+from typing import Any, Dict, Optional, Tuple
+
+# dtypes de matriz suportados no fio e nos kernels
+INT_DTYPES = ("int8", "int16", "int32", "int64")
+FLOAT_DTYPES = ("float32", "float64")
+DTYPES = INT_DTYPES + FLOAT_DTYPES
+
+# dtype -> bytes por elemento
+ITEMSIZE: Dict[str, int] = {
+    "int8": 1,
+    "int16": 2,
+    "int32": 4,
+    "int64": 8,
+    "float32": 4,
+    "float64": 8,
+}
+
+
+def _int_typecode(size: int) -> str:
+    # O tamanho de 'i'/'l' no módulo array depende da plataforma
+    return next(code for code in "bhilq" if array(code).itemsize == size)
+
+
+# dtype -> typecode do módulo array (para listas puras, sem numpy)
+TYPECODES: Dict[str, str] = {
+    "int8": "b",
+    "int16": "h",
+    "int32": _int_typecode(4),
+    "int64": "q",
+    "float32": "f",
+    "float64": "d",
+}
+
+# Inteiros representados exatamente em float32 / float64 (bits da mantissa + 1)
+_FLOAT_EXACT_BITS = {"float32": 24, "float64": 53}
+
+
+def is_float(dtype: str) -> bool:
+    return dtype in FLOAT_DTYPES
+
+
+def int_range(dtype: str) -> Tuple[int, int]:
+    bits = ITEMSIZE[dtype] * 8
+    return -(1 << (bits - 1)), (1 << (bits - 1)) - 1
+
+
+def smallest_int_dtype(lo: int, hi: int) -> str:
+    """
+    Menor dtype inteiro que representa todos os valores em [lo, hi].
+    """
+    for dtype in INT_DTYPES:
+        low, high = int_range(dtype)
+        if low <= lo and hi <= high:
+            return dtype
+    raise OverflowError(f"Valores fora do intervalo de int64: [{lo}, {hi}]")
+
+
+def normalize_dtype(dtype: Any) -> str:
+    """
+    dtype suportado mais próximo de um numpy.dtype qualquer, sem perder valores:
+    uint8 -> int16, bool -> int8, float16 -> float32 etc.
+    """
+    if dtype.name in DTYPES:
+        return dtype.name
+    if dtype.kind == "b":
+        return "int8"
+    if dtype.kind == "u":
+        return INT_DTYPES[min(len(INT_DTYPES) - 1, INT_DTYPES.index(f"int{dtype.itemsize * 8}") + 1)]
+    if dtype.kind == "i":
+        return "int64"
+    if dtype.kind == "f" and dtype.itemsize < 4:
+        return "float32"
+    return "float64"
+
+
+def _magnitude_bits(dtype: str) -> int:
+    # |x| <= 2**bits para qualquer valor do dtype inteiro
+    return ITEMSIZE[dtype] * 8 - 1
+
+
+def product_bits(dtype_a: str, dtype_b: str, inner: int) -> int:
+    """
+    Limite (em bits) do valor absoluto de um elemento de C = A x B para
+    matrizes inteiras com dimensão interna `inner`.
+    """
+    return _magnitude_bits(dtype_a) + _magnitude_bits(dtype_b) + math.ceil(math.log2(max(1, inner)))
+
+
+def accumulation_dtype(dtype_a: str, dtype_b: str, inner: int) -> str:
+    """
+    dtype de C = A x B sem overflow: inteiros acumulam no menor entre int32 e
+    int64 que comporta a soma de `inner` produtos; floats ficam em float32 só
+    se nenhum operando precisar de mais precisão.
+    """
+    if is_float(dtype_a) or is_float(dtype_b):
+        narrow = ("float32", "int8", "int16")
+        return "float32" if dtype_a in narrow and dtype_b in narrow else "float64"
+    bits = product_bits(dtype_a, dtype_b, inner)
+    return "int32" if bits < 31 else "int64"
+
+
+def compute_dtype(dtype_a: str, dtype_b: str, inner: int) -> str:
+    """
+    dtype em que o kernel numpy faz a multiplicação. Inteiros cujo produto
+    cabe exatamente num float usam a BLAS (SIMD) em float32 ou float64; o
+    resultado é convertido de volta para `accumulation_dtype` sem perda.
+    """
+    acc = accumulation_dtype(dtype_a, dtype_b, inner)
+    if is_float(acc):
+        return acc
+    bits = product_bits(dtype_a, dtype_b, inner)
+    for dtype in FLOAT_DTYPES:
+        if bits <= _FLOAT_EXACT_BITS[dtype]:
+            return dtype
+    return acc
+
+
+def strassen_dtype(dtype_a: str, dtype_b: str, inner: int, levels: int) -> Optional[str]:
+    """
+    dtype em que Strassen-Winograd com `levels` níveis calcula C sem perder
+    valores (None se nem int64 comporta). A cada nível os operandos somam até
+    4 quadrantes e a dimensão interna cai pela metade (3 bits a mais por
+    produto); a combinação soma até 4 produtos (mais 2 bits).
+    """
+    acc = accumulation_dtype(dtype_a, dtype_b, inner)
+    if is_float(acc):
+        return acc
+    bits = product_bits(dtype_a, dtype_b, inner) + 3 * levels + 2
+    if bits <= _FLOAT_EXACT_BITS["float64"]:
+        return "float64"
+    if bits <= 63:
+        return "int64"
+    return None
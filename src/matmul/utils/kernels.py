@@ -0,0 +1,157 @@
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from matmul.utils.dtypes import accumulation_dtype, compute_dtype, normalize_dtype, strassen_dtype
+from matmul.utils.matrix_utils import (
+    STRASSEN_LEAF_DEFAULT,
+    Matrix,
+    multiply,
+    multiply_blocked,
+    multiply_strassen,
+    multiply_transposed,
+    strassen_levels,
+)
+from matmul.utils.sparse import is_sparse, multiply_sparse
+
+try:
+    import numpy as np
+except ImportError:  # numpy é opcional: sem ele só os kernels em Python puro ficam disponíveis
+    np = None
+
+KernelFn = Callable[[Any, Any], Any]
+
+# Registro de kernels de multiplicação: nome -> função (A, B) -> C
+KERNELS: Dict[str, KernelFn] = {}
+
+# Kernels que trabalham direto sobre ndarray (recebem/devolvem numpy)
+NUMPY_KERNELS: Set[str] = set()
+
+DEFAULT_KERNEL = "pure"
+
+# Com a BLAS, Strassen só compensa em blocos bem maiores que em Python puro
+STRASSEN_NUMPY_LEAF_DEFAULT = 1024
+
+# Tamanho de folha de cada kernel Strassen (ajustável com --strassen-leaf)
+STRASSEN_LEAF: Dict[str, int] = {
+    "strassen": STRASSEN_LEAF_DEFAULT,
+    "strassen-numpy": STRASSEN_NUMPY_LEAF_DEFAULT,
+}
+
+
+def register_kernel(name: str, numpy_native: bool = False) -> Callable[[KernelFn], KernelFn]:
+    """
+    Decorador que registra uma função de multiplicação sob `name`.
+    """
+    def decorator(fn: KernelFn) -> KernelFn:
+        KERNELS[name] = fn
+        if numpy_native:
+            NUMPY_KERNELS.add(name)
+        return fn
+    return decorator
+
+
+def get_kernel(name: str) -> KernelFn:
+    """
+    Devolve o kernel registrado com esse nome.
+    """
+    try:
+        return KERNELS[name]
+    except KeyError:
+        raise ValueError(
+            f"Kernel desconhecido: {name!r}. Disponíveis: {', '.join(available_kernels())}"
+        ) from None
+
+
+def available_kernels() -> List[str]:
+    return sorted(KERNELS)
+
+
+def as_list(M: Any) -> Matrix:
+    """
+    Converte o resultado de um kernel (ndarray ou lista) para lista de listas.
+    """
+    if np is not None and isinstance(M, np.ndarray):
+        return M.tolist()
+    return M
+
+
+def multiply_with(kernel_fn: KernelFn, A: Any, B: Any) -> Any:
+    """
+    Aplica `kernel_fn`, ou o kernel esparso se A ou B for CSR/CSC: os kernels
+    densos não sabem percorrer matrizes comprimidas.
+    """
+    if is_sparse(A) or is_sparse(B):
+        return multiply_sparse(A, B)
+    return kernel_fn(A, B)
+
+
+register_kernel("pure")(multiply)
+register_kernel("blocked")(multiply_blocked)
+register_kernel("transposed")(multiply_transposed)
+
+
+def set_strassen_leaf(leaf: Optional[int]) -> None:
+    """
+    Fixa o tamanho de folha de todos os kernels Strassen (None mantém os padrões).
+    """
+    if leaf is not None:
+        for name in STRASSEN_LEAF:
+            STRASSEN_LEAF[name] = leaf
+
+
+def restore_strassen_leaf(leaves: Dict[str, int]) -> None:
+    """
+    Initializer de processos filhos: copia os tamanhos de folha do pai.
+    """
+    STRASSEN_LEAF.update(leaves)
+
+
+@register_kernel("strassen")
+def multiply_strassen_pure(A: Matrix, B: Matrix) -> Matrix:
+    """
+    Strassen-Winograd em Python puro, com o kernel `transposed` nas folhas.
+    """
+    return multiply_strassen(A, B, STRASSEN_LEAF["strassen"])
+
+
+if np is not None:
+    @register_kernel("numpy", numpy_native=True)
+    def multiply_numpy(A: Any, B: Any) -> Any:
+        """
+        Multiplicação via np.matmul (BLAS) sobre arrays contíguos.
+
+        O resultado sai no dtype de acumulação de A e B (sem overflow: int8 x
+        int8 vira int32, por exemplo). Inteiros são multiplicados em float32
+        ou float64 sempre que o produto cabe exatamente neles, para usar a BLAS.
+        """
+        A_arr = np.asarray(A)
+        B_arr = np.asarray(B)
+        if A_arr.shape[1] != B_arr.shape[0]:
+            raise ValueError(f"Dimensões incompatíveis: {A_arr.shape[1]} != {B_arr.shape[0]}")
+        dtype_a, dtype_b = normalize_dtype(A_arr.dtype), normalize_dtype(B_arr.dtype)
+        inner = B_arr.shape[0]
+        work = compute_dtype(dtype_a, dtype_b, inner)
+        C = np.matmul(np.ascontiguousarray(A_arr, dtype=work), np.ascontiguousarray(B_arr, dtype=work))
+        return C.astype(accumulation_dtype(dtype_a, dtype_b, inner), copy=False)
+
+
+    @register_kernel("strassen-numpy", numpy_native=True)
+    def multiply_strassen_numpy(A: Any, B: Any) -> Any:
+        """
+        Strassen-Winograd sobre ndarray, com np.matmul nas folhas.
+
+        Inteiros são calculados em float64 (BLAS) enquanto os valores
+        intermediários cabem exatamente nele, senão em int64; se nem int64
+        comporta, cai no kernel `numpy` sem recursão.
+        """
+        A_arr = np.asarray(A)
+        B_arr = np.asarray(B)
+        if A_arr.shape[1] != B_arr.shape[0]:
+            raise ValueError(f"Dimensões incompatíveis: {A_arr.shape[1]} != {B_arr.shape[0]}")
+        dtype_a, dtype_b = normalize_dtype(A_arr.dtype), normalize_dtype(B_arr.dtype)
+        inner = B_arr.shape[0]
+        leaf = STRASSEN_LEAF["strassen-numpy"]
+        work = strassen_dtype(dtype_a, dtype_b, inner, strassen_levels(A_arr.shape[0], inner, B_arr.shape[1], leaf))
+        if work is None:
+            return multiply_numpy(A_arr, B_arr)
+        C = multiply_strassen(A_arr.astype(work, copy=False), B_arr.astype(work, copy=False), leaf, np.matmul)
+        return C.astype(accumulation_dtype(dtype_a, dtype_b, inner), copy=False)
@@ -0,0 +1,82 @@
+from typing import Any, Optional, Tuple
+
+from matmul.utils.protocol import np
+
+# Job em arquivo: (especificação de A, especificação de B, especificação de saída C)
+FileJob = Tuple[str, str, str]
+
+# dtype padrão de arquivos binários crus sem dtype na especificação
+RAW_DTYPE_DEFAULT = "float64"
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise RuntimeError("Matrizes em arquivo precisam do numpy (pip install numpy).")
+
+
+def parse_spec(spec: str) -> Tuple[str, Optional[Tuple[int, int]], str]:
+    """
+    Interpreta a especificação de um arquivo de matriz.
+
+        - "A.npy": arquivo .npy (forma e dtype vêm do cabeçalho)
+        - "A.bin:1000x500" ou "A.bin:1000x500:float32": binário cru, linha a linha
+
+    Devolve (caminho, forma ou None, dtype).
+    """
+    if spec.endswith(".npy"):
+        return spec, None, ""
+
+    path, sep, rest = spec.partition(":")
+    if not sep:
+        raise ValueError(f"Arquivo binário cru precisa da forma: {spec!r} (use caminho:LINHASxCOLUNAS[:dtype])")
+    shape_text, _, dtype = rest.partition(":")
+    try:
+        rows, cols = (int(x) for x in shape_text.lower().split("x"))
+    except ValueError:
+        raise ValueError(f"Forma inválida em {spec!r}: use LINHASxCOLUNAS") from None
+    return path, (rows, cols), dtype or RAW_DTYPE_DEFAULT
+
+
+def open_matrix(spec: str) -> Any:
+    """
+    Abre uma matriz em arquivo como np.memmap somente leitura.
+
+    Nada é carregado na memória: fatias de linhas (A[i:j]) só leem do disco
+    as páginas que forem de fato usadas.
+    """
+    _require_numpy()
+    path, shape, dtype = parse_spec(spec)
+    if shape is None:
+        M = np.load(path, mmap_mode="r")
+    else:
+        M = np.memmap(path, dtype=dtype, mode="r", shape=shape)
+    if M.ndim != 2:
+        raise ValueError(f"{path}: esperada uma matriz 2D, forma {M.shape}")
+    return M
+
+
+def create_output(spec: str, rows: int, cols: int, dtype: str) -> Any:
+    """
+    Cria o arquivo de saída de C (.npy ou binário cru) mapeado em memória para escrita.
+    """
+    _require_numpy()
+    if spec.endswith(".npy"):
+        return np.lib.format.open_memmap(spec, mode="w+", dtype=dtype, shape=(rows, cols))
+    path, shape, _ = parse_spec(spec) if ":" in spec else (spec, None, "")
+    if shape is not None and shape != (rows, cols):
+        raise ValueError(f"Forma de saída {shape} difere do resultado ({rows}, {cols})")
+    return np.memmap(path, dtype=dtype, mode="w+", shape=(rows, cols))
+
+
+
+def open_file_job(files: FileJob) -> Tuple[Any, Any, str]:
+    """
+    Abre A e B de um job em arquivo e confere as dimensões.
+    Devolve (A, B, especificação de saída).
+    """
+    a_spec, b_spec, out_spec = files
+    A = open_matrix(a_spec)
+    B = open_matrix(b_spec)
+    if A.shape[1] != B.shape[0]:
+        raise ValueError(f"Dimensões incompatíveis: A {A.shape} x B {B.shape}")
+    return A, B, out_spec
@@ -1,17 +1,73 @@
 import random
-from typing import List, Tuple
+import sys
+from operator import mul
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # numpy é opcional: sem ele as matrizes são sempre listas
+    np = None
+
+from matmul.utils.sparse import CSRMatrix, generate_sparse_matrix
 
 Matrix = List[List[float]]
 
-def generate_matrix(rows: int, cols: int, min_val: int = 1, max_val: int = 10) -> Matrix:
+def generate_matrix(
+    rows: int,
+    cols: int,
+    min_val: int = 1,
+    max_val: int = 10,
+    dtype: Optional[str] = None,
+) -> Matrix:
     """
     Gera uma matriz linhas x colunas com valores aleatórios entre valor minimo e valor maximo.
+
+    Com `dtype` (int8 ... float64) e numpy instalado, devolve um ndarray
+    nesse dtype, que viaja compacto no fio; sem dtype, uma lista de listas.
     """
+    if dtype is not None and np is not None:
+        return np.random.randint(min_val, max_val + 1, size=(rows, cols)).astype(dtype)
+    cast = float if dtype is not None and dtype.startswith("float") else int
     return [
-        [random.randint(min_val, max_val) for _ in range(cols)]
+        [cast(random.randint(min_val, max_val)) for _ in range(cols)]
         for _ in range(rows)
     ]
 
+def generate_operands(
+    rows_A: int,
+    cols_A: int,
+    cols_B: int,
+    dtype: Optional[str] = None,
+    density: Optional[float] = None,
+    sparse_b: bool = False,
+) -> Tuple[Any, Any]:
+    """
+    Gera as matrizes A e B de um job. Com `density`, A é uma CSRMatrix com
+    essa fração de não nulos (e B também, com `sparse_b`).
+    """
+    if density is None:
+        return generate_matrix(rows_A, cols_A, dtype=dtype), generate_matrix(cols_A, cols_B, dtype=dtype)
+    A = generate_sparse_matrix(rows_A, cols_A, density, dtype=dtype)
+    if sparse_b:
+        return A, generate_sparse_matrix(cols_A, cols_B, density, dtype=dtype)
+    return A, generate_matrix(cols_A, cols_B, dtype=dtype)
+
+
+def describe_operands(A: Any, B: Any) -> str:
+    """
+    Resumo de representação das matrizes para os logs: dtype, CSR e densidade.
+    """
+    parts = []
+    for name, M in (("A", A), ("B", B)):
+        if isinstance(M, CSRMatrix):
+            parts.append(f"{name} CSR {M.dtype} {M.density:.1%}")
+        elif np is not None and isinstance(M, np.ndarray):
+            parts.append(f"{name} {M.dtype}")
+        else:
+            parts.append(f"{name} listas")
+    return ", ".join(parts)
+
+
 def multiply(A: Matrix, B: Matrix) -> Matrix:
     """
     Multiplica duas matrizes A e B usando a definição matemática:
@@ -38,6 +94,246 @@ def multiply(A: Matrix, B: Matrix) -> Matrix:
 
     return C
 
+def multiply_blocked(A: Matrix, B: Matrix, block_size: int = 64) -> Matrix:
+    """
+    Multiplicação em blocos (tiles) de `block_size`, em Python puro.
+
+    Percorre B linha a linha dentro de cada bloco (ordem i-k-j), o que evita o
+    acesso por coluna B[k][j] do laço clássico. Para cada C[i][j] os termos são
+    somados na mesma ordem de k que em `multiply`, então o resultado é idêntico.
+    """
+
+    if len(A[0]) != len(B):
+        raise ValueError(f"Dimensões incompatíveis: {len(A[0])} != {len(B)}")
+
+    n = len(A)
+    m = len(A[0])
+    p = len(B[0])
+
+    C = [[0 for _ in range(p)] for _ in range(n)]
+
+    for ii in range(0, n, block_size):
+        i_end = min(ii + block_size, n)
+        for kk in range(0, m, block_size):
+            k_end = min(kk + block_size, m)
+            for jj in range(0, p, block_size):
+                j_end = min(jj + block_size, p)
+                for i in range(ii, i_end):
+                    A_i = A[i]
+                    C_i = C[i]
+                    for k in range(kk, k_end):
+                        a_ik = A_i[k]
+                        B_k = B[k]
+                        for j in range(jj, j_end):
+                            C_i[j] += a_ik * B_k[j]
+
+    return C
+
+# A partir do Python 3.12, sum() de floats usa soma compensada e deixa de
+# reproduzir a soma sequencial de `multiply`
+_SEQUENTIAL_FLOAT_SUM = sys.version_info < (3, 12)
+
+
+def _all_ints(M: Matrix) -> bool:
+    return all(type(x) is int for row in M for x in row)
+
+
+def multiply_transposed(A: Matrix, B: Matrix, block_size: int = 64) -> Matrix:
+    """
+    Multiplicação em blocos com B transposta uma única vez, em Python puro.
+
+    Cada C[i][j] vira `sum(map(mul, A[i], BT[j]))`: o produto escalar roda
+    no laço C de sum/map, sem indexação em Python. Cada bloco de `block_size`
+    linhas de BT é percorrido por todas as linhas de A antes do próximo.
+
+    O resultado é idêntico ao de `multiply`. Com floats no Python 3.12+ (onde
+    sum() compensa o arredondamento) cada linha de C é acumulada linha a
+    linha de B, na mesma ordem de k do laço clássico.
+    """
+
+    if len(A[0]) != len(B):
+        raise ValueError(f"Dimensões incompatíveis: {len(A[0])} != {len(B)}")
+
+    n = len(A)
+    p = len(B[0])
+
+    if not _SEQUENTIAL_FLOAT_SUM and not (_all_ints(A) and _all_ints(B)):
+        return _multiply_rows(A, B)
+
+    BT = list(zip(*B))
+    C = [[0] * p for _ in range(n)]
+
+    for jj in range(0, p, block_size):
+        j_end = min(jj + block_size, p)
+        BT_block = BT[jj:j_end]
+        for A_i, C_i in zip(A, C):
+            C_i[jj:j_end] = [sum(map(mul, A_i, BT_j)) for BT_j in BT_block]
+
+    return C
+
+
+def _multiply_rows(A: Matrix, B: Matrix) -> Matrix:
+    # C[i] = soma de A[i][k] * B[k] por compreensão de lista, k em ordem crescente
+    p = len(B[0])
+    C = []
+    for A_i in A:
+        C_i = [0] * p
+        for a_ik, B_k in zip(A_i, B):
+            C_i = [c + a_ik * b for c, b in zip(C_i, B_k)]
+        C.append(C_i)
+    return C
+
+
+# Abaixo deste tamanho (maior dimensão) Strassen volta ao kernel base
+STRASSEN_LEAF_DEFAULT = 64
+
+
+def _is_array(M: Any) -> bool:
+    return getattr(M, "ndim", None) == 2
+
+
+def _add(X: Any, Y: Any) -> Any:
+    if _is_array(X):
+        return X + Y
+    return [[x + y for x, y in zip(X_i, Y_i)] for X_i, Y_i in zip(X, Y)]
+
+
+def _sub(X: Any, Y: Any) -> Any:
+    if _is_array(X):
+        return X - Y
+    return [[x - y for x, y in zip(X_i, Y_i)] for X_i, Y_i in zip(X, Y)]
+
+
+def _quadrants(M: Any) -> Tuple[Any, Any, Any, Any]:
+    h, w = len(M) // 2, len(M[0]) // 2
+    rows, cols = len(M), len(M[0])
+    return (
+        submatrix(M, 0, h, 0, w),
+        submatrix(M, 0, h, w, cols),
+        submatrix(M, h, rows, 0, w),
+        submatrix(M, h, rows, w, cols),
+    )
+
+
+def _join(C11: Any, C12: Any, C21: Any, C22: Any) -> Any:
+    if _is_array(C11):
+        return np.block([[C11, C12], [C21, C22]])
+    return [a + b for a, b in zip(C11, C12)] + [a + b for a, b in zip(C21, C22)]
+
+
+def strassen_levels(n: int, m: int, p: int, leaf_size: int = STRASSEN_LEAF_DEFAULT) -> int:
+    """
+    Níveis de recursão de Strassen até que a maior dimensão caiba em `leaf_size`.
+    """
+    levels = 0
+    while -(-max(n, m, p) // (1 << levels)) > leaf_size:
+        levels += 1
+    return levels
+
+
+def pad_matrix(M: Any, rows: int, cols: int) -> Any:
+    """
+    M completada com zeros até rows x cols (M mesma, se já tiver esse tamanho).
+    """
+    n, m = len(M), len(M[0])
+    if (n, m) == (rows, cols):
+        return M
+    if _is_array(M):
+        return np.pad(M, ((0, rows - n), (0, cols - m)))
+    padded = [list(row) + [0] * (cols - m) for row in M]
+    padded.extend([0] * cols for _ in range(rows - n))
+    return padded
+
+
+def winograd_operands(A: Any, B: Any) -> List[Tuple[Any, Any]]:
+    """
+    Os 7 pares (X, Y) de um nível de Strassen-Winograd: C = A x B sai de
+    `winograd_combine` aplicada aos produtos X x Y. As dimensões de A e B
+    precisam ser pares (veja `pad_matrix`).
+    """
+    A11, A12, A21, A22 = _quadrants(A)
+    B11, B12, B21, B22 = _quadrants(B)
+
+    S1 = _add(A21, A22)
+    S2 = _sub(S1, A11)
+    S3 = _sub(A11, A21)
+    S4 = _sub(A12, S2)
+    T1 = _sub(B12, B11)
+    T2 = _sub(B22, T1)
+    T3 = _sub(B22, B12)
+    T4 = _sub(T2, B21)
+
+    return [(A11, B11), (A12, B21), (S4, B22), (A22, T4), (S1, T1), (S2, T2), (S3, T3)]
+
+
+def winograd_combine(P: List[Any]) -> Any:
+    """
+    Monta C a partir dos 7 produtos de `winograd_operands` (15 somas no total).
+    """
+    P1, P2, P3, P4, P5, P6, P7 = P
+    U2 = _add(P1, P6)
+    U3 = _add(U2, P7)
+    U4 = _add(U2, P5)
+    return _join(_add(P1, P2), _add(U4, P3), _sub(U3, P4), _add(U3, P5))
+
+
+def multiply_strassen(
+    A: Matrix,
+    B: Matrix,
+    leaf_size: int = STRASSEN_LEAF_DEFAULT,
+    base: Callable[[Any, Any], Any] = multiply_transposed,
+) -> Matrix:
+    """
+    Multiplicação recursiva de Strassen-Winograd: 7 produtos de metade do
+    tamanho por nível em vez de 8, O(n^2.81). Abaixo de `leaf_size` usa o
+    kernel `base`. Dimensões que não se dividem por 2 a cada nível são
+    completadas com zeros uma única vez, no início.
+
+    Inteiros dão o mesmo resultado de `multiply`; floats diferem nos últimos
+    bits, pois as somas e subtrações mudam o arredondamento.
+    """
+
+    if len(A[0]) != len(B):
+        raise ValueError(f"Dimensões incompatíveis: {len(A[0])} != {len(B)}")
+
+    n, m, p = len(A), len(B), len(B[0])
+    levels = strassen_levels(n, m, p, leaf_size)
+    if levels == 0:
+        return base(A, B)
+
+    step = 1 << levels
+    rows, inner, cols = (-(-d // step) * step for d in (n, m, p))
+    C = _strassen(pad_matrix(A, rows, inner), pad_matrix(B, inner, cols), levels, base)
+    if (rows, cols) != (n, p):
+        C = submatrix(C, 0, n, 0, p)
+    return C
+
+
+def _strassen(A: Any, B: Any, levels: int, base: Callable[[Any, Any], Any]) -> Any:
+    if levels == 0:
+        return base(A, B)
+    return winograd_combine([_strassen(X, Y, levels - 1, base) for X, Y in winograd_operands(A, B)])
+
+
+def split_ranges(n: int, num_parts: int) -> List[Tuple[int, int]]:
+    """
+    Divide o intervalo [0, n) em `num_parts` faixas contíguas [início, fim)
+    de tamanhos o mais iguais possível (as primeiras recebem o resto).
+    """
+    size = n // num_parts
+    remainder = n % num_parts
+
+    ranges = []
+    start = 0
+
+    for i in range(num_parts):
+        extra = 1 if i < remainder else 0
+        end = start + size + extra
+        ranges.append((start, end))
+        start = end
+
+    return ranges
+
 def split_matrix_by_rows(A: Matrix, num_parts: int) -> List[Matrix]:
     """
     Divide a matriz A em `num_parts` blocos de linhas.
@@ -50,26 +346,90 @@ def split_matrix_by_rows(A: Matrix, num_parts: int) -> List[Matrix]:
     Retorna: [A1, A2, ...]
     """
 
-    rows = len(A)
-    block_size = rows // num_parts
-    remainder = rows % num_parts
+    return [A[start:end] for start, end in split_ranges(len(A), num_parts)]
 
-    blocks = []
-    start = 0
+def submatrix(M: Matrix, r0: int, r1: int, c0: int, c1: int) -> Matrix:
+    """
+    M[r0:r1][c0:c1]. Em ndarray (inclusive np.memmap) devolve uma visão, sem copiar.
+    """
+    if getattr(M, "ndim", None) == 2:
+        return M[r0:r1, c0:c1]
+    return [row[c0:c1] for row in M[r0:r1]]
 
-    for i in range(num_parts):
-        extra = 1 if i < remainder else 0
-        end = start + block_size + extra
-        blocks.append(A[start:end])
-        start = end
+def split_matrix_2d(
+    A: Matrix,
+    B: Matrix,
+    row_parts: int,
+    col_parts: int,
+    k_parts: int = 1,
+) -> List[Dict[str, Any]]:
+    """
+    Divide o produto A x B em tiles 2D (linhas de A x colunas de B), com
+    divisão opcional também na dimensão interna k (estilo SUMMA).
 
-    return blocks
+    Cada tile é um dicionário:
+        - "rows": (r0, r1) faixa de linhas de C
+        - "cols": (c0, c1) faixa de colunas de C
+        - "k":    (k0, k1) faixa da dimensão interna
+        - "A":    A[r0:r1][k0:k1]
+        - "B":    B[k0:k1][c0:c1]
+
+    O produto A_tile x B_tile é uma parcela do bloco C[r0:r1][c0:c1]; com
+    k_parts > 1 as parcelas do mesmo bloco precisam ser somadas
+    (veja `assemble_tiles`). Cada tile ocupa O(n²/p) em vez de O(n²).
+    """
+
+    if len(A[0]) != len(B):
+        raise ValueError(f"Dimensões incompatíveis: {len(A[0])} != {len(B)}")
+
+    row_ranges = split_ranges(len(A), row_parts)
+    col_ranges = split_ranges(len(B[0]), col_parts)
+    k_ranges = split_ranges(len(B), k_parts)
+
+    tiles = []
+    for r0, r1 in row_ranges:
+        for c0, c1 in col_ranges:
+            for k0, k1 in k_ranges:
+                tiles.append({
+                    "rows": (r0, r1),
+                    "cols": (c0, c1),
+                    "k": (k0, k1),
+                    "A": submatrix(A, r0, r1, k0, k1),
+                    "B": submatrix(B, k0, k1, c0, c1),
+                })
+
+    return tiles
+
+def assemble_tiles(
+    tiles: List[Dict[str, Any]],
+    partials: Dict[int, Matrix],
+    rows: int,
+    cols: int,
+) -> Matrix:
+    """
+    Redução do lado do servidor: monta C somando cada parcela `partials[i]`
+    (resultado do tile i) na posição do seu bloco.
+    """
+
+    C = [[0 for _ in range(cols)] for _ in range(rows)]
+
+    for index, tile in enumerate(tiles):
+        r0, _ = tile["rows"]
+        c0, c1 = tile["cols"]
+        for offset, partial_row in enumerate(partials[index]):
+            C_row = C[r0 + offset]
+            for j in range(c0, c1):
+                C_row[j] += partial_row[j - c0]
+
+    return C
 
 def print_matrix(M: Matrix, name: str = "Matriz"):
     """
     Exibe a matriz de forma legível.
     """
     print(f"\n{name}:")
+    if hasattr(M, "to_dense"):
+        M = M.to_dense()
     for row in M:
         print("  ", row)
     print()
@@ -79,5 +439,7 @@ def dimensions(M: Matrix) -> Tuple[int, int]:
     """
     Retorna (linhas, colunas) da matriz.
     """
+    if hasattr(M, "shape"):
+        return M.shape[0], M.shape[1]
     return len(M), len(M[0])
 
@@ -1,7 +1,50 @@
+import asyncio
+import hashlib
 import json
 import struct
 import socket
-from typing import Any, Dict
+import sys
+import time
+from array import array
+from itertools import chain
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from matmul.utils.compression import CODEC_NONE, AdaptiveCompressor, decompress
+from matmul.utils.dtypes import ITEMSIZE, TYPECODES, normalize_dtype, smallest_int_dtype
+from matmul.utils.sparse import CSCMatrix, CSRMatrix, FORMAT_CSC, is_sparse
+
+try:
+    import numpy as np
+except ImportError:  # numpy é opcional: o formato binário funciona com listas puras
+    np = None
+
+# Formatos de mensagem suportados no fio
+WIRE_JSON = "json"
+WIRE_BINARY = "binary"
+WIRE_FORMATS = (WIRE_BINARY, WIRE_JSON)  # ordem de preferência
+
+# Chave reservada no cabeçalho das mensagens binárias
+ARRAYS_KEY = "__arrays__"
+
+# Chaves de matrizes que um `sink` já gravou no destino (não aparecem na mensagem)
+WRITTEN_KEY = "__written__"
+# Tempos (em segundos) das fases do cliente, enviados no cabeçalho do resultado
+PHASES_KEY = "phases"
+
+# Destino opcional de um payload: (cabeçalho, descritor) -> região gravável ou None
+Sink = Callable[[Dict[str, Any], Dict[str, Any]], Optional[memoryview]]
+
+# Tamanho das faixas lidas de cada vez ao calcular o hash de um ndarray
+DIGEST_CHUNK_BYTES = 16 * 1024 * 1024
+
+
+def configure_socket(sock: socket.socket) -> None:
+    """
+    Desliga o algoritmo de Nagle: as mensagens binárias saem em vários
+    sendall (cabeçalho + payloads) e não podem esperar pelo ACK atrasado do par.
+    """
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
 
 def send_json(sock: socket.socket, data: Dict[str, Any]) -> None:
     """
@@ -12,22 +55,28 @@ def send_json(sock: socket.socket, data: Dict[str, Any]) -> None:
     sock.sendall(size + raw)
 
 
-def recv_exactly(sock: socket.socket, size: int) -> bytes:
+def recv_exactly_into(sock: socket.socket, view: memoryview) -> None:
     """
-    Lê exatamente 'size' bytes do socket, ou levanta erro se a conexão fechar.
+    Preenche 'view' inteiro com bytes do socket, sem cópias intermediárias.
     """
-    chunks = []
     bytes_read = 0
+    size = len(view)
 
     while bytes_read < size:
-        chunk = sock.recv(size - bytes_read)
-        if not chunk:
+        n = sock.recv_into(view[bytes_read:], size - bytes_read)
+        if n == 0:
             # conexão fechada antes de receber tudo
             raise ConnectionError("Conexão encerrada inesperadamente.")
-        chunks.append(chunk)
-        bytes_read += len(chunk)
+        bytes_read += n
+
 
-    return b"".join(chunks)
+def recv_exactly(sock: socket.socket, size: int) -> bytearray:
+    """
+    Lê exatamente 'size' bytes do socket, ou levanta erro se a conexão fechar.
+    """
+    buf = bytearray(size)
+    recv_exactly_into(sock, memoryview(buf))
+    return buf
 
 
 def recv_json(sock: socket.socket) -> Dict[str, Any]:
@@ -41,4 +90,513 @@ def recv_json(sock: socket.socket) -> Dict[str, Any]:
     # Agora lê exatamente 'size' bytes de payload
     raw = recv_exactly(sock, size)
     data = json.loads(raw.decode("utf-8"))
-    return data
\ No newline at end of file
+    return data
+
+
+# ============================================================
+# FORMATO BINÁRIO
+# ============================================================
+#
+# Uma mensagem binária é um JSON comum (mesmo enquadramento de send_json)
+# cujo cabeçalho traz a lista ARRAYS_KEY, seguido dos payloads crus de cada
+# matriz, na mesma ordem da lista:
+#
+#   [4 bytes tamanho][JSON cabeçalho][payload 1][payload 2]...
+#
+# Cada entrada de ARRAYS_KEY descreve {"key", "shape", "dtype"}. Os payloads
+# são little-endian, linha a linha, em qualquer dtype de matmul.utils.dtypes
+# (int8 a int64, float32, float64). Um payload comprimido traz também
+# {"codec", "nbytes"}: o codec (negociado no handshake) e o tamanho que de
+# fato segue no fio.
+#
+# Matrizes esparsas (CSR/CSC) trazem ainda {"format", "nnz", "index_dtype"};
+# o payload é indptr, indices e data, um após o outro, e o tamanho no fio
+# acompanha o número de não nulos, não linhas x colunas.
+
+# Índices esparsos em int32 enquanto couberem
+_INDEX_LIMIT_INT32 = 2 ** 31 - 1
+
+
+def _is_matrix(value: Any) -> bool:
+    if is_sparse(value):
+        return True
+    if np is not None and isinstance(value, np.ndarray):
+        return value.ndim == 2
+    return isinstance(value, list) and len(value) > 0 and isinstance(value[0], list)
+
+
+def matrix_dtype(M: Any) -> str:
+    """
+    dtype usado no fio para a matriz. Um ndarray mantém o próprio dtype (ou o
+    suportado mais próximo); numa lista de listas, "float64" se houver algum
+    float, senão o menor inteiro que comporta os valores (1..10 cabem em int8).
+    """
+    if is_sparse(M):
+        return M.dtype
+    if np is not None and isinstance(M, np.ndarray):
+        return normalize_dtype(M.dtype)
+    for row in M:
+        for x in row:
+            if isinstance(x, float):
+                return "float64"
+    if not M or not M[0]:
+        return "int64"
+    return smallest_int_dtype(min(map(min, M)), max(map(max, M)))
+
+
+def _np_dtype(dtype: str) -> Any:
+    # Payloads são sempre little-endian
+    return np.dtype(dtype).newbyteorder("<")
+
+
+def payload_size(desc: Dict[str, Any]) -> int:
+    """
+    Bytes do payload cru de uma matriz, pela forma e dtype do descritor.
+    """
+    rows, cols = desc["shape"]
+    if "format" in desc:
+        pointers = (cols if desc["format"] == FORMAT_CSC else rows) + 1
+        return (pointers + desc["nnz"]) * ITEMSIZE[desc["index_dtype"]] + desc["nnz"] * ITEMSIZE[desc["dtype"]]
+    return rows * cols * ITEMSIZE[desc["dtype"]]
+
+
+def _pack(values: Any, dtype: str) -> bytes:
+    """
+    Vetor (lista ou ndarray) como bytes little-endian no dtype pedido.
+    """
+    if np is not None and isinstance(values, np.ndarray):
+        return np.ascontiguousarray(values, dtype=_np_dtype(dtype)).tobytes()
+    flat = array(TYPECODES[dtype], values)
+    if sys.byteorder == "big":
+        flat.byteswap()
+    return flat.tobytes()
+
+
+def _unpack(buf: Any, dtype: str, as_numpy: bool) -> Any:
+    """
+    Inverso de _pack: ndarray (sem cópia) com `as_numpy`, senão lista.
+    """
+    if as_numpy and np is not None:
+        return np.frombuffer(buf, dtype=_np_dtype(dtype))
+    if sys.byteorder == "big":
+        flat = array(TYPECODES[dtype])
+        flat.frombytes(buf)
+        flat.byteswap()
+        return flat.tolist()
+    return memoryview(buf).cast(TYPECODES[dtype]).tolist()
+
+
+def _encode_sparse(M: Any) -> Tuple[Dict[str, Any], bytes]:
+    index_dtype = "int32" if max(M.nnz, *M.shape) <= _INDEX_LIMIT_INT32 else "int64"
+    desc = {
+        "shape": list(M.shape),
+        "dtype": M.dtype,
+        "format": M.format,
+        "nnz": M.nnz,
+        "index_dtype": index_dtype,
+    }
+    base = int(M.indptr[0])
+    indptr = [int(p) - base for p in M.indptr] if base else M.indptr
+    payload = b"".join((
+        _pack(indptr, index_dtype),
+        _pack(M.indices[:M.nnz], index_dtype),
+        _pack(M.data[:M.nnz], M.dtype),
+    ))
+    return desc, payload
+
+
+def _decode_sparse(desc: Dict[str, Any], buf: Any, as_numpy: bool) -> Any:
+    rows, cols = desc["shape"]
+    nnz = desc["nnz"]
+    index_size = ITEMSIZE[desc["index_dtype"]]
+    pointers = (cols if desc["format"] == FORMAT_CSC else rows) + 1
+    view = memoryview(buf)
+    cut1 = pointers * index_size
+    cut2 = cut1 + nnz * index_size
+    indptr = _unpack(view[:cut1], desc["index_dtype"], as_numpy)
+    indices = _unpack(view[cut1:cut2], desc["index_dtype"], as_numpy)
+    data = _unpack(view[cut2:], desc["dtype"], as_numpy)
+    cls = CSCMatrix if desc["format"] == FORMAT_CSC else CSRMatrix
+    return cls((rows, cols), indptr, indices, data, desc["dtype"])
+
+
+def encode_matrix(M: Any) -> Tuple[Dict[str, Any], bytes]:
+    """
+    Converte uma matriz (lista de listas, ndarray ou CSR/CSC) em (descritor, payload).
+    """
+    if is_sparse(M):
+        return _encode_sparse(M)
+    dtype = matrix_dtype(M)
+
+    if np is not None and isinstance(M, np.ndarray):
+        arr = np.ascontiguousarray(M, dtype=_np_dtype(dtype))
+        return {"shape": list(arr.shape), "dtype": dtype}, arr.tobytes()
+
+    rows = len(M)
+    cols = len(M[0]) if rows else 0
+    return {"shape": [rows, cols], "dtype": dtype}, _pack(chain.from_iterable(M), dtype)
+
+
+def decode_matrix(desc: Dict[str, Any], buf: bytearray, as_numpy: bool = False) -> Any:
+    """
+    Reconstrói uma matriz a partir do descritor e do buffer recebido.
+    """
+    if "format" in desc:
+        return _decode_sparse(desc, buf, as_numpy)
+    rows, cols = desc["shape"]
+    values = _unpack(buf, desc["dtype"], as_numpy)
+    if as_numpy and np is not None:
+        return values.reshape(rows, cols)
+    return [values[i * cols:(i + 1) * cols] for i in range(rows)]
+
+
+def matrix_digest(M: Any) -> str:
+    """
+    Hash de conteúdo da matriz (forma, dtype e valores), usado como identificador.
+    """
+    h = hashlib.sha256()
+    if np is not None and isinstance(M, np.ndarray):
+        # Faixas de linhas: uma matriz mapeada de arquivo nunca é copiada inteira
+        dtype = matrix_dtype(M)
+        h.update(f"{list(M.shape)}|{dtype}|".encode("utf-8"))
+        step = max(1, DIGEST_CHUNK_BYTES // max(1, M.shape[1] * ITEMSIZE[dtype]))
+        for start in range(0, M.shape[0], step):
+            _, payload = encode_matrix(M[start:start + step])
+            h.update(payload)
+        return h.hexdigest()[:32]
+
+    desc, payload = encode_matrix(M)
+    h.update(f"{desc['shape']}|{desc['dtype']}|".encode("utf-8"))
+    if "format" in desc:
+        h.update(f"{desc['format']}|".encode("utf-8"))
+    h.update(payload)
+    return h.hexdigest()[:32]
+
+
+def encode_binary(
+    data: Dict[str, Any],
+    compressor: Optional[AdaptiveCompressor] = None,
+    phases: Optional[Dict[str, float]] = None,
+) -> List[bytes]:
+    """
+    Monta os frames de uma mensagem binária: cabeçalho JSON e os payloads crus
+    (ou comprimidos com o codec que o `compressor` escolher para cada um).
+
+    Com `phases`, o tempo de codificação dos payloads é gravado em
+    phases["encode"] e o dicionário vai no cabeçalho (PHASES_KEY): os payloads
+    são codificados antes do cabeçalho, então a mensagem leva o próprio custo.
+    """
+    t_start = time.perf_counter()
+    header: Dict[str, Any] = {}
+    descs: List[Dict[str, Any]] = []
+    payloads: List[bytes] = []
+
+    for key, value in data.items():
+        if _is_matrix(value):
+            desc, payload = encode_matrix(value)
+            desc["key"] = key
+            if compressor is not None:
+                codec, payload = compressor.compress(payload)
+                if codec != CODEC_NONE:
+                    desc["codec"] = codec
+                    desc["nbytes"] = len(payload)
+            descs.append(desc)
+            payloads.append(payload)
+        else:
+            header[key] = value
+
+    header[ARRAYS_KEY] = descs
+    if phases is not None:
+        phases["encode"] = time.perf_counter() - t_start
+        header[PHASES_KEY] = phases
+    raw = json.dumps(header).encode("utf-8")
+    return [struct.pack("!I", len(raw)) + raw] + payloads
+
+
+def _to_jsonable(value: Any) -> Any:
+    if np is not None and isinstance(value, np.ndarray):
+        return value.tolist()
+    if is_sparse(value):
+        # O formato JSON não tem representação esparsa: vai densa
+        return value.to_dense()
+    return value
+
+
+def encode_message(
+    data: Dict[str, Any],
+    wire_format: str = WIRE_JSON,
+    compressor: Optional[AdaptiveCompressor] = None,
+    phases: Optional[Dict[str, float]] = None,
+) -> List[bytes]:
+    """
+    Serializa a mensagem no formato combinado com o par (WIRE_BINARY ou WIRE_JSON).
+    Só o formato binário comprime payloads. `phases` como em encode_binary;
+    no formato JSON o tempo cobre a conversão das matrizes, não o json.dumps final.
+    """
+    if wire_format == WIRE_BINARY:
+        return encode_binary(data, compressor, phases)
+    t_start = time.perf_counter()
+    message = {k: _to_jsonable(v) for k, v in data.items()}
+    if phases is not None:
+        phases["encode"] = time.perf_counter() - t_start
+        message[PHASES_KEY] = phases
+    raw = json.dumps(message).encode("utf-8")
+    return [struct.pack("!I", len(raw)) + raw]
+
+
+def recv_message(
+    sock: socket.socket,
+    as_numpy: bool = False,
+    sink: Optional[Sink] = None,
+    phases: Optional[Dict[str, float]] = None,
+) -> Dict[str, Any]:
+    """
+    Recebe uma mensagem em qualquer formato (JSON puro ou binário).
+
+    Se o cabeçalho listar matrizes binárias, cada payload é lido direto para um
+    bytearray pré-alocado do tamanho exato indicado pela forma e dtype.
+
+    `sink(cabeçalho, descritor)` pode devolver uma região de memória de destino
+    (por exemplo, o trecho certo da matriz C final); nesse caso o payload é
+    lido direto nela, sem decodificação, e a chave vai para WRITTEN_KEY.
+    Payloads comprimidos são descomprimidos antes (e então copiados para o destino).
+
+    Com `phases`, grava o instante (time.time) em que a mensagem começou a
+    chegar em phases["recv_at"], os segundos de leitura do socket e de
+    decodificação (JSON, descompressão, matrizes) em "recv" e "decode" e os
+    bytes lidos do fio em "bytes". A espera pela mensagem, antes do primeiro
+    frame, não entra na conta.
+    """
+    size = struct.unpack("!I", recv_exactly(sock, 4))[0]
+    recv_at = time.time()
+    t_start = time.perf_counter()
+    decode = 0.0
+
+    raw = recv_exactly(sock, size)
+    t_decode = time.perf_counter()
+    data = json.loads(raw.decode("utf-8"))
+    decode += time.perf_counter() - t_decode
+    descs = data.pop(ARRAYS_KEY, None)
+    nbytes = 4 + size
+
+    for desc in descs or ():
+        size = payload_size(desc)
+        nbytes += desc.get("nbytes", size)
+        target = _sink_target(sink, data, desc)
+        if "codec" in desc:
+            compressed = recv_exactly(sock, desc["nbytes"])
+            t_decode = time.perf_counter()
+            raw = decompress(desc["codec"], compressed, size)
+            _store_payload(data, desc, raw, target, as_numpy)
+            decode += time.perf_counter() - t_decode
+            continue
+        if target is not None and target.nbytes == size:
+            recv_exactly_into(sock, target)
+            data.setdefault(WRITTEN_KEY, []).append(desc["key"])
+            continue
+        buf = bytearray(size)
+        recv_exactly_into(sock, memoryview(buf))
+        t_decode = time.perf_counter()
+        data[desc["key"]] = decode_matrix(desc, buf, as_numpy)
+        decode += time.perf_counter() - t_decode
+
+    if phases is not None:
+        phases["recv_at"] = recv_at
+        phases["recv"] = time.perf_counter() - t_start - decode
+        phases["decode"] = decode
+        phases["bytes"] = nbytes
+    return data
+
+
+def _sink_target(sink: Optional[Sink], data: Dict[str, Any], desc: Dict[str, Any]) -> Optional[memoryview]:
+    # Só payloads densos podem ir direto para a região de destino
+    if sink is None or "format" in desc:
+        return None
+    return sink(data, desc)
+
+
+def _store_payload(
+    data: Dict[str, Any],
+    desc: Dict[str, Any],
+    buf: Any,
+    target: Optional[memoryview],
+    as_numpy: bool,
+) -> None:
+    """
+    Copia um payload já em memória para o destino do `sink` ou o decodifica na mensagem.
+    """
+    if target is not None and target.nbytes == len(buf):
+        target[:] = buf
+        data.setdefault(WRITTEN_KEY, []).append(desc["key"])
+    else:
+        data[desc["key"]] = decode_matrix(desc, buf, as_numpy)
+
+
+def send_message(
+    sock: socket.socket,
+    data: Dict[str, Any],
+    wire_format: str = WIRE_JSON,
+    compressor: Optional[AdaptiveCompressor] = None,
+    phases: Optional[Dict[str, float]] = None,
+) -> int:
+    """
+    Envia a mensagem no formato combinado com o par (WIRE_BINARY ou WIRE_JSON)
+    e devolve os bytes enviados. O tempo de envio alimenta a estimativa de
+    vazão do `compressor`. `phases` vai no cabeçalho com o tempo de
+    codificação (veja encode_binary).
+    """
+    frames = encode_message(data, wire_format, compressor, phases)
+    nbytes = sum(len(frame) for frame in frames)
+    start = time.perf_counter()
+    for frame in frames:
+        sock.sendall(frame)
+    if compressor is not None:
+        compressor.observe_send(nbytes, time.perf_counter() - start)
+    return nbytes
+
+
+# ============================================================
+# VERSÃO ASYNCIO (StreamReader / StreamWriter)
+# ============================================================
+
+async def read_message(
+    reader: asyncio.StreamReader,
+    as_numpy: bool = False,
+    sink: Optional[Sink] = None,
+    phases: Optional[Dict[str, float]] = None,
+) -> Dict[str, Any]:
+    """
+    Equivalente assíncrono de recv_message (mesmo enquadramento e mesmo `sink`).
+    Com `phases`, grava só os bytes lidos do fio em phases["bytes"].
+    """
+    size = struct.unpack("!I", await reader.readexactly(4))[0]
+    data = json.loads((await reader.readexactly(size)).decode("utf-8"))
+    descs = data.pop(ARRAYS_KEY, None)
+    nbytes = 4 + size
+
+    for desc in descs or ():
+        size = payload_size(desc)
+        nbytes += desc.get("nbytes", size)
+        if "codec" in desc:
+            buf = decompress(desc["codec"], await reader.readexactly(desc["nbytes"]), size)
+        else:
+            buf = await reader.readexactly(size)
+        # O StreamReader não lê para um buffer externo: copia o payload para o destino
+        target = _sink_target(sink, data, desc)
+        _store_payload(data, desc, buf, target, as_numpy)
+    if phases is not None:
+        phases["bytes"] = nbytes
+    return data
+
+
+async def write_message(
+    writer: asyncio.StreamWriter,
+    data: Dict[str, Any],
+    wire_format: str = WIRE_JSON,
+    compressor: Optional[AdaptiveCompressor] = None,
+) -> int:
+    """
+    Equivalente assíncrono de send_message; espera o buffer de escrita
+    esvaziar e devolve os bytes enviados.
+    """
+    frames = encode_message(data, wire_format, compressor)
+    nbytes = sum(len(frame) for frame in frames)
+    start = time.perf_counter()
+    writer.writelines(frames)
+    await writer.drain()
+    if compressor is not None:
+        compressor.observe_send(nbytes, time.perf_counter() - start)
+    return nbytes
+
+
+# ============================================================
+# NEGOCIAÇÃO DE FORMATO
+# ============================================================
+
+# Segundos que o servidor espera pelo 'hello'. Clientes antigos não o enviam
+# (esperam direto por uma tarefa): passado o prazo, a conexão segue em JSON.
+HELLO_TIMEOUT = 5.0
+
+
+def client_handshake(
+    sock: socket.socket,
+    formats: Tuple[str, ...] = WIRE_FORMATS,
+    codecs: Tuple[str, ...] = (),
+    kernel: Optional[str] = None,
+) -> Tuple[str, List[str]]:
+    """
+    Lado cliente: anuncia os formatos e codecs de compressão aceitos (e o
+    kernel de cálculo) e devolve o formato escolhido pelo servidor e os
+    codecs que os dois lados aceitam.
+    """
+    configure_socket(sock)
+    hello: Dict[str, Any] = {"type": "hello", "formats": list(formats), "codecs": list(codecs)}
+    if kernel is not None:
+        hello["kernel"] = kernel
+    send_json(sock, hello)
+    reply = recv_json(sock)
+    if reply.get("type") != "welcome":
+        raise ConnectionError(f"Handshake inesperado: {reply}")
+    return reply.get("format", WIRE_JSON), list(reply.get("codecs", []))
+
+
+def choose_wire_format(hello: Dict[str, Any], allowed: Tuple[str, ...] = WIRE_FORMATS) -> str:
+    """
+    Escolhe o primeiro formato oferecido no 'hello' que o servidor aceita.
+    Cai para JSON quando não há formato em comum.
+    """
+    offered = hello.get("formats", [WIRE_JSON]) if hello.get("type") == "hello" else [WIRE_JSON]
+    chosen: Optional[str] = next((f for f in offered if f in allowed), None)
+    return chosen or WIRE_JSON
+
+
+def choose_codecs(hello: Dict[str, Any], codecs: Tuple[str, ...] = ()) -> List[str]:
+    """
+    Codecs de compressão aceitos pelos dois lados, na ordem de preferência do cliente.
+    Clientes antigos não anunciam codecs: a conexão fica sem compressão.
+    """
+    return [codec for codec in hello.get("codecs", []) if codec in codecs]
+
+
+def server_handshake(
+    sock: socket.socket,
+    allowed: Tuple[str, ...] = WIRE_FORMATS,
+    codecs: Tuple[str, ...] = (),
+) -> Tuple[str, List[str], Optional[str]]:
+    """
+    Lado servidor: lê o 'hello' do cliente e responde com o formato escolhido
+    e os codecs em comum. Devolve também o kernel anunciado pelo cliente
+    (None para clientes antigos). Um cliente antigo, que não manda 'hello'
+    em HELLO_TIMEOUT segundos, fica em JSON sem compressão e sem 'welcome'.
+    """
+    configure_socket(sock)
+    sock.settimeout(HELLO_TIMEOUT)
+    try:
+        hello = recv_json(sock)
+    except socket.timeout:
+        return WIRE_JSON, [], None
+    finally:
+        sock.settimeout(None)
+    wire_format = choose_wire_format(hello, allowed)
+    common = choose_codecs(hello, codecs)
+    send_json(sock, {"type": "welcome", "format": wire_format, "codecs": common})
+    return wire_format, common, hello.get("kernel")
+
+
+async def server_handshake_async(
+    reader: asyncio.StreamReader,
+    writer: asyncio.StreamWriter,
+    allowed: Tuple[str, ...] = WIRE_FORMATS,
+    codecs: Tuple[str, ...] = (),
+) -> Tuple[str, List[str], Optional[str]]:
+    """
+    Versão assíncrona de server_handshake.
+    """
+    try:
+        hello = await asyncio.wait_for(read_message(reader), HELLO_TIMEOUT)
+    except asyncio.TimeoutError:
+        return WIRE_JSON, [], None
+    wire_format = choose_wire_format(hello, allowed)
+    common = choose_codecs(hello, codecs)
+    await write_message(writer, {"type": "welcome", "format": wire_format, "codecs": common})
+    return wire_format, common, hello.get("kernel")
@@ -0,0 +1,386 @@
+import bisect
+import random
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from matmul.utils.dtypes import accumulation_dtype, compute_dtype, normalize_dtype, smallest_int_dtype
+
+try:
+    import numpy as np
+except ImportError:  # numpy é opcional: os kernels esparsos também rodam em Python puro
+    np = None
+
+# Formatos esparsos (valor de "format" no descritor binário)
+FORMAT_CSR = "csr"
+FORMAT_CSC = "csc"
+
+
+def _as_list(values: Any) -> List[Any]:
+    if np is not None and isinstance(values, np.ndarray):
+        return values.tolist()
+    return list(values)
+
+
+class CSRMatrix:
+    """
+    Matriz esparsa em linhas comprimidas (Compressed Sparse Row).
+
+        indptr:  rows + 1 posições; a linha i ocupa indices/data[indptr[i]:indptr[i+1]]
+        indices: coluna de cada valor não nulo
+        data:    os valores não nulos, no dtype `dtype`
+
+    Os vetores são listas ou ndarrays (quando decodificados com numpy). Fatiar
+    linhas (`A[r0:r1]`) e `len(A)` funcionam como numa matriz densa, então a
+    divisão por blocos de linhas vale igual; o custo acompanha nnz, não n².
+    """
+
+    format = FORMAT_CSR
+
+    def __init__(self, shape: Tuple[int, int], indptr: Any, indices: Any, data: Any, dtype: str):
+        self.shape = (int(shape[0]), int(shape[1]))
+        self.indptr = indptr
+        self.indices = indices
+        self.data = data
+        self.dtype = dtype
+
+    @property
+    def nnz(self) -> int:
+        return int(self.indptr[-1]) - int(self.indptr[0])
+
+    @property
+    def density(self) -> float:
+        return self.nnz / max(1, self.shape[0] * self.shape[1])
+
+    def __len__(self) -> int:
+        return self.shape[0]
+
+    def __getitem__(self, rows: slice) -> "CSRMatrix":
+        if not isinstance(rows, slice):
+            raise TypeError("CSRMatrix só aceita fatias de linhas (A[r0:r1])")
+        r0, r1, _ = rows.indices(self.shape[0])
+        return self.row_slice(r0, max(r0, r1))
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, CSRMatrix):
+            return NotImplemented
+        return self.shape == other.shape and self.to_dense() == other.to_dense()
+
+    @classmethod
+    def from_dense(cls, M: Any, dtype: Optional[str] = None) -> "CSRMatrix":
+        """
+        Comprime uma matriz densa (lista de listas ou ndarray).
+        """
+        if np is not None and isinstance(M, np.ndarray):
+            rows, cols = M.shape
+            nz_rows, nz_cols = np.nonzero(M)
+            indptr = np.zeros(rows + 1, dtype=np.int64)
+            np.cumsum(np.bincount(nz_rows, minlength=rows), out=indptr[1:])
+            data = M[nz_rows, nz_cols]
+            return cls((rows, cols), indptr, nz_cols.astype(np.int64), data, dtype or normalize_dtype(M.dtype))
+
+        rows = len(M)
+        cols = len(M[0]) if rows else 0
+        indptr = [0]
+        indices: List[int] = []
+        data: List[Any] = []
+        for row in M:
+            for j, x in enumerate(row):
+                if x:
+                    indices.append(j)
+                    data.append(x)
+            indptr.append(len(indices))
+        return cls((rows, cols), indptr, indices, data, dtype or _list_dtype(data))
+
+    def to_dense(self) -> List[List[Any]]:
+        rows, cols = self.shape
+        zero = 0.0 if self.dtype.startswith("float") else 0
+        indptr, indices, data = _as_list(self.indptr), _as_list(self.indices), _as_list(self.data)
+        base = indptr[0]
+        M = [[zero] * cols for _ in range(rows)]
+        for i in range(rows):
+            M_i = M[i]
+            for p in range(indptr[i] - base, indptr[i + 1] - base):
+                M_i[indices[p]] = data[p]
+        return M
+
+    def row_slice(self, r0: int, r1: int) -> "CSRMatrix":
+        """
+        Linhas [r0, r1) como uma nova CSRMatrix (indptr reiniciado em 0).
+        """
+        start, end = int(self.indptr[r0]), int(self.indptr[r1])
+        if np is not None and isinstance(self.indptr, np.ndarray):
+            indptr: Any = self.indptr[r0:r1 + 1] - start
+        else:
+            indptr = [p - start for p in self.indptr[r0:r1 + 1]]
+        return CSRMatrix((r1 - r0, self.shape[1]), indptr, self.indices[start:end], self.data[start:end], self.dtype)
+
+    def to_csc(self) -> "CSCMatrix":
+        indptr, indices, data = _transpose(self.shape, self.indptr, self.indices, self.data)
+        return CSCMatrix(self.shape, indptr, indices, data, self.dtype)
+
+    def to_csr(self) -> "CSRMatrix":
+        return self
+
+
+class CSCMatrix:
+    """
+    Matriz esparsa em colunas comprimidas (Compressed Sparse Column): mesma
+    estrutura da CSRMatrix, com `indptr` percorrendo colunas e `indices`
+    guardando linhas. Boa para fatiar colunas; os kernels convertem para CSR.
+    """
+
+    format = FORMAT_CSC
+
+    def __init__(self, shape: Tuple[int, int], indptr: Any, indices: Any, data: Any, dtype: str):
+        self.shape = (int(shape[0]), int(shape[1]))
+        self.indptr = indptr
+        self.indices = indices
+        self.data = data
+        self.dtype = dtype
+
+    @property
+    def nnz(self) -> int:
+        return int(self.indptr[-1]) - int(self.indptr[0])
+
+    def __len__(self) -> int:
+        return self.shape[0]
+
+    @classmethod
+    def from_dense(cls, M: Any, dtype: Optional[str] = None) -> "CSCMatrix":
+        return CSRMatrix.from_dense(M, dtype).to_csc()
+
+    def col_slice(self, c0: int, c1: int) -> "CSCMatrix":
+        """
+        Colunas [c0, c1) como uma nova CSCMatrix.
+        """
+        transposed = CSRMatrix((self.shape[1], self.shape[0]), self.indptr, self.indices, self.data, self.dtype)
+        part = transposed.row_slice(c0, c1)
+        return CSCMatrix((self.shape[0], c1 - c0), part.indptr, part.indices, part.data, self.dtype)
+
+    def to_csr(self) -> CSRMatrix:
+        rows, cols = self.shape
+        indptr, indices, data = _transpose((cols, rows), self.indptr, self.indices, self.data)
+        return CSRMatrix(self.shape, indptr, indices, data, self.dtype)
+
+    def to_dense(self) -> List[List[Any]]:
+        return self.to_csr().to_dense()
+
+
+SparseMatrix = Any  # CSRMatrix ou CSCMatrix
+
+
+def is_sparse(M: Any) -> bool:
+    return isinstance(M, (CSRMatrix, CSCMatrix))
+
+
+def _list_dtype(data: Sequence[Any]) -> str:
+    if any(isinstance(x, float) for x in data):
+        return "float64"
+    return smallest_int_dtype(min(data), max(data)) if data else "int8"
+
+
+def _transpose(shape: Tuple[int, int], indptr: Any, indices: Any, data: Any) -> Tuple[List[int], List[int], List[Any]]:
+    """
+    Troca a dimensão comprimida (CSR <-> CSC) em O(nnz + n), por contagem.
+    `shape` é (dimensão comprimida, outra dimensão).
+    """
+    n_major, n_minor = shape
+    indptr, indices, data = _as_list(indptr), _as_list(indices), _as_list(data)
+    base = indptr[0]
+    counts = [0] * (n_minor + 1)
+    for j in indices:
+        counts[j + 1] += 1
+    for j in range(n_minor):
+        counts[j + 1] += counts[j]
+    new_indptr = list(counts)
+    new_indices = [0] * len(indices)
+    new_data = [0] * len(data)
+    for i in range(n_major):
+        for p in range(indptr[i] - base, indptr[i + 1] - base):
+            dest = counts[indices[p]]
+            new_indices[dest] = i
+            new_data[dest] = data[p]
+            counts[indices[p]] += 1
+    return new_indptr, new_indices, new_data
+
+
+def generate_sparse_matrix(
+    rows: int,
+    cols: int,
+    density: float,
+    min_val: int = 1,
+    max_val: int = 10,
+    dtype: Optional[str] = None,
+) -> CSRMatrix:
+    """
+    Gera uma CSRMatrix com cerca de `density` * rows * cols valores não nulos
+    entre min_val e max_val, sem nunca montar a matriz densa.
+    """
+    per_row = density * cols
+    indptr = [0]
+    indices: List[int] = []
+    data: List[Any] = []
+    cast = float if dtype is not None and dtype.startswith("float") else int
+    for _ in range(rows):
+        # Parte inteira fixa + sorteio da fração: nnz médio por linha = per_row
+        count = min(cols, int(per_row) + (random.random() < per_row % 1))
+        columns = sorted(random.sample(range(cols), count))
+        indices.extend(columns)
+        data.extend(cast(random.randint(min_val, max_val)) for _ in columns)
+        indptr.append(len(indices))
+    return CSRMatrix((rows, cols), indptr, indices, data, dtype or _list_dtype(data))
+
+
+def split_ranges_by_nnz(A: CSRMatrix, num_parts: int) -> List[Tuple[int, int]]:
+    """
+    Divide as linhas de A em `num_parts` faixas [início, fim) com cerca do
+    mesmo número de não nulos (e não de linhas, como `split_ranges`): linhas
+    densas ficam em blocos menores. Toda faixa tem pelo menos uma linha.
+    """
+    rows = A.shape[0]
+    num_parts = max(1, min(num_parts, rows))
+    indptr = _as_list(A.indptr)
+    base, total = indptr[0], indptr[-1] - indptr[0]
+
+    ranges = []
+    start = 0
+    for part in range(1, num_parts):
+        target = base + total * part / num_parts
+        end = bisect.bisect_left(indptr, target, lo=start + 1, hi=rows)
+        # Reserva ao menos uma linha para cada faixa restante
+        end = max(start + 1, min(end, rows - (num_parts - part)))
+        ranges.append((start, end))
+        start = end
+    ranges.append((start, rows))
+    return ranges
+
+
+def _rows(M: Any) -> Tuple[List[int], List[int], List[Any]]:
+    return _as_list(M.indptr), _as_list(M.indices), _as_list(M.data)
+
+
+def multiply_sparse(A: Any, B: Any) -> Any:
+    """
+    Kernel esparso: A e/ou B em CSR/CSC (a outra pode ser densa).
+
+        - esparsa x densa:   C densa;   custo O(nnz(A) * colunas de B)
+        - densa x esparsa:   C densa;   custo O(linhas de A * nnz(B))
+        - esparsa x esparsa: C em CSR;  algoritmo de Gustavson, custo
+          proporcional aos produtos não nulos
+
+    Com numpy e B densa em ndarray, cada linha de C é um gemv da BLAS sobre
+    as linhas de B selecionadas pelos não nulos da linha de A.
+    """
+    A_sparse, B_sparse = is_sparse(A), is_sparse(B)
+    if not A_sparse and not B_sparse:
+        raise TypeError("multiply_sparse espera ao menos um operando CSR/CSC")
+    if A_sparse:
+        A = A.to_csr()
+    if B_sparse:
+        B = B.to_csr()
+    rows = len(A)
+    inner = A.shape[1] if A_sparse else (len(A[0]) if rows else 0)
+    B_rows, cols = (B.shape if B_sparse else (len(B), len(B[0]) if len(B) else 0))
+    if inner != B_rows:
+        raise ValueError(f"Dimensões incompatíveis: {inner} != {B_rows}")
+
+    if A_sparse and B_sparse:
+        return _sparse_sparse(A, B)
+    if A_sparse:
+        return _sparse_dense(A, B, cols)
+    return _dense_sparse(A, B, cols)
+
+
+def _dtype_of(M: Any) -> str:
+    if is_sparse(M):
+        return M.dtype
+    if np is not None and isinstance(M, np.ndarray):
+        return normalize_dtype(M.dtype)
+    return "float64" if any(isinstance(x, float) for row in M for x in row) else "int64"
+
+
+def _sparse_dense(A: CSRMatrix, B: Any, cols: int) -> Any:
+    rows = A.shape[0]
+    if np is not None and isinstance(B, np.ndarray):
+        acc = accumulation_dtype(A.dtype, _dtype_of(B), A.shape[1])
+        work = compute_dtype(A.dtype, _dtype_of(B), A.shape[1])
+        B_work = np.ascontiguousarray(B, dtype=work)
+        indptr = np.asarray(A.indptr)
+        indices = np.asarray(A.indices)
+        data = np.asarray(A.data).astype(work)
+        base = int(indptr[0])
+        C = np.zeros((rows, cols), dtype=work)
+        for i in range(rows):
+            start, end = int(indptr[i]) - base, int(indptr[i + 1]) - base
+            if start != end:
+                C[i] = data[start:end] @ B_work[indices[start:end]]
+        return C.astype(acc, copy=False)
+
+    indptr, indices, data = _rows(A)
+    base = indptr[0]
+    B = _as_list(B)
+    zero = 0.0 if A.dtype.startswith("float") else 0
+    C = []
+    for i in range(rows):
+        C_i = [zero] * cols
+        for p in range(indptr[i] - base, indptr[i + 1] - base):
+            a, B_k = data[p], B[indices[p]]
+            C_i = [c + a * b for c, b in zip(C_i, B_k)]
+        C.append(C_i)
+    return C
+
+
+def _dense_sparse(A: Any, B: CSRMatrix, cols: int) -> Any:
+    indptr, indices, data = _rows(B)
+    base = indptr[0]
+    zero = 0.0 if B.dtype.startswith("float") else 0
+    C = []
+    for A_i in _as_list(A):
+        C_i = [zero] * cols
+        for k, a in enumerate(_as_list(A_i)):
+            if a:
+                for p in range(indptr[k] - base, indptr[k + 1] - base):
+                    C_i[indices[p]] += a * data[p]
+        C.append(C_i)
+    return C
+
+
+def _sparse_sparse(A: CSRMatrix, B: CSRMatrix) -> CSRMatrix:
+    a_ptr, a_idx, a_data = _rows(A)
+    b_ptr, b_idx, b_data = _rows(B)
+    a_base, b_base = a_ptr[0], b_ptr[0]
+    indptr = [0]
+    indices: List[int] = []
+    data: List[Any] = []
+    for i in range(A.shape[0]):
+        # Acumulador esparso da linha i de C (Gustavson)
+        row: Dict[int, Any] = {}
+        for p in range(a_ptr[i] - a_base, a_ptr[i + 1] - a_base):
+            a, k = a_data[p], a_idx[p]
+            for q in range(b_ptr[k] - b_base, b_ptr[k + 1] - b_base):
+                j = b_idx[q]
+                row[j] = row.get(j, 0) + a * b_data[q]
+        for j in sorted(row):
+            if row[j]:
+                indices.append(j)
+                data.append(row[j])
+        indptr.append(len(indices))
+    dtype = accumulation_dtype(A.dtype, B.dtype, A.shape[1])
+    return CSRMatrix((A.shape[0], B.shape[1]), indptr, indices, data, dtype)
+
+
+def vstack_csr(blocks: Sequence[CSRMatrix]) -> CSRMatrix:
+    """
+    Empilha blocos de linhas CSR (na ordem) numa só CSRMatrix.
+    """
+    indptr = [0]
+    indices: List[int] = []
+    data: List[Any] = []
+    for block in blocks:
+        b_ptr = _as_list(block.indptr)
+        offset = len(indices) - b_ptr[0]
+        indptr.extend(p + offset for p in b_ptr[1:])
+        indices.extend(_as_list(block.indices))
+        data.extend(_as_list(block.data))
+    cols = blocks[0].shape[1] if blocks else 0
+    dtype = blocks[0].dtype if blocks else "int64"
+    return CSRMatrix((len(indptr) - 1, cols), indptr, indices, data, dtype)
@@ -15,6 +15,11 @@ echo ""
 echo "Pressione ENTER para começar..."
 read
 
+# Registros JSON lines dos jobs, lidos por generate_from_file.py
+JOB_LOG=${JOB_LOG:-jobs.jsonl}
+# Registros que já estavam no arquivo (de execuções anteriores)
+FIRST_RECORD=$(( $(cat ${JOB_LOG} 2>/dev/null | wc -l) + 1 ))
+
 # Função para executar teste
 run_test() {
     SIZE=$1
@@ -25,8 +30,10 @@ run_test() {
     echo "TESTE: Matriz ${SIZE}x${SIZE} com ${NUM_CLIENTS} clientes"
     echo "======================================================================"
     
-    # Inicia servidor em background
-    echo -e "${SIZE}\n${SIZE}\n${SIZE}" | python -m matmul.server.main --num-clients ${NUM_CLIENTS} &
+    # Inicia servidor em background (opção 1 do menu, as três dimensões e sair);
+    # cada job é acrescentado ao JOB_LOG. --verify full recalcula C no servidor
+    # e mede o tempo sequencial usado no speedup
+    echo -e "1\n${SIZE}\n${SIZE}\n${SIZE}\n2" | python -m matmul.server.main --num-clients ${NUM_CLIENTS} --verify full --job-log ${JOB_LOG} &
     SERVER_PID=$!
     
     # Aguarda servidor iniciar
@@ -40,10 +47,6 @@ run_test() {
     
     # Aguarda servidor terminar
     wait $SERVER_PID
-    
-    echo ""
-    echo "Pressione ENTER para próximo teste..."
-    read
 }
 
 # Testes
@@ -56,12 +59,30 @@ echo "======================================================================"
 echo "TESTES CONCLUÍDOS!"
 echo "======================================================================"
 echo ""
-echo "📊 ANÁLISE DOS RESULTADOS:"
+echo "📁 Jobs registrados em ${JOB_LOG}: gere os gráficos com"
+echo "   python generate_from_file.py ${JOB_LOG}"
 echo ""
-echo "• Matriz 50x50:   Overhead > Computação → Distribuído MAIS LENTO"
-echo "• Matriz 200x200: Overhead ≈ Computação → Break-even"
-echo "• Matriz 500x500: Overhead < Computação → Distribuído MAIS RÁPIDO"
+echo "📊 ANÁLISE DOS RESULTADOS (jobs desta execução):"
 echo ""
-echo "💡 CONCLUSÃO: Para sua apresentação, use matrizes ≥ 200x200"
-echo "   para garantir que o paralelismo compense o overhead!"
+tail -n +${FIRST_RECORD} ${JOB_LOG} | python -c '
+import json, sys
+
+records = [json.loads(line) for line in sys.stdin if line.strip()]
+faster = []
+for r in records:
+    size = "x".join(map(str, r["shape"]))
+    if r["speedup"] is None:
+        print(f"• Matriz {size}: sem tempo sequencial")
+        continue
+    speedup = r["speedup"]
+    verdict = "Distribuído MAIS RÁPIDO" if speedup > 1 else "Distribuído MAIS LENTO"
+    print(f"• Matriz {size}: speedup {speedup:.2f}x → {verdict}")
+    if speedup > 1:
+        faster.append(r["shape"][0])
+print()
+if faster:
+    print(f"💡 CONCLUSÃO: nesta máquina o paralelismo compensou a partir de {min(faster)}x{min(faster)}")
+else:
+    print("💡 CONCLUSÃO: nesta máquina o paralelismo não compensou o overhead em nenhum tamanho testado")
+'
 echo ""